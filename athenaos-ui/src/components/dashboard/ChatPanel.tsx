@@ -25,6 +25,8 @@ export default function ChatPanel({ matchId }: ChatPanelProps) {
     const [input, setInput] = useState("");
     const [loading, setLoading] = useState(false);
     const bottomRef = useRef<HTMLDivElement>(null);
+    // One id per conversation, created on the first message
+    const sessionId = useRef<string | null>(null);
 
     useEffect(() => {
         bottomRef.current?.scrollIntoView({ behavior: "smooth" });
@@ -36,9 +38,21 @@ export default function ChatPanel({ matchId }: ChatPanelProps) {
         setInput("");
         setMessages((prev) => [...prev, { role: "user", content: msg }]);
         setLoading(true);
+        sessionId.current ??= crypto.randomUUID();
         try {
-            const res = await AthenaAPI.chat(msg, matchId, messages.slice(-6));
-            setMessages((prev) => [...prev, { role: "assistant", content: res.response }]);
+            let started = false;
+            await AthenaAPI.chatStream(msg, (text) => {
+                if (!started) {
+                    started = true;
+                    setLoading(false);
+                    setMessages((prev) => [...prev, { role: "assistant", content: text }]);
+                    return;
+                }
+                setMessages((prev) => {
+                    const last = prev[prev.length - 1];
+                    return [...prev.slice(0, -1), { ...last, content: last.content + text }];
+                });
+            }, matchId, messages.slice(-6), sessionId.current);
         } catch (e) {
             setMessages((prev) => [
                 ...prev,
@@ -140,6 +140,34 @@ async function fetchAPI<T>(path: string, options?: RequestInit): Promise<T> {
     return res.json();
 }
 
+/** POST `body` to an SSE endpoint, calling `onToken` for each `token` event's text. */
+async function streamTokens(path: string, body: object, onToken: (text: string) => void): Promise<void> {
+    const res = await fetch(`${BASE_URL}${path}`, {
+        method: "POST",
+        headers: { "Content-Type": "application/json", Accept: "text/event-stream" },
+        body: JSON.stringify(body),
+    });
+    if (!res.ok || !res.body) {
+        const error = await res.json().catch(() => ({ detail: res.statusText }));
+        throw new Error(error.detail || `API error ${res.status}`);
+    }
+    const reader = res.body.pipeThrough(new TextDecoderStream()).getReader();
+    let buffer = "";
+    for (;;) {
+        const { value, done } = await reader.read();
+        if (done) return;
+        buffer += value;
+        let end;
+        while ((end = buffer.indexOf("\n\n")) >= 0) {
+            const frame = buffer.slice(0, end);
+            buffer = buffer.slice(end + 2);
+            const event = frame.match(/^event: (.*)$/m)?.[1];
+            const data = frame.match(/^data: (.*)$/m)?.[1];
+            if (event === "token" && data) onToken(JSON.parse(data).text);
+        }
+    }
+}
+
 export const AthenaAPI = {
     /** Health check */
     health: () => fetchAPI<{ status: string }>("/health"),
@@ -147,12 +175,9 @@ export const AthenaAPI = {
     /** List all pre-loaded matches */
     listMatches: () => fetchAPI<{ matches: MatchInfo[] }>("/matches"),
 
-    /** Analyze a pre-loaded match */
+    /** Analyze a pre-loaded match (cacheable GET, revalidated by ETag) */
     analyzePreloaded: (matchId: string) =>
-        fetchAPI<MatchAnalysis>("/analyze/preloaded", {
-            method: "POST",
-            body: JSON.stringify({ match_id: matchId }),
-        }),
+        fetchAPI<MatchAnalysis>(`/matches/${encodeURIComponent(matchId)}/analysis`),
 
     /** Analyze pasted commentary */
     analyzeCommentary: (commentary: object[], matchInfo?: object) =>
@@ -183,13 +208,26 @@ export const AthenaAPI = {
         return res.json();
     },
 
-    /** RAG chatbot */
-    chat: (message: string, matchId?: string, history?: { role: string; content: string }[]) =>
+    /** RAG chatbot; `sessionId` lets the backend reuse one intent token per conversation */
+    chat: (message: string, matchId?: string, history?: { role: string; content: string }[], sessionId?: string) =>
         fetchAPI<{ response: string; match_id?: string }>("/chat", {
             method: "POST",
-            body: JSON.stringify({ message, match_id: matchId, history }),
+            body: JSON.stringify({ message, match_id: matchId, history, session_id: sessionId }),
         }),
 
+    /** RAG chatbot, streamed: `onToken` receives text as it is generated */
+    chatStream: (
+        message: string,
+        onToken: (text: string) => void,
+        matchId?: string,
+        history?: { role: string; content: string }[],
+        sessionId?: string,
+    ) => streamTokens("/chat/stream", { message, match_id: matchId, history, session_id: sessionId }, onToken),
+
+    /** Report story, streamed token by token */
+    storyStream: (matchId: string, onToken: (text: string) => void) =>
+        streamTokens("/report/stream", { match_id: matchId }, onToken),
+
     /** Generate AI story + report */
     generateReport: (matchId: string) =>
         fetchAPI<{ story: string; match_data: MatchAnalysis }>("/report/generate", {
@@ -0,0 +1,190 @@
+"""
+AthenaOS Analysis Cache
+Content-addressed cache for analyze_match() results: a byte-bounded LRU with
+optional TTL in front of an optional SQLite store.
+"""
+
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+import zlib
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Tuple
+
+from app.response_encoding import dumps_json
+
+
+def _canonical(value: Any) -> bytes:
+    return json.dumps(value, sort_keys=True, separators=(",", ":")).encode("utf-8")
+
+
+def content_digest(*parts: Any) -> str:
+    """SHA-256 of the canonical JSON form of `parts`."""
+    return hashlib.sha256(_canonical(parts)).hexdigest()
+
+
+class AnalysisCache:
+    """
+    Two-tier result cache. Memory holds each result's encoded JSON, bounded
+    by total size and evicting least recently used first; entries older than
+    `ttl` seconds are dropped on access. Results are encoded exactly as a
+    JSON response would be (key order kept), so get_encoded() bytes can be
+    sent as-is; get() decodes a fresh copy callers may mutate. The disk tier
+    stores compressed JSON and is pruned oldest-first past `max_disk_bytes`.
+    """
+
+    def __init__(
+        self,
+        max_bytes: int = 64 << 20,
+        ttl: Optional[float] = None,
+        db_path: Optional[str] = None,
+        max_disk_bytes: int = 512 << 20,
+    ):
+        self.max_bytes = max_bytes
+        self.ttl = ttl or None
+        self.db_path = db_path
+        self.max_disk_bytes = max_disk_bytes
+        # key -> (encoded result, stored at)
+        self._memory: "OrderedDict[str, Tuple[bytes, float]]" = OrderedDict()
+        self._memory_bytes = 0
+        self._disk_bytes = 0
+        self._lock = threading.Lock()
+        self._db: Optional[sqlite3.Connection] = None
+        self.memory_hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+        if db_path:
+            os.makedirs(os.path.dirname(os.path.abspath(db_path)), exist_ok=True)
+            self._db = sqlite3.connect(db_path, check_same_thread=False)
+            self._db.execute("PRAGMA journal_mode=WAL")
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS analysis ("
+                " key TEXT PRIMARY KEY, value BLOB NOT NULL,"
+                " size INTEGER NOT NULL, stored REAL NOT NULL)"
+            )
+            self._db.execute("CREATE INDEX IF NOT EXISTS analysis_stored ON analysis (stored)")
+            if self.ttl:
+                self._db.execute("DELETE FROM analysis WHERE stored < ?", (time.time() - self.ttl,))
+            self._db.commit()
+            self._disk_bytes = self._db.execute("SELECT COALESCE(SUM(size), 0) FROM analysis").fetchone()[0]
+
+    @staticmethod
+    def key(*parts: Any) -> str:
+        return content_digest(*parts)
+
+    def _expired(self, stored: float) -> bool:
+        return self.ttl is not None and time.time() - stored > self.ttl
+
+    def get(self, key: str) -> Optional[Dict]:
+        """Cached result for `key`, or None."""
+        encoded = self.get_encoded(key)
+        return json.loads(encoded) if encoded is not None else None
+
+    def get_encoded(self, key: str) -> Optional[bytes]:
+        """Cached result for `key` as JSON bytes, or None."""
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is not None:
+                encoded, stored = entry
+                if not self._expired(stored):
+                    self._memory.move_to_end(key)
+                    self.memory_hits += 1
+                    return encoded
+                self._forget(key)
+                self.expirations += 1
+
+            if self._db is not None:
+                row = self._db.execute("SELECT value, stored FROM analysis WHERE key = ?", (key,)).fetchone()
+                if row is not None:
+                    blob, stored = row
+                    if not self._expired(stored):
+                        encoded = zlib.decompress(blob)
+                        self._remember(key, encoded, stored)
+                        self.disk_hits += 1
+                        return encoded
+                    self._delete_disk(key)
+                    self.expirations += 1
+
+            self.misses += 1
+            return None
+
+    def put(self, key: str, value: Dict) -> None:
+        # Raises on values JSON cannot represent rather than caching a lossy copy
+        encoded = dumps_json(value)
+        stored = time.time()
+        with self._lock:
+            self._remember(key, encoded, stored)
+            if self._db is not None:
+                blob = zlib.compress(encoded)
+                self._delete_disk(key)
+                self._db.execute(
+                    "INSERT INTO analysis (key, value, size, stored) VALUES (?, ?, ?, ?)",
+                    (key, blob, len(blob), stored),
+                )
+                self._disk_bytes += len(blob)
+                self._prune_disk()
+                self._db.commit()
+
+    def _remember(self, key: str, encoded: bytes, stored: float) -> None:
+        if key in self._memory:
+            self._forget(key)
+        if len(encoded) > self.max_bytes:
+            return
+        self._memory[key] = (encoded, stored)
+        self._memory_bytes += len(encoded)
+        while self._memory_bytes > self.max_bytes:
+            _, (evicted, _) = self._memory.popitem(last=False)
+            self._memory_bytes -= len(evicted)
+            self.evictions += 1
+
+    def _forget(self, key: str) -> None:
+        encoded, _ = self._memory.pop(key)
+        self._memory_bytes -= len(encoded)
+
+    def _delete_disk(self, key: str) -> None:
+        row = self._db.execute("SELECT size FROM analysis WHERE key = ?", (key,)).fetchone()
+        if row is not None:
+            self._db.execute("DELETE FROM analysis WHERE key = ?", (key,))
+            self._disk_bytes -= row[0]
+
+    def _prune_disk(self) -> None:
+        while self._disk_bytes > self.max_disk_bytes:
+            row = self._db.execute("SELECT key, size FROM analysis ORDER BY stored LIMIT 1").fetchone()
+            if row is None:
+                break
+            self._db.execute("DELETE FROM analysis WHERE key = ?", (row[0],))
+            self._disk_bytes -= row[1]
+            self.evictions += 1
+
+    def clear(self) -> None:
+        with self._lock:
+            self._memory.clear()
+            self._memory_bytes = 0
+            if self._db is not None:
+                self._db.execute("DELETE FROM analysis")
+                self._db.commit()
+                self._disk_bytes = 0
+
+    def stats(self) -> Dict:
+        with self._lock:
+            lookups = self.memory_hits + self.disk_hits + self.misses
+            return {
+                "memory_entries": len(self._memory),
+                "memory_bytes": self._memory_bytes,
+                "max_bytes": self.max_bytes,
+                "ttl_seconds": self.ttl,
+                "memory_hits": self.memory_hits,
+                "disk_hits": self.disk_hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "expirations": self.expirations,
+                "hit_rate": round((self.memory_hits + self.disk_hits) / lookups, 4) if lookups else 0.0,
+                "disk_enabled": self._db is not None,
+                "disk_bytes": self._disk_bytes,
+            }
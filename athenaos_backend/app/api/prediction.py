@@ -1,18 +1,19 @@
 from fastapi import APIRouter
 from pydantic import BaseModel
 from ..services.prediction_engine import predict_next_turn
-from ..models.emotion_models import EmotionPoint
-from typing import List
+from ..models.emotion_models import EmotionPoint, MatchContext
+from typing import List, Optional
 
 router = APIRouter()
 
 class PredictionRequest(BaseModel):
     request_id: str
     current_timeline: List[EmotionPoint]
+    match_context: Optional[MatchContext] = None
 
 @router.post("/emotional-turn")
 async def predict_turn(request: PredictionRequest):
-    prediction = predict_next_turn(request.current_timeline)
+    prediction = predict_next_turn(request.current_timeline, request.match_context)
     return {
         "status": "success",
         "request_id": request.request_id,
@@ -0,0 +1,127 @@
+"""
+AthenaOS Batch Scheduler
+Cross-request micro-batching: callers from any thread submit lists of items,
+a single worker thread drains the queue into batches bounded by size and a
+short wait, runs them through one function and resolves per-request futures.
+"""
+
+import queue
+import threading
+import time
+from concurrent.futures import Future
+from typing import Callable, Dict, List, Optional, Tuple
+
+
+class BatchScheduler:
+    """
+    Groups concurrent submit() calls into shared batches for `fn`, which maps
+    a list of items to a list of results of the same length. A batch closes
+    once it holds `max_batch` items or `max_wait_ms` has passed since its
+    first request arrived; a single request larger than `max_batch` runs on
+    its own. If `fn` raises, every request in the batch gets the exception.
+    """
+
+    def __init__(self, fn: Callable[[List], List], max_batch: int = 64, max_wait_ms: float = 5.0, name: str = "batch"):
+        self.fn = fn
+        self.max_batch = max(max_batch, 1)
+        self.max_wait = max(max_wait_ms, 0.0) / 1000.0
+        self.name = name
+        self._queue: "queue.Queue[Tuple[List, Future, float]]" = queue.Queue()
+        self._carry: Optional[Tuple[List, Future, float]] = None
+        self._lock = threading.Lock()
+        self._worker: Optional[threading.Thread] = None
+        self.requests = 0
+        self.items = 0
+        self.batches = 0
+        self.max_batch_seen = 0
+        self.max_queue_depth = 0
+        self.busy_seconds = 0.0
+        self.wait_seconds = 0.0
+
+    def _ensure_worker(self) -> None:
+        if self._worker is None:
+            with self._lock:
+                if self._worker is None:
+                    self._worker = threading.Thread(target=self._run, name=f"athena-{self.name}", daemon=True)
+                    self._worker.start()
+
+    def submit(self, items: List) -> Future:
+        """Queue `items`; the future resolves to their results, in order."""
+        future: Future = Future()
+        if not items:
+            future.set_result([])
+            return future
+        self._ensure_worker()
+        self._queue.put((list(items), future, time.perf_counter()))
+        with self._lock:
+            self.max_queue_depth = max(self.max_queue_depth, self._queue.qsize())
+        return future
+
+    def run(self, items: List, timeout: Optional[float] = None) -> List:
+        """Blocking submit()."""
+        return self.submit(items).result(timeout)
+
+    def _next_batch(self) -> List[Tuple[List, Future, float]]:
+        first = self._carry or self._queue.get()
+        self._carry = None
+        batch, size = [first], len(first[0])
+        deadline = time.perf_counter() + self.max_wait
+        while size < self.max_batch:
+            remaining = deadline - time.perf_counter()
+            try:
+                request = self._queue.get(timeout=remaining) if remaining > 0 else self._queue.get_nowait()
+            except queue.Empty:
+                break
+            if size + len(request[0]) > self.max_batch:
+                # Doesn't fit: it opens the next batch instead
+                self._carry = request
+                break
+            batch.append(request)
+            size += len(request[0])
+        return batch
+
+    def _run(self) -> None:
+        while True:
+            batch = self._next_batch()
+            items = [item for request_items, _, _ in batch for item in request_items]
+            start = time.perf_counter()
+            try:
+                results = self.fn(items)
+                if len(results) != len(items):
+                    raise RuntimeError(f"{self.name}: expected {len(items)} results, got {len(results)}")
+                error = None
+            except Exception as e:
+                error = e
+
+            offset = 0
+            for request_items, future, _ in batch:
+                if error is not None:
+                    future.set_exception(error)
+                else:
+                    future.set_result(results[offset:offset + len(request_items)])
+                offset += len(request_items)
+
+            with self._lock:
+                self.requests += len(batch)
+                self.items += len(items)
+                self.batches += 1
+                self.max_batch_seen = max(self.max_batch_seen, len(items))
+                self.busy_seconds += time.perf_counter() - start
+                self.wait_seconds += sum(start - submitted for _, _, submitted in batch)
+
+    def stats(self) -> Dict:
+        with self._lock:
+            return {
+                "max_batch": self.max_batch,
+                "max_wait_ms": round(self.max_wait * 1000, 3),
+                "queue_depth": self._queue.qsize() + (self._carry is not None),
+                "max_queue_depth": self.max_queue_depth,
+                "requests": self.requests,
+                "items": self.items,
+                "batches": self.batches,
+                "avg_batch_size": round(self.items / self.batches, 2) if self.batches else 0.0,
+                "avg_requests_per_batch": round(self.requests / self.batches, 2) if self.batches else 0.0,
+                "max_batch_size": self.max_batch_seen,
+                "avg_queue_wait_ms": round(self.wait_seconds / self.requests * 1000, 3) if self.requests else 0.0,
+                "busy_seconds": round(self.busy_seconds, 3),
+            }
@@ -0,0 +1,185 @@
+"""
+AthenaOS Broadcast Hub
+Live match fan-out: each ball is analyzed once per match, serialized once
+into an SSE frame, and shared by every subscriber of that match. Subscribers
+are cursors into the channel's frame log, so a viewer costs no per-ball
+copies; viewers that fall too far behind skip ahead to the latest ball.
+Channels that stop receiving balls are ended after an idle timeout.
+"""
+
+import asyncio
+import json
+import time
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, List, Optional
+
+from app.emotion_engine import MatchAnalyzer, _sentiment_scores
+
+
+def sse_frame(event: str, data: Any, event_id: Optional[int] = None) -> str:
+    """One server-sent event with compact JSON data."""
+    frame = f"id: {event_id}\n" if event_id is not None else ""
+    return frame + f"event: {event}\ndata: {json.dumps(data, separators=(',', ':'))}\n\n"
+
+
+class MatchChannel:
+    """A live match: its analyzer, frame log and subscriber count."""
+
+    def __init__(self, match_id: str, match_info: Dict):
+        self.match_id = match_id
+        self.match_info = match_info
+        self.analyzer = MatchAnalyzer(match_info)
+        self.frames: List[str] = []  # frames[i] is the event for ball i + 1
+        self.closed = False
+        self.last_active = time.monotonic()
+        self.subscribers = 0
+        self.peak_subscribers = 0
+        self.delivered = 0
+        self.skipped = 0
+        self._lock = asyncio.Lock()
+        self._changed = asyncio.Event()
+
+    def _notify(self) -> None:
+        # Wake everyone waiting on the current generation, then start a new one
+        changed, self._changed = self._changed, asyncio.Event()
+        changed.set()
+
+    def _ingest(self, balls: List[Dict]) -> List[str]:
+        # One sentiment call per published batch, so it rides the model's
+        # micro-batcher instead of a model call per ball
+        sentiments = _sentiment_scores([ball.get("text", "") for ball in balls])
+        # A batch lands whole or not at all: if any ball fails, the analyzer
+        # goes back to where it was, matching the unchanged frame log
+        checkpoint = self.analyzer.checkpoint()
+        frames = []
+        try:
+            for ball, sentiment in zip(balls, sentiments):
+                row = self.analyzer.add_ball(ball, sentiment=sentiment)
+                frames.append(sse_frame("ball", self.analyzer.delta(), row["ball_number"]))
+        except Exception:
+            self.analyzer.rollback(checkpoint)
+            raise
+        return frames
+
+    def stats(self) -> Dict:
+        return {
+            "match_id": self.match_id,
+            "balls": len(self.frames),
+            "subscribers": self.subscribers,
+            "peak_subscribers": self.peak_subscribers,
+            "frames_delivered": self.delivered,
+            "frames_skipped": self.skipped,
+            "closed": self.closed,
+        }
+
+
+class BroadcastHub:
+    """
+    Channels keyed by match_id. publish() runs the per-ball analysis through
+    `run` (an awaitable executor call, e.g. the heavy executor) so the event
+    loop only appends frames and wakes subscribers. A subscriber more than
+    `max_lag` frames behind gets a `resync` event and jumps to the newest
+    ball; every delta carries the full current_state and summary, and the
+    skipped rows can be fetched again by ball number. A channel with no new
+    ball for `idle_timeout` seconds is ended like close(), checked whenever
+    the hub is used and by waiting subscribers, which wake at least every
+    `idle_timeout / 2` seconds; ended channels are dropped from the hub.
+    """
+
+    def __init__(self, run: Optional[Callable[..., Awaitable]] = None, max_lag: int = 32,
+                 idle_timeout: Optional[float] = None):
+        self.run = run or asyncio.to_thread
+        self.max_lag = max(max_lag, 1)
+        self.idle_timeout = idle_timeout or None
+        self.channels: Dict[str, MatchChannel] = {}
+        self.expired = 0
+
+    def expire_idle(self) -> int:
+        """End channels idle for longer than idle_timeout; returns how many."""
+        if self.idle_timeout is None:
+            return 0
+        now = time.monotonic()
+        idle = [match_id for match_id, channel in self.channels.items()
+                if now - channel.last_active > self.idle_timeout]
+        for match_id in idle:
+            self.close(match_id)
+        self.expired += len(idle)
+        return len(idle)
+
+    def open(self, match_id: str, match_info: Dict) -> MatchChannel:
+        self.expire_idle()
+        channel = self.channels.get(match_id)
+        if channel is None:
+            channel = self.channels[match_id] = MatchChannel(match_id, match_info)
+        return channel
+
+    def get(self, match_id: str) -> Optional[MatchChannel]:
+        self.expire_idle()
+        return self.channels.get(match_id)
+
+    async def publish(self, match_id: str, balls: List[Dict]) -> int:
+        """Analyze and broadcast the next balls of a live match; returns the ball count."""
+        channel = self.channels[match_id]
+        async with channel._lock:
+            if channel.closed:
+                raise ValueError(f"Match {match_id} has ended")
+            frames = await self.run(channel._ingest, balls)
+            channel.frames.extend(frames)
+            channel.last_active = time.monotonic()
+            channel._notify()
+            return len(channel.frames)
+
+    def close(self, match_id: str) -> None:
+        """End a live match; current subscribers drain, new ones can't join."""
+        channel = self.channels.pop(match_id, None)
+        if channel is not None:
+            channel.closed = True
+            channel._notify()
+
+    async def subscribe(self, channel: MatchChannel, after: int = 0) -> AsyncIterator[str]:
+        """SSE frames for balls after `after`, then live ones until the match ends."""
+        cursor = min(max(after, 0), len(channel.frames))
+        channel.subscribers += 1
+        channel.peak_subscribers = max(channel.peak_subscribers, channel.subscribers)
+        try:
+            yield sse_frame("start", {"match_info": channel.match_info, "balls": len(channel.frames), "from": cursor})
+            while True:
+                available = len(channel.frames)
+                if cursor < available:
+                    if available - cursor > self.max_lag:
+                        skip_to = available - 1
+                        channel.skipped += skip_to - cursor
+                        yield sse_frame("resync", {"from": cursor + 1, "to": skip_to})
+                        cursor = skip_to
+                    frame = channel.frames[cursor]
+                    cursor += 1
+                    channel.delivered += 1
+                    yield frame
+                    continue
+                if channel.closed:
+                    yield sse_frame("end", {"balls": available})
+                    return
+                await self._wait(channel)
+        finally:
+            channel.subscribers -= 1
+
+    async def _wait(self, channel: MatchChannel) -> None:
+        """Until the channel changes; without one, idle channels are still expired."""
+        if self.idle_timeout is None:
+            await channel._changed.wait()
+            return
+        try:
+            await asyncio.wait_for(channel._changed.wait(), self.idle_timeout / 2)
+        except asyncio.TimeoutError:
+            self.expire_idle()
+
+    def stats(self) -> Dict:
+        self.expire_idle()
+        channels = [channel.stats() for channel in self.channels.values()]
+        return {
+            "channels": len(channels),
+            "subscribers": sum(c["subscribers"] for c in channels),
+            "max_lag": self.max_lag,
+            "idle_timeout_seconds": self.idle_timeout,
+            "expired": self.expired,
+            "matches": channels,
+        }
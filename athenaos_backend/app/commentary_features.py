@@ -0,0 +1,153 @@
+"""
+AthenaOS Commentary Features
+Single-pass feature extractor shared by the scraper, video processor,
+emotion engine and training pipeline: event flags, run count, drama and
+the auto-label hint, all from one compiled regex scan of the text.
+"""
+
+import re
+from typing import Dict, List, Tuple
+
+DRAMATIC_PHRASES = [
+    "last ball", "final ball", "last over", "super over", "do or die",
+    "must win", "nerve", "nail-biting", "thriller", "dramatic",
+    "unbelievable", "incredible scenes", "what a match", "legendary",
+    "history", "record-breaking", "never seen before", "extraordinary",
+    "against all odds", "from the jaws", "stunning comeback",
+]
+
+# Substring terms for ball events (matched anywhere, like `term in text`)
+WICKET_TERMS = ["out!", "wicket", "caught", "bowled", "lbw", "stumped", "run out"]
+SIX_TERMS = ["six", "6!"]
+FOUR_TERMS = ["four", "boundary", "4!"]
+DOT_TERMS = ["dot"]
+DROP_TERMS = ["drop"]
+WIDE_TERMS = ["wide"]
+NOBALL_TERMS = ["no ball", "no-ball"]
+
+# Whole-word terms for the training auto-labeler (matched like rf"\b{w}\b")
+PRESSURE_KEYWORDS = ["out", "bowled", "caught", "wicket", "lbw", "dismissed"]
+POSITIVE_KEYWORDS = ["six", "four", "boundary", "maximum", "century", "fifty"]
+# Fielding positions that contain "wicket" without being a dismissal
+WICKET_POSITIONS = ["mid-wicket", "wicket-to-wicket", "wicketkeeper"]
+
+_VOCABULARY = sorted(
+    set(
+        DRAMATIC_PHRASES + WICKET_TERMS + SIX_TERMS + FOUR_TERMS + DOT_TERMS
+        + DROP_TERMS + WIDE_TERMS + NOBALL_TERMS + ["no run"]
+        + PRESSURE_KEYWORDS + POSITIVE_KEYWORDS + WICKET_POSITIONS
+    ),
+    key=len,
+    reverse=True,
+)
+
+# Zero-width lookahead so every start position is reported, including
+# overlapping terms; the alternation is longest-first, and shorter terms
+# starting at the same position are recovered through _PREFIXES below.
+# The leading class skips positions no term or run pattern can start at.
+# The run-count patterns keep the scraper's priority order.
+_FIRST_CHARS = "".join(sorted({t[0] for t in _VOCABULARY} | set("123t")))
+_FEATURE_RE = re.compile(
+    r"(?=[" + re.escape(_FIRST_CHARS) + r"])"
+    r"(?=(?P<term>" + "|".join(re.escape(t) for t in _VOCABULARY) + r")"
+    r"|\b(?P<runs_1>[1-3])\s+run"
+    r"|takes?\s+(?P<runs_2>[1-3])"
+    r"|(?P<runs_3>[1-3])\s+more)"
+)
+_PREFIXES: Dict[str, List[Tuple[str, int]]] = {
+    term: [(other, len(other)) for other in _VOCABULARY if term.startswith(other)]
+    for term in _VOCABULARY
+}
+_RUN_GROUPS = ("runs_1", "runs_2", "runs_3")
+
+_WICKET_SET = frozenset(WICKET_TERMS)
+_SIX_SET = frozenset(SIX_TERMS)
+_FOUR_SET = frozenset(FOUR_TERMS)
+_NOBALL_SET = frozenset(NOBALL_TERMS)
+_DRAMA_SET = frozenset(DRAMATIC_PHRASES)
+_PRESSURE_SET = frozenset(PRESSURE_KEYWORDS)
+_DISMISSAL_SET = _PRESSURE_SET - {"wicket"}
+_POSITIVE_SET = frozenset(POSITIVE_KEYWORDS)
+_POSITION_SET = frozenset(WICKET_POSITIONS)
+
+_DRAMA_RE = re.compile("|".join(re.escape(p) for p in DRAMATIC_PHRASES))
+
+
+def _is_word_char(c: str) -> bool:
+    return c.isalnum() or c == "_"
+
+
+def has_drama(text: str) -> bool:
+    """True if the commentary contains any dramatic phrase."""
+    return _DRAMA_RE.search(text.lower()) is not None
+
+
+def extract_features(text: str) -> Dict:
+    """
+    All commentary features from one scan of the lowercased text:
+    is_wicket / is_six / is_four / is_dot / is_drop / is_wide / is_noball,
+    is_drama, runs, and label_hint (0 Neutral, 1 Positive, 2 Pressure).
+    """
+    text_lower = text.lower()
+    length = len(text_lower)
+    found = set()   # terms present anywhere
+    words = set()   # terms present as whole words
+    runs_found: Dict[str, int] = {}
+
+    for m in _FEATURE_RE.finditer(text_lower):
+        group = m.lastgroup
+        if group != "term":
+            if group not in runs_found:
+                runs_found[group] = int(m.group(group))
+            continue
+        start = m.start()
+        boundary_before = start == 0 or not _is_word_char(text_lower[start - 1])
+        for prefix, size in _PREFIXES[m.group("term")]:
+            found.add(prefix)
+            end = start + size
+            if boundary_before and (end == length or not _is_word_char(text_lower[end])):
+                words.add(prefix)
+
+    is_wicket = not found.isdisjoint(_WICKET_SET)
+    is_six = not found.isdisjoint(_SIX_SET)
+    is_four = not is_six and not found.isdisjoint(_FOUR_SET)
+    is_dot = "dot" in found or (not is_wicket and not is_six and not is_four and "no run" in found)
+    is_wide = "wide" in found
+    is_noball = not found.isdisjoint(_NOBALL_SET)
+
+    # Extract runs
+    if is_six:
+        runs = 6
+    elif is_four:
+        runs = 4
+    elif is_wide or is_noball:
+        runs = 1
+    elif is_wicket:
+        runs = 0
+    else:
+        runs = next((runs_found[g] for g in _RUN_GROUPS if g in runs_found), 0)
+
+    # Auto-label hint: 'wicket' inside a fielding position is not pressure
+    # unless another dismissal word is present.
+    is_pressure = not words.isdisjoint(_PRESSURE_SET)
+    if is_pressure and not found.isdisjoint(_POSITION_SET):
+        is_pressure = not words.isdisjoint(_DISMISSAL_SET)
+    if is_pressure:
+        label_hint = 2
+    elif not words.isdisjoint(_POSITIVE_SET):
+        label_hint = 1
+    else:
+        label_hint = 0
+
+    return {
+        "is_wicket": is_wicket,
+        "is_six": is_six,
+        "is_four": is_four,
+        "is_dot": is_dot,
+        "is_drop": "drop" in found,
+        "is_wide": is_wide,
+        "is_noball": is_noball,
+        "is_drama": not found.isdisjoint(_DRAMA_SET),
+        "runs": runs,
+        "label_hint": label_hint,
+    }
@@ -4,32 +4,129 @@ Cricket-aware sentiment analysis, E(t) formula, pressure index,
 momentum, collapse risk, batter cards, key moments, emotional phases.
 """
 
+import bisect
+import copy
+import json
 import math
 import re
 import os
+import threading
+import numpy as np
 import torch
-from typing import List, Dict, Any, Optional
+from collections import deque
+from types import SimpleNamespace
+from typing import List, Dict, Any, Optional, Set, Tuple
 from transformers import DistilBertTokenizerFast, DistilBertForSequenceClassification
 
+from app.batch_scheduler import BatchScheduler
+from app.commentary_features import has_drama
+from app.sentiment_cache import SentimentCache, model_fingerprint
+
 # ─── Model Configuration ─────────────────────────────────────────────────────
 MODEL_PATH = os.path.join(os.path.dirname(os.path.dirname(__file__)), "emotion_model")
+
+# Inference backend for the emotion model:
+#   torch      — eager PyTorch fp32 (default)
+#   torch-int8 — dynamic int8 quantization of the Linear layers (CPU)
+#   onnx       — ONNX export run by onnxruntime (CPU)
+#   onnx-int8  — dynamically quantized ONNX export (CPU)
+# The ONNX artifacts are written next to emotion_model/ by export_emotion_model.py.
+EMOTION_BACKENDS = ("torch", "torch-int8", "onnx", "onnx-int8")
+EMOTION_BACKEND = os.getenv("ATHENA_EMOTION_BACKEND", "torch")
+ONNX_MODEL_PATHS = {
+    "onnx": MODEL_PATH + ".onnx",
+    "onnx-int8": MODEL_PATH + ".int8.onnx",
+}
+
 _tokenizer = None
 _model = None
-_device = "cuda" if torch.cuda.is_available() else "cpu"
+_device = "cuda" if torch.cuda.is_available() and EMOTION_BACKEND == "torch" else "cpu"
+
+
+class _OnnxSequenceClassifier:
+    """onnxruntime session behind the model(**inputs).logits interface."""
+
+    def __init__(self, path: str):
+        import onnxruntime as ort
+        options = ort.SessionOptions()
+        options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+        self.session = ort.InferenceSession(path, options, providers=["CPUExecutionProvider"])
+        self.input_names = {i.name for i in self.session.get_inputs()}
+
+    def __call__(self, **inputs):
+        feed = {name: value.cpu().numpy() for name, value in inputs.items() if name in self.input_names}
+        logits = self.session.run(["logits"], feed)[0]
+        return SimpleNamespace(logits=torch.from_numpy(logits))
+
+
+def _load_model(backend: str, device: str = "cpu"):
+    """Load the emotion model for one inference backend."""
+    if backend not in EMOTION_BACKENDS:
+        raise ValueError(f"Unknown emotion backend {backend!r}; expected one of {EMOTION_BACKENDS}")
+    if not os.path.exists(MODEL_PATH):
+        raise FileNotFoundError(f"Model not found at {MODEL_PATH}. Run training first.")
+
+    if backend in ONNX_MODEL_PATHS:
+        path = ONNX_MODEL_PATHS[backend]
+        if not os.path.exists(path):
+            raise FileNotFoundError(f"{path} not found. Run export_emotion_model.py first.")
+        manifest_path = path + ".json"
+        if os.path.exists(manifest_path):
+            with open(manifest_path, "r", encoding="utf-8") as f:
+                source = json.load(f).get("source_fingerprint")
+            if source != model_fingerprint(MODEL_PATH):
+                raise RuntimeError(f"{path} was exported from an older emotion_model/. Re-run export_emotion_model.py.")
+        return _OnnxSequenceClassifier(path)
+
+    model = DistilBertForSequenceClassification.from_pretrained(MODEL_PATH)
+    model.eval()
+    if backend == "torch-int8":
+        return torch.quantization.quantize_dynamic(model, {torch.nn.Linear}, dtype=torch.qint8)
+    return model.to(device)
+
 
 def _get_model():
     """Lazy loader for the emotion model."""
     global _tokenizer, _model
     if _model is None:
-        if not os.path.exists(MODEL_PATH):
-            # Fallback will be handled in _sentiment_score if needed, 
-            # but for this script we expect the model to exist.
-            raise FileNotFoundError(f"Model not found at {MODEL_PATH}. Run training first.")
+        # Fallback will be handled in _sentiment_scores if loading fails.
         _tokenizer = DistilBertTokenizerFast.from_pretrained(MODEL_PATH)
-        _model = DistilBertForSequenceClassification.from_pretrained(MODEL_PATH).to(_device)
-        _model.eval()
+        _model = _load_model(EMOTION_BACKEND, _device)
     return _tokenizer, _model
 
+
+def _backend_fingerprint(backend: str) -> str:
+    """Model fingerprint scoped to the backend (and its artifact for ONNX)."""
+    extra = [ONNX_MODEL_PATHS[backend]] if backend in ONNX_MODEL_PATHS else []
+    return f"{backend}:{model_fingerprint(MODEL_PATH, *extra)}"
+
+# ─── Sentiment Cache ─────────────────────────────────────────────────────────
+# On-disk tier for model scores; set ATHENA_SENTIMENT_CACHE="" to keep the
+# cache in memory only.
+SENTIMENT_CACHE_PATH = os.getenv(
+    "ATHENA_SENTIMENT_CACHE",
+    os.path.join(os.path.dirname(MODEL_PATH), ".cache", "sentiment_cache.sqlite3"),
+)
+SENTIMENT_CACHE_SIZE = int(os.getenv("ATHENA_SENTIMENT_CACHE_SIZE", "50000"))
+_sentiment_cache: Optional[SentimentCache] = None
+
+
+def _get_sentiment_cache() -> SentimentCache:
+    """Lazy loader for the sentiment cache, bound to the current model files."""
+    global _sentiment_cache
+    if _sentiment_cache is None:
+        _sentiment_cache = SentimentCache(
+            fingerprint=_backend_fingerprint(EMOTION_BACKEND),
+            db_path=SENTIMENT_CACHE_PATH or None,
+            max_entries=SENTIMENT_CACHE_SIZE,
+        )
+    return _sentiment_cache
+
+
+def sentiment_cache_stats() -> Dict:
+    """Hit/miss counters for the sentiment cache (empty until first use)."""
+    return _sentiment_cache.stats() if _sentiment_cache is not None else {}
+
 # ─── Cricket-Specific Lexicon ───────────────────────────────────────────────
 CRICKET_POSITIVE = {
     "six": 3.5, "sixes": 3.5, "four": 2.5, "fours": 2.5,
@@ -62,59 +159,275 @@ CRICKET_NEGATIVE = {
     "lost": -3.0, "defeat": -3.5, "loss": -3.0, "eliminated": -3.5,
 }
 
-DRAMATIC_PHRASES = [
-    "last ball", "final ball", "last over", "super over", "do or die",
-    "must win", "nerve", "nail-biting", "thriller", "dramatic",
-    "unbelievable", "incredible scenes", "what a match", "legendary",
-    "history", "record-breaking", "never seen before", "extraordinary",
-    "against all odds", "from the jaws", "stunning comeback",
-]
+# ─── Lexicon Scorer ──────────────────────────────────────────────────────────
+# One compiled alternation over both weight tables, longest terms first.
+# Hyphens count as word characters so fielding positions like "mid-wicket"
+# or "wicket-keeper" don't register as dismissals.
+_LEXICON_WEIGHTS = {**CRICKET_POSITIVE, **CRICKET_NEGATIVE}
+_LEXICON_RE = re.compile(
+    r"(?<![\w-])("
+    + "|".join(re.escape(term) for term in sorted(_LEXICON_WEIGHTS, key=len, reverse=True))
+    + r")(?![\w-])"
+)
+LEXICON_SATURATION = 4.0    # net weight at which a lexicon call is fully confident
+LEXICON_POLAR_SCORE = 0.375  # |score| from which a ball reads Positive / Pressure
+
+
+def _lexicon_score(text: str) -> Tuple[float, float]:
+    """
+    Single-pass weighted lexicon score in [-1, 1] plus a confidence in [0, 1].
+    Polar calls are confident when the hits agree in sign and carry enough
+    weight. A neutral call has no lexical evidence behind it (no hits, or
+    hits that cancel out), so its confidence is 0 and the model reads it.
+    """
+    positive = negative = 0.0
+    for match in _LEXICON_RE.finditer(text.lower()):
+        weight = _LEXICON_WEIGHTS[match.group(1)]
+        if weight > 0:
+            positive += weight
+        else:
+            negative -= weight
+
+    net = positive - negative
+    mass = positive + negative
+    score = max(-1.0, min(1.0, net / LEXICON_SATURATION))
+    if abs(score) < LEXICON_POLAR_SCORE:
+        return score, 0.0
+    return score, (abs(net) / mass) * min(abs(net) / LEXICON_SATURATION, 1.0)
+
+
+def _lexicon_label(score: float) -> int:
+    """Map a lexicon score onto the model's labels: 0 Neutral, 1 Positive, 2 Pressure."""
+    if score >= LEXICON_POLAR_SCORE:
+        return 1
+    if score <= -LEXICON_POLAR_SCORE:
+        return 2
+    return 0
+
+
+def _lexicon_call(text: str, threshold: float, labels: Optional[Set[int]] = None) -> Optional[Tuple[int, float]]:
+    """
+    (label, confidence) if the cascade may settle `text` without the model,
+    else None. `labels` are the calls it may settle (default LEXICON_LABELS).
+    """
+    score, confidence = _lexicon_score(text)
+    label = _lexicon_label(score)
+    if confidence >= threshold and label in (LEXICON_LABELS if labels is None else labels):
+        return label, confidence
+    return None
+
 
 # ─── Sentiment Logic ──────────────────────────────────────────────────────────
+# Mini-batch size for innings-level scoring; balls are sorted by token length
+# so each batch pads only to its own longest ball.
+SENTIMENT_BATCH_SIZE = int(os.getenv("ATHENA_SENTIMENT_BATCH_SIZE", "32"))
+
+# "model" scores every ball with DistilBERT; "cascade" lets the lexicon
+# settle balls it reads with at least LEXICON_CONFIDENCE and sends the rest
+# to the model. LEXICON_LABELS lists the calls it may settle (e.g. "1,2");
+# it is empty by default, so every ball still reaches the model until
+# export_emotion_model.py's cascade report has been run against the deployed
+# model and shows which labels agree with it.
+SENTIMENT_MODE = os.getenv("ATHENA_SENTIMENT_MODE", "model")
+LEXICON_CONFIDENCE = float(os.getenv("ATHENA_LEXICON_CONFIDENCE", "0.6"))
+LEXICON_LABELS = {int(label) for label in os.getenv("ATHENA_LEXICON_LABELS", "").split(",") if label.strip()}
+_routing_lock = threading.Lock()
+_routing = {"balls": 0, "model_balls": 0}
+
+# Cross-request micro-batching: model calls from concurrent requests are
+# queued and run together on one worker thread. A batch closes at
+# INFERENCE_MAX_BATCH texts or INFERENCE_MAX_WAIT_MS after its first request.
+INFERENCE_BATCHING = os.getenv("ATHENA_INFERENCE_BATCHING", "1") == "1"
+INFERENCE_MAX_BATCH = int(os.getenv("ATHENA_INFERENCE_MAX_BATCH", "64"))
+INFERENCE_MAX_WAIT_MS = float(os.getenv("ATHENA_INFERENCE_MAX_WAIT_MS", "5"))
+_scheduler: Optional[BatchScheduler] = None
+_scheduler_lock = threading.Lock()
+
+# Map labels to [-1, 1] range values
+# 0: Neutral, 1: Positive, 2: Pressure
+_LABEL_SCORES = {
+    0: 0.0,      # Neutral
+    1: 0.85,     # Positive (boosted by confidence)
+    2: -0.95     # Pressure
+}
+
+
+def _label_to_score(prediction: int, confidence: float) -> float:
+    """Convert a predicted label and its softmax confidence to [-1, 1]."""
+    score = _LABEL_SCORES.get(prediction, 0.0)
+
+    # Apply confidence scaling for more 'vibrant' scores
+    if prediction != 0:
+        score *= (0.8 + 0.2 * confidence)
+
+    return max(-1.0, min(1.0, score))
+
+
+def _keyword_sentiment(text: str) -> float:
+    """Extreme fallback to basic keywords if model fails."""
+    text_lower = text.lower()
+    if any(w in text_lower for w in ["six", "four", "boundary"]): return 0.8
+    if any(w in text_lower for w in ["out", "wicket", "bowled"]): return -0.9
+    return 0.0
+
+
+def _predict_labels(
+    texts: List[str],
+    batch_size: int,
+    tokenizer=None,
+    model=None,
+    device: Optional[str] = None,
+) -> Tuple[List[int], List[float]]:
+    """
+    Tokenizes every text in one call, then runs length-sorted mini-batches
+    through the model. Returns (labels, confidences) in the original order.
+    """
+    if model is None:
+        tokenizer, model = _get_model()
+    device = device or _device
+    encodings = tokenizer(list(texts), truncation=True)
+    order = sorted(range(len(texts)), key=lambda i: len(encodings["input_ids"][i]))
+
+    labels = [0] * len(texts)
+    confidences = [0.0] * len(texts)
+    with torch.no_grad():
+        for start in range(0, len(order), batch_size):
+            idx = order[start:start + batch_size]
+            batch = tokenizer.pad(
+                {key: [encodings[key][i] for i in idx] for key in encodings.keys()},
+                return_tensors="pt",
+            ).to(device)
+            logits = model(**batch).logits
+            predictions = torch.argmax(logits, dim=-1)
+            # Confidence can be used for scaling
+            probs = torch.softmax(logits, dim=-1)
+            batch_confidences = probs.gather(1, predictions.unsqueeze(1)).squeeze(1)
+            for i, prediction, confidence in zip(idx, predictions.tolist(), batch_confidences.tolist()):
+                labels[i] = prediction
+                confidences[i] = confidence
+    return labels, confidences
+
+
+def _predict_scores(texts: List[str], batch_size: int) -> List[float]:
+    labels, confidences = _predict_labels(texts, batch_size)
+    return [_label_to_score(label, confidence) for label, confidence in zip(labels, confidences)]
+
+
+def _get_scheduler() -> BatchScheduler:
+    """Lazy loader for the shared inference scheduler."""
+    global _scheduler
+    if _scheduler is None:
+        with _scheduler_lock:
+            if _scheduler is None:
+                _scheduler = BatchScheduler(
+                    lambda texts: _predict_scores(texts, SENTIMENT_BATCH_SIZE),
+                    max_batch=INFERENCE_MAX_BATCH,
+                    max_wait_ms=INFERENCE_MAX_WAIT_MS,
+                    name="inference",
+                )
+    return _scheduler
+
+
+def _model_sentiment_scores(texts: List[str], batch_size: int) -> List[float]:
+    if INFERENCE_BATCHING:
+        return _get_scheduler().run(texts)
+    return _predict_scores(texts, batch_size)
+
+
+def inference_stats() -> Dict:
+    """Queue depth and batch-size counters for the inference scheduler."""
+    if not INFERENCE_BATCHING:
+        return {"enabled": False}
+    return {"enabled": True, **_get_scheduler().stats()}
+
+
+def _cached_model_scores(texts: List[str], batch_size: int) -> List[float]:
+    """
+    Model scores via the sentiment cache; only distinct misses reach the
+    model. Falls back to keywords if the model can't be used.
+    """
+    try:
+        if not os.path.exists(MODEL_PATH):
+            raise FileNotFoundError(f"Model not found at {MODEL_PATH}. Run training first.")
+        cache = _get_sentiment_cache()
+        keys = [cache.key(text) for text in texts]
+        scores = cache.get_many(keys)
+
+        missing: Dict[str, str] = {}
+        for key, text in zip(keys, texts):
+            if key not in scores:
+                missing.setdefault(key, text)
+        if missing:
+            fresh = dict(zip(missing, _model_sentiment_scores(list(missing.values()), batch_size)))
+            cache.put_many(fresh)
+            scores.update(fresh)
+
+        return [scores[key] for key in keys]
+
+    except Exception as e:
+        print(f"DEBUG: Emotion model unavailable, using keyword fallback: {type(e).__name__}: {e}")
+        return [_keyword_sentiment(text) for text in texts]
+
+
+def _sentiment_scores(
+    texts: List[str],
+    batch_size: Optional[int] = None,
+    mode: Optional[str] = None,
+) -> List[float]:
+    """
+    Batched version of _sentiment_score for a whole innings.
+    In cascade mode, balls the lexicon reads confidently skip the model.
+    """
+    if not texts:
+        return []
+    batch_size = max(batch_size or SENTIMENT_BATCH_SIZE, 1)
+    mode = mode or SENTIMENT_MODE
+
+    scores: List[float] = [0.0] * len(texts)
+    to_model = list(range(len(texts)))
+    if mode == "cascade":
+        to_model = []
+        for i, text in enumerate(texts):
+            call = _lexicon_call(text, LEXICON_CONFIDENCE)
+            if call is not None:
+                scores[i] = _label_to_score(*call)
+            else:
+                to_model.append(i)
+
+    with _routing_lock:
+        _routing["balls"] += len(texts)
+        _routing["model_balls"] += len(to_model)
+
+    if to_model:
+        model_scores = _cached_model_scores([texts[i] for i in to_model], batch_size)
+        for i, score in zip(to_model, model_scores):
+            scores[i] = score
+    return scores
+
+
+def sentiment_routing_stats() -> Dict:
+    """Share of balls sent to the model under the current sentiment mode."""
+    with _routing_lock:
+        balls, model_balls = _routing["balls"], _routing["model_balls"]
+    return {
+        "mode": SENTIMENT_MODE,
+        "balls": balls,
+        "model_balls": model_balls,
+        "model_fraction": round(model_balls / balls, 4) if balls else 0.0,
+    }
+
+
 def _sentiment_score(text: str) -> float:
     """
     Returns sentiment score normalized to [-1, 1].
     Uses fine-tuned DistilBERT model.
     Labels: 0 (Neutral) -> 0.0, 1 (Positive) -> 0.8, 2 (Pressure) -> -0.9
     """
-    try:
-        tokenizer, model = _get_model()
-        inputs = tokenizer(text, truncation=True, padding=True, return_tensors="pt").to(_device)
-        
-        with torch.no_grad():
-            outputs = model(**inputs)
-            prediction = torch.argmax(outputs.logits, dim=-1).item()
-            # Confidence can be used for scaling
-            probs = torch.softmax(outputs.logits, dim=-1)[0]
-            confidence = probs[prediction].item()
-
-        # Map labels to [-1, 1] range values
-        # 0: Neutral, 1: Positive, 2: Pressure
-        mapping = {
-            0: 0.0,      # Neutral
-            1: 0.85,     # Positive (boosted by confidence)
-            2: -0.95     # Pressure
-        }
-        
-        score = mapping.get(prediction, 0.0)
-        
-        # Apply confidence scaling for more 'vibrant' scores
-        if prediction != 0:
-            score *= (0.8 + 0.2 * confidence)
-
-        return max(-1.0, min(1.0, score))
-        
-    except Exception as e:
-        # Extreme fallback to basic keywords if model fails
-        text_lower = text.lower()
-        if any(w in text_lower for w in ["six", "four", "boundary"]): return 0.8
-        if any(w in text_lower for w in ["out", "wicket", "bowled"]): return -0.9
-        return 0.0
+    return _sentiment_scores([text])[0]
 
 
 def _has_drama(text: str) -> bool:
-    text_lower = text.lower()
-    return any(phrase in text_lower for phrase in DRAMATIC_PHRASES)
+    return has_drama(text)
 
 
 # ─── Pressure Index ──────────────────────────────────────────────────────────
@@ -167,11 +480,13 @@ def _emotion_score(
     ball_data: Dict,
     prev_ema: float,
     alpha: float = 0.3,
+    drama: Optional[bool] = None,
 ) -> float:
     """
     E(t) = 100 × (0.25·S + 0.40·P + 0.15·M + 0.20·S×P) × multipliers
     Then EMA smoothed with α=0.3
     S = normalized sentiment [0,1], P = pressure [0,1], M = momentum [0,1]
+    `drama` may be passed in when the caller already scanned the text.
     """
     S = (sentiment + 1) / 2  # normalize [-1,1] → [0,1]
     P = pressure
@@ -193,7 +508,9 @@ def _emotion_score(
         multiplier *= 1.1
     if ball_data.get("is_drop"):
         multiplier *= 1.3
-    if _has_drama(ball_data.get("text", "")):
+    if drama is None:
+        drama = _has_drama(ball_data.get("text", ""))
+    if drama:
         multiplier *= 1.15
 
     raw = min(base * multiplier, 100.0)
@@ -300,124 +617,101 @@ def _collapse_risk(ball_history: List[Dict], pressure: float, rrr: float) -> Dic
 
 
 # ─── Batter Cards ────────────────────────────────────────────────────────────
-def _build_batter_cards(ball_history: List[Dict], emotion_history: List[float]) -> List[Dict]:
-    """Build emotion cards for current batters."""
-    batter_stats: Dict[str, Dict] = {}
+def _new_batter_stats() -> Dict:
+    return {
+        "runs": 0, "balls": 0, "fours": 0, "sixes": 0, "dots": 0,
+        "emotions": [], "high_pressure_balls": 0, "high_pressure_runs": 0,
+    }
 
-    for i, ball in enumerate(ball_history):
-        batter = ball.get("batter", "Unknown")
-        if batter not in batter_stats:
-            batter_stats[batter] = {
-                "runs": 0, "balls": 0, "fours": 0, "sixes": 0, "dots": 0,
-                "emotions": [], "high_pressure_balls": 0, "high_pressure_runs": 0,
-            }
-        s = batter_stats[batter]
-        s["runs"] += ball.get("runs", 0)
-        s["balls"] += 1
-        s["fours"] += int(ball.get("is_four", False))
-        s["sixes"] += int(ball.get("is_six", False))
-        s["dots"] += int(ball.get("is_dot", False))
-        if i < len(emotion_history):
-            s["emotions"].append(emotion_history[i])
 
-    # Find current batters (last 2 unique batters in recent balls)
-    recent_batters = []
-    for ball in reversed(ball_history):
-        b = ball.get("batter", "")
-        if b and b not in recent_batters:
-            recent_batters.append(b)
-        if len(recent_batters) >= 2:
-            break
-
-    cards = []
-    for batter in recent_batters:
-        if batter not in batter_stats:
-            continue
-        s = batter_stats[batter]
-        balls = max(s["balls"], 1)
-        sr = round(s["runs"] / balls * 100, 1)
-        avg_emotion = round(sum(s["emotions"]) / max(len(s["emotions"]), 1), 1)
-        peak_emotion = round(max(s["emotions"]) if s["emotions"] else 0, 1)
-
-        # Resilience = SR under high pressure / overall SR
-        # Simplified: use emotion variance as proxy
-        if len(s["emotions"]) > 2:
-            import statistics
-            emotion_std = statistics.stdev(s["emotions"])
-            resilience = max(0, min(100, 100 - emotion_std * 2))
-        else:
-            resilience = 50.0
-
-        # Clutch rating
-        if sr > 150 and s["sixes"] >= 2:
-            clutch = "Elite Clutch"
-        elif sr > 120:
-            clutch = "Solid"
-        elif sr > 90:
-            clutch = "Fair"
-        else:
-            clutch = "Cold"
-
-        # Emotional profile
-        if avg_emotion > 70:
-            profile = "On Fire"
-        elif avg_emotion > 50:
-            profile = "Intense"
-        elif avg_emotion > 35:
-            profile = "Steady"
-        else:
-            profile = "Ice Cold"
-
-        cards.append({
-            "name": batter,
-            "runs": s["runs"],
-            "balls": balls,
-            "strike_rate": sr,
-            "fours": s["fours"],
-            "sixes": s["sixes"],
-            "dots": s["dots"],
-            "avg_emotion": avg_emotion,
-            "peak_emotion": peak_emotion,
-            "resilience": round(resilience, 1),
-            "clutch_rating": clutch,
-            "emotional_profile": profile,
-        })
+def _update_batter_stats(s: Dict, ball: Dict, emotion: Optional[float]) -> None:
+    s["runs"] += ball.get("runs", 0)
+    s["balls"] += 1
+    s["fours"] += int(ball.get("is_four", False))
+    s["sixes"] += int(ball.get("is_six", False))
+    s["dots"] += int(ball.get("is_dot", False))
+    if emotion is not None:
+        s["emotions"].append(emotion)
+
+
+def _batter_card(batter: str, s: Dict) -> Dict:
+    balls = max(s["balls"], 1)
+    sr = round(s["runs"] / balls * 100, 1)
+    avg_emotion = round(sum(s["emotions"]) / max(len(s["emotions"]), 1), 1)
+    peak_emotion = round(max(s["emotions"]) if s["emotions"] else 0, 1)
+
+    # Resilience = SR under high pressure / overall SR
+    # Simplified: use emotion variance as proxy
+    if len(s["emotions"]) > 2:
+        import statistics
+        emotion_std = statistics.stdev(s["emotions"])
+        resilience = max(0, min(100, 100 - emotion_std * 2))
+    else:
+        resilience = 50.0
+
+    # Clutch rating
+    if sr > 150 and s["sixes"] >= 2:
+        clutch = "Elite Clutch"
+    elif sr > 120:
+        clutch = "Solid"
+    elif sr > 90:
+        clutch = "Fair"
+    else:
+        clutch = "Cold"
+
+    # Emotional profile
+    if avg_emotion > 70:
+        profile = "On Fire"
+    elif avg_emotion > 50:
+        profile = "Intense"
+    elif avg_emotion > 35:
+        profile = "Steady"
+    else:
+        profile = "Ice Cold"
 
-    return cards
+    return {
+        "name": batter,
+        "runs": s["runs"],
+        "balls": balls,
+        "strike_rate": sr,
+        "fours": s["fours"],
+        "sixes": s["sixes"],
+        "dots": s["dots"],
+        "avg_emotion": avg_emotion,
+        "peak_emotion": peak_emotion,
+        "resilience": round(resilience, 1),
+        "clutch_rating": clutch,
+        "emotional_profile": profile,
+    }
 
 
 # ─── Key Moments ─────────────────────────────────────────────────────────────
-def _identify_key_moments(ball_data_list: List[Dict], emotion_scores: List[float]) -> List[Dict]:
-    """Top 10 moments by E(t) score."""
-    moments = []
-    for i, (ball, score) in enumerate(zip(ball_data_list, emotion_scores)):
-        event_type = "normal"
-        if ball.get("is_wicket"):
-            event_type = "wicket"
-        elif ball.get("is_six"):
-            event_type = "six"
-        elif ball.get("is_four"):
-            event_type = "boundary"
-        elif ball.get("is_drop"):
-            event_type = "drop"
-        elif score > 70:
-            event_type = "high_emotion"
-
-        if event_type != "normal" or score > 65:
-            moments.append({
-                "ball_number": i + 1,
-                "over": ball.get("over", 0),
-                "ball_in_over": ball.get("ball", 0),
-                "description": ball.get("text", ""),
-                "emotion_score": score,
-                "event_type": event_type,
-                "batter": ball.get("batter", ""),
-                "bowler": ball.get("bowler", ""),
-            })
-
-    # Sort by emotion score, take top 10
-    moments.sort(key=lambda x: x["emotion_score"], reverse=True)
-    return moments[:10]
+def _key_moment(index: int, ball: Dict, score: float) -> Optional[Dict]:
+    """Key moment entry for one ball, or None if the ball is unremarkable."""
+    event_type = "normal"
+    if ball.get("is_wicket"):
+        event_type = "wicket"
+    elif ball.get("is_six"):
+        event_type = "six"
+    elif ball.get("is_four"):
+        event_type = "boundary"
+    elif ball.get("is_drop"):
+        event_type = "drop"
+    elif score > 70:
+        event_type = "high_emotion"
+
+    if event_type == "normal" and score <= 65:
+        return None
+    return {
+        "ball_number": index + 1,
+        "over": ball.get("over", 0),
+        "ball_in_over": ball.get("ball", 0),
+        "description": ball.get("text", ""),
+        "emotion_score": score,
+        "event_type": event_type,
+        "batter": ball.get("batter", ""),
+        "bowler": ball.get("bowler", ""),
+    }
 
 
 # ─── Emotional Phases ────────────────────────────────────────────────────────
@@ -466,52 +760,46 @@ def _identify_phases(emotion_scores: List[float], ball_data_list: List[Dict]) ->
 
 
 # ─── Over-by-Over Heatmap ────────────────────────────────────────────────────
-def _over_heatmap(ball_data_list: List[Dict], emotion_scores: List[float], emotion_scores_bowling: List[float]) -> List[Dict]:
-    """Aggregate emotion data per over (both perspectives)."""
-    over_data: Dict[int, Dict] = {}
+def _new_over_stats() -> Dict:
+    return {"emotions": [], "emotions_bowl": [], "runs": 0, "wickets": 0}
 
-    for i, (ball, score, score_bowl) in enumerate(zip(ball_data_list, emotion_scores, emotion_scores_bowling)):
-        over = ball.get("over", 1)
-        if over not in over_data:
-            over_data[over] = {"emotions": [], "emotions_bowl": [], "runs": 0, "wickets": 0}
-        over_data[over]["emotions"].append(score)
-        over_data[over]["emotions_bowl"].append(score_bowl)
-        over_data[over]["runs"] += ball.get("runs", 0)
-        over_data[over]["wickets"] += int(ball.get("is_wicket", False))
 
-    heatmap = []
-    for over_num in sorted(over_data.keys()):
-        d = over_data[over_num]
-        
-        # Batting Stats
-        emotions = d["emotions"]
-        avg_emotion = round(sum(emotions) / len(emotions), 1)
-        peak_emotion = round(max(emotions), 1)
-        
-        # Bowling Stats
-        emotions_bowl = d["emotions_bowl"]
-        avg_emotion_bowl = round(sum(emotions_bowl) / len(emotions_bowl), 1)
-        peak_emotion_bowl = round(max(emotions_bowl), 1)
-
-        def get_intensity(avg):
-            if avg >= 70: return "extreme"
-            elif avg >= 50: return "high"
-            elif avg >= 30: return "medium"
-            else: return "low"
+def _update_over_stats(d: Dict, ball: Dict, score: float, score_bowl: float) -> None:
+    d["emotions"].append(score)
+    d["emotions_bowl"].append(score_bowl)
+    d["runs"] += ball.get("runs", 0)
+    d["wickets"] += int(ball.get("is_wicket", False))
 
-        heatmap.append({
-            "over": over_num,
-            "avg_emotion": avg_emotion,
-            "peak_emotion": peak_emotion,
-            "avg_emotion_bowling": avg_emotion_bowl,
-            "peak_emotion_bowling": peak_emotion_bowl,
-            "runs": d["runs"],
-            "wickets": d["wickets"],
-            "intensity": get_intensity(avg_emotion),
-            "intensity_bowling": get_intensity(avg_emotion_bowl),
-        })
 
-    return heatmap
+def _heatmap_intensity(avg: float) -> str:
+    if avg >= 70: return "extreme"
+    elif avg >= 50: return "high"
+    elif avg >= 30: return "medium"
+    else: return "low"
+
+
+def _heatmap_row(over_num: int, d: Dict) -> Dict:
+    # Batting Stats
+    emotions = d["emotions"]
+    avg_emotion = round(sum(emotions) / len(emotions), 1)
+    peak_emotion = round(max(emotions), 1)
+
+    # Bowling Stats
+    emotions_bowl = d["emotions_bowl"]
+    avg_emotion_bowl = round(sum(emotions_bowl) / len(emotions_bowl), 1)
+    peak_emotion_bowl = round(max(emotions_bowl), 1)
+
+    return {
+        "over": over_num,
+        "avg_emotion": avg_emotion,
+        "peak_emotion": peak_emotion,
+        "avg_emotion_bowling": avg_emotion_bowl,
+        "peak_emotion_bowling": peak_emotion_bowl,
+        "runs": d["runs"],
+        "wickets": d["wickets"],
+        "intensity": _heatmap_intensity(avg_emotion),
+        "intensity_bowling": _heatmap_intensity(avg_emotion_bowl),
+    }
 
 
 # ─── Phase Label ─────────────────────────────────────────────────────────────
@@ -526,58 +814,102 @@ def _phase_label(score: float) -> str:
         return "CALM"
 
 
-# ─── Main Analysis Function ───────────────────────────────────────────────────
-def analyze_match(commentary: List[Dict], match_info: Dict) -> Dict:
+# ─── Incremental Analyzer ────────────────────────────────────────────────────
+class MatchAnalyzer:
     """
-    Full match emotion analysis.
-    Returns structured data for all dashboard components.
+    Stateful ball-by-ball analysis for live matches.
+    add_ball() carries the EMAs, score, momentum window and running aggregates
+    forward in O(1); snapshot() returns the same structure as analyze_match()
+    without re-scoring or replaying earlier balls.
     """
-    total_balls = match_info.get("total_balls", len(commentary))
-    target = match_info.get("target", 0)
 
-    ball_emotions: List[float] = []
-    ball_emotions_bowling: List[float] = []
-    ball_pressures: List[float] = []
-    ball_momentums: List[float] = []
-    ball_history: List[Dict] = []
+    MOMENTUM_WINDOW = 12
+    COLLAPSE_WINDOW = 18
+    KEY_MOMENT_LIMIT = 10
+    # add_ball() only appends to these, so a checkpoint keeps their lengths
+    _APPEND_ONLY = ("balls", "emotions", "emotions_bowling", "rows", "momentum_shifts")
+
+    def __init__(self, match_info: Dict, total_balls: Optional[int] = None):
+        self.match_info = match_info
+        self.total_balls = match_info.get("total_balls", total_balls if total_balls is not None else 120)
+        self.target = match_info.get("target", 0)
+
+        self.balls: List[Dict] = []
+        self.emotions: List[float] = []
+        self.emotions_bowling: List[float] = []
+        self.rows: List[Dict] = []
+        self.momentum_shifts: List[Dict] = []
+
+        self.prev_ema = 20.0
+        self.prev_ema_bowling = 20.0
+        self.pressure = 0.0
+        self.momentum = 0.0
+        self.wickets_fallen = 0
+        self.runs_scored = 0
+
+        self._momentum_window: deque = deque(maxlen=self.MOMENTUM_WINDOW)
+        self._collapse_window: deque = deque(maxlen=self.COLLAPSE_WINDOW)
+        self._emotion_sum = 0.0
+        self._emotion_bowling_sum = 0.0
+        self._pressure_sum = 0.0
+        self._peak_emotion: Optional[float] = None
+        self._peak_emotion_bowling: Optional[float] = None
+        self._batter_stats: Dict[str, Dict] = {}
+        self._recent_batters: List[str] = []
+        self._over_data: Dict[int, Dict] = {}
+        self._key_moments: List[Dict] = []
+        self._key_moment_keys: List[float] = []
+        self._new_key_moment: Optional[Dict] = None
+
+    def checkpoint(self) -> Dict:
+        """
+        State for rollback(). Per-ball lists are recorded by length, so the
+        cost depends on players and overs, not on balls already added.
+        """
+        state = {key: value for key, value in vars(self).items()
+                 if key not in self._APPEND_ONLY and key != "match_info"}
+        return {"state": copy.deepcopy(state), "lengths": {key: len(getattr(self, key)) for key in self._APPEND_ONLY}}
+
+    def rollback(self, checkpoint: Dict) -> None:
+        """Undo every add_ball() since `checkpoint` was taken."""
+        for key, length in checkpoint["lengths"].items():
+            del getattr(self, key)[length:]
+        vars(self).update(checkpoint["state"])
+
+    def add_ball(self, ball: Dict, sentiment: Optional[float] = None) -> Dict:
+        """Ingest the next delivery and return its ball_by_ball row."""
+        i = len(self.balls)
 
-    prev_ema = 20.0
-    prev_ema_bowling = 20.0
-    prev_momentum = 0.0
-    wickets_fallen = 0
-    runs_scored = 0
-    momentum_shifts = []
-
-    for i, ball in enumerate(commentary):
         # Track state
         if ball.get("is_wicket"):
-            wickets_fallen += 1
-        runs_scored += ball.get("runs", 0)
+            self.wickets_fallen += 1
+        self.runs_scored += ball.get("runs", 0)
 
         # Compute runs needed and balls remaining
-        runs_needed = max(target - runs_scored, 0)
-        balls_remaining = max(total_balls - (i + 1), 0)
-        rrr = (runs_needed / balls_remaining * 6) if balls_remaining > 0 else 0
+        runs_needed = max(self.target - self.runs_scored, 0)
+        balls_remaining = max(self.total_balls - (i + 1), 0)
 
         # Sentiment
-        sentiment = _sentiment_score(ball.get("text", ""))
+        if sentiment is None:
+            sentiment = _sentiment_score(ball.get("text", ""))
 
         # Pressure
         pressure = _pressure_index(
             runs_needed=runs_needed,
             balls_remaining=balls_remaining,
-            wickets_fallen=wickets_fallen,
-            total_balls=total_balls,
+            wickets_fallen=self.wickets_fallen,
+            total_balls=self.total_balls,
             ball_number=i + 1,
         )
 
         # Momentum
-        ball_history.append(ball)
-        momentum = _compute_momentum(ball_history)
+        prev_momentum = self.momentum
+        self._momentum_window.append(ball)
+        momentum = _compute_momentum(list(self._momentum_window))
 
         # Momentum shift detection
         if i > 0 and _detect_momentum_shift(prev_momentum, momentum):
-            momentum_shifts.append({
+            self.momentum_shifts.append({
                 "ball_number": i + 1,
                 "over": ball.get("over", 0),
                 "from": round(prev_momentum, 2),
@@ -586,101 +918,683 @@ def analyze_match(commentary: List[Dict], match_info: Dict) -> Dict:
             })
 
         # E(t) - Batting
-        emotion = _emotion_score(sentiment, pressure, momentum, ball, prev_ema)
-        
+        drama = _has_drama(ball.get("text", ""))
+        emotion = _emotion_score(sentiment, pressure, momentum, ball, self.prev_ema, drama=drama)
+
         # E(t) - Bowling (Invert sentiment and momentum, keep pressure)
         # Note: Pressure component might need adjustment, but for now assuming "Game Pressure" applies to both
-        emotion_bowling = _emotion_score(-sentiment, pressure, -momentum, ball, prev_ema_bowling)
+        emotion_bowling = _emotion_score(-sentiment, pressure, -momentum, ball, self.prev_ema_bowling, drama=drama)
+
+        self.balls.append(ball)
+        self.emotions.append(emotion)
+        self.emotions_bowling.append(emotion_bowling)
+        self._collapse_window.append(ball)
+
+        self.prev_ema = emotion
+        self.prev_ema_bowling = emotion_bowling
+        self.pressure = pressure
+        self.momentum = momentum
+
+        # Running aggregates
+        self._emotion_sum += emotion
+        self._emotion_bowling_sum += emotion_bowling
+        self._pressure_sum += pressure
+        if self._peak_emotion is None or emotion > self._peak_emotion:
+            self._peak_emotion = emotion
+        if self._peak_emotion_bowling is None or emotion_bowling > self._peak_emotion_bowling:
+            self._peak_emotion_bowling = emotion_bowling
+
+        # Batter stats and current pair (most recent first)
+        batter = ball.get("batter", "Unknown")
+        if batter not in self._batter_stats:
+            self._batter_stats[batter] = _new_batter_stats()
+        _update_batter_stats(self._batter_stats[batter], ball, emotion)
+        current = ball.get("batter", "")
+        if current:
+            if current in self._recent_batters:
+                self._recent_batters.remove(current)
+            self._recent_batters.insert(0, current)
+            del self._recent_batters[2:]
+
+        # Over heatmap
+        over = ball.get("over", 1)
+        if over not in self._over_data:
+            self._over_data[over] = _new_over_stats()
+        _update_over_stats(self._over_data[over], ball, emotion, emotion_bowling)
+
+        # Key moments: bounded list kept in the order a stable sort would give
+        moment = _key_moment(i, ball, emotion)
+        self._new_key_moment = None
+        if moment:
+            key = -moment["emotion_score"]
+            pos = bisect.bisect_right(self._key_moment_keys, key)
+            if pos < self.KEY_MOMENT_LIMIT:
+                self._key_moment_keys.insert(pos, key)
+                self._key_moments.insert(pos, moment)
+                del self._key_moment_keys[self.KEY_MOMENT_LIMIT:]
+                del self._key_moments[self.KEY_MOMENT_LIMIT:]
+                self._new_key_moment = moment
+
+        row = {
+            "ball_number": i + 1,
+            "over": ball.get("over", 0),
+            "text": ball.get("text", ""),
+            "runs": ball.get("runs", 0),
+            "is_wicket": ball.get("is_wicket", False),
+            "is_four": ball.get("is_four", False),
+            "is_six": ball.get("is_six", False),
+            "batter": ball.get("batter", ""),
+            "bowler": ball.get("bowler", ""),
+            "emotion_score": emotion,
+            "emotion_score_bowling": emotion_bowling,
+            "pressure": pressure,
+            "momentum": momentum,
+            "phase": _phase_label(emotion),
+        }
+        self.rows.append(row)
+        return row
+
+    def _summary(self) -> Dict:
+        n = len(self.balls)
+        return {
+            "avg_emotion": round(self._emotion_sum / max(n, 1), 1),
+            "peak_emotion": round(self._peak_emotion if n else 0, 1),
+            "avg_emotion_bowling": round(self._emotion_bowling_sum / max(n, 1), 1),
+            "peak_emotion_bowling": round(self._peak_emotion_bowling if n else 0, 1),
+            "avg_pressure": round(self._pressure_sum / max(n, 1), 3),
+            "momentum_shifts": len(self.momentum_shifts),
+            "total_balls": n,
+            "wickets_fallen": self.wickets_fallen,
+            "runs_scored": self.runs_scored,
+        }
 
-        ball_emotions.append(emotion)
-        ball_emotions_bowling.append(emotion_bowling)
-        ball_pressures.append(pressure)
-        ball_momentums.append(momentum)
+    def _current_state(self) -> Dict:
+        n = len(self.balls)
+        current_emotion = self.emotions[-1] if n else 0
+        current_emotion_bowling = self.emotions_bowling[-1] if n else 0
+        current_pressure = self.pressure if n else 0
+        current_momentum = self.momentum if n else 0
+
+        # Collapse risk (using last state)
+        runs_needed_final = max(self.target - self.runs_scored, 0)
+        balls_remaining_final = max(self.total_balls - n, 0)
+        rrr_final = (runs_needed_final / balls_remaining_final * 6) if balls_remaining_final > 0 else 0
+        collapse = _collapse_risk(list(self._collapse_window), current_pressure, rrr_final)
+
+        # Batter cards
+        batter_cards = [
+            _batter_card(batter, self._batter_stats[batter])
+            for batter in self._recent_batters
+            if batter in self._batter_stats
+        ]
+
+        return {
+            "emotion_score": round(current_emotion, 1),
+            "emotion_score_bowling": round(current_emotion_bowling, 1),
+            "pressure": round(current_pressure, 3),
+            "momentum": round(current_momentum, 3),
+            "phase": _phase_label(current_emotion),
+            "collapse_risk": collapse,
+            "batter_cards": batter_cards,
+        }
 
-        prev_ema = emotion
-        prev_ema_bowling = emotion_bowling
-        prev_momentum = momentum
+    def delta(self) -> Dict:
+        """
+        What the latest add_ball() changed: its ball_by_ball row, the new
+        summary and current_state, the heatmap row of its over, and the
+        momentum shift / key moment it produced, if any. Cost is independent
+        of how many balls came before.
+        """
+        if not self.balls:
+            raise ValueError("No balls added yet")
+        row = self.rows[-1]
+        over = self.balls[-1].get("over", 1)
+        delta = {
+            "ball": row,
+            "summary": self._summary(),
+            "current_state": self._current_state(),
+            "heatmap": _heatmap_row(over, self._over_data[over]),
+        }
+        if self.momentum_shifts and self.momentum_shifts[-1]["ball_number"] == row["ball_number"]:
+            delta["momentum_shift"] = self.momentum_shifts[-1]
+        if self._new_key_moment is not None:
+            delta["key_moment"] = self._new_key_moment
+        return delta
+
+    def snapshot(self) -> Dict:
+        """Current analysis in the analyze_match() output structure."""
+        return {
+            "match_info": self.match_info,
+            "summary": self._summary(),
+            "ball_by_ball": list(self.rows),
+            "current_state": self._current_state(),
+            "key_moments": list(self._key_moments),
+            "emotional_phases": _identify_phases(self.emotions, self.balls),
+            "emotional_phases_bowling": _identify_phases(self.emotions_bowling, self.balls),
+            "heatmap": [_heatmap_row(over_num, self._over_data[over_num]) for over_num in sorted(self._over_data.keys())],
+            "momentum_shifts": list(self.momentum_shifts), # Could also produce momentum_shifts_bowling
+        }
 
-    # Aggregate outputs
-    avg_emotion = round(sum(ball_emotions) / max(len(ball_emotions), 1), 1)
-    peak_emotion = round(max(ball_emotions) if ball_emotions else 0, 1)
-    
-    avg_emotion_bowling = round(sum(ball_emotions_bowling) / max(len(ball_emotions_bowling), 1), 1)
-    peak_emotion_bowling = round(max(ball_emotions_bowling) if ball_emotions_bowling else 0, 1)
 
-    avg_pressure = round(sum(ball_pressures) / max(len(ball_pressures), 1), 3)
-    current_emotion = ball_emotions[-1] if ball_emotions else 0
-    current_emotion_bowling = ball_emotions_bowling[-1] if ball_emotions_bowling else 0
-    current_pressure = ball_pressures[-1] if ball_pressures else 0
-    current_momentum = ball_momentums[-1] if ball_momentums else 0
+def match_deltas(commentary: List[Dict], match_info: Dict) -> List[Dict]:
+    """
+    MatchAnalyzer.delta() after each ball of a recorded innings, with the
+    commentary scored in one batch up front. Replaying the deltas in order
+    rebuilds analyze_match()'s per-ball rows, final state and heatmap.
+    """
+    analyzer = MatchAnalyzer(match_info, total_balls=len(commentary))
+    sentiments = _sentiment_scores([ball.get("text", "") for ball in commentary])
+    deltas = []
+    for ball, sentiment in zip(commentary, sentiments):
+        analyzer.add_ball(ball, sentiment=sentiment)
+        deltas.append(analyzer.delta())
+    return deltas
+
 
-    # Collapse risk (using last state)
-    last_ball = commentary[-1] if commentary else {}
-    runs_needed_final = max(target - runs_scored, 0)
-    balls_remaining_final = max(total_balls - len(commentary), 0)
-    rrr_final = (runs_needed_final / balls_remaining_final * 6) if balls_remaining_final > 0 else 0
-    collapse = _collapse_risk(ball_history, current_pressure, rrr_final)
+# ─── Columnar Match Frame ────────────────────────────────────────────────────
+# Wickets fallen -> wicket pressure, precomputed with math.exp so the
+# vectorized path matches _pressure_index exactly (capped at 1.0 from 10).
+_WICKET_PRESSURE = np.array([
+    min((math.exp(w / 4.0) - 1) / (math.exp(10 / 4.0) - 1), 1.0) for w in range(11)
+])
 
-    # Batter cards
-    batter_cards = _build_batter_cards(ball_history, ball_emotions)
 
-    # Key moments (using batting emtion for now, or could combine max of both)
-    key_moments = _identify_key_moments(commentary, ball_emotions)
+class MatchFrame:
+    """
+    Struct-of-arrays view of a commentary list, built once per analysis.
+    Per-ball fields become NumPy columns; batters and bowlers are interned
+    to integer ids so groupbys run as bincounts instead of dict lookups.
+    """
 
-    # Emotional phases
-    phases = _identify_phases(ball_emotions, commentary)
-    phases_bowling = _identify_phases(ball_emotions_bowling, commentary)
+    def __init__(self, commentary: List[Dict]):
+        n = len(commentary)
+        self.commentary = commentary
+        self.n = n
+        self.texts: List[str] = [ball.get("text", "") for ball in commentary]
+
+        self.runs = np.fromiter((ball.get("runs", 0) for ball in commentary), dtype=np.int64, count=n)
+        self.is_wicket = np.fromiter((bool(ball.get("is_wicket")) for ball in commentary), dtype=bool, count=n)
+        self.is_four = np.fromiter((bool(ball.get("is_four")) for ball in commentary), dtype=bool, count=n)
+        self.is_six = np.fromiter((bool(ball.get("is_six")) for ball in commentary), dtype=bool, count=n)
+        self.is_dot = np.fromiter((bool(ball.get("is_dot")) for ball in commentary), dtype=bool, count=n)
+        self.is_drop = np.fromiter((bool(ball.get("is_drop")) for ball in commentary), dtype=bool, count=n)
+        self.is_drama = np.fromiter((_has_drama(text) for text in self.texts), dtype=bool, count=n)
+        # Heatmap buckets default a missing over to 1, ball rows default it to 0
+        self.over = np.asarray([ball.get("over", 1) for ball in commentary]) if n else np.zeros(0, dtype=np.int64)
+
+        self.batter_names, self.batter_ids = self._intern(ball.get("batter", "Unknown") for ball in commentary)
+        self.bowler_names, self.bowler_ids = self._intern(ball.get("bowler", "") for ball in commentary)
+
+    @staticmethod
+    def _intern(values) -> tuple:
+        names: List[str] = []
+        index: Dict[str, int] = {}
+        ids = []
+        for value in values:
+            if value not in index:
+                index[value] = len(names)
+                names.append(value)
+            ids.append(index[value])
+        return names, np.asarray(ids, dtype=np.int32)
+
+    def __len__(self) -> int:
+        return self.n
+
+
+def _pressure_kernel(
+    runs_needed: np.ndarray,
+    balls_remaining: np.ndarray,
+    wickets_fallen: np.ndarray,
+    ball_number: np.ndarray,
+    total_balls: int,
+) -> np.ndarray:
+    """Unrounded _pressure_index over arrays of match states."""
+    with np.errstate(divide="ignore", invalid="ignore"):
+        # RRR pressure
+        rrr = (runs_needed / balls_remaining) * 6
+        rrr_pressure = np.where(
+            balls_remaining > 0,
+            np.minimum(rrr / 15.0, 1.0),
+            np.where(runs_needed > 0, 1.0, 0.0),
+        )
 
-    # Over heatmap
-    heatmap = _over_heatmap(commentary, ball_emotions, ball_emotions_bowling)
+        # Wickets pressure (exponential)
+        wicket_pressure = _WICKET_PRESSURE[np.minimum(wickets_fallen, 10)]
 
-    # Current phase label
-    current_phase = _phase_label(current_emotion)
+        # Phase pressure
+        phase_pressure = (ball_number / max(total_balls, 1)) ** 1.5
 
-    return {
-        "match_info": match_info,
-        "summary": {
+        # Close match factor
+        chase_completion = 1.0 - (runs_needed / np.maximum(runs_needed + (ball_number * 1.0), 1))
+        close_match = np.where(
+            (runs_needed > 0) & (balls_remaining > 0),
+            1.0 - np.abs(chase_completion - 0.5) * 2,
+            0.0,
+        )
+
+    pressure = (
+        0.35 * rrr_pressure +
+        0.25 * wicket_pressure +
+        0.20 * phase_pressure +
+        0.20 * close_match
+    )
+    return np.clip(pressure, 0.0, 1.0)
+
+
+def _frame_pressure(frame: MatchFrame, target: int, total_balls: int) -> np.ndarray:
+    """Vectorized _pressure_index over every ball of the frame."""
+    ball_number = np.arange(1, frame.n + 1)
+    runs_needed = np.maximum(target - np.cumsum(frame.runs), 0)
+    balls_remaining = np.maximum(total_balls - ball_number, 0)
+    wickets_fallen = np.cumsum(frame.is_wicket)
+
+    pressure = _pressure_kernel(runs_needed, balls_remaining, wickets_fallen, ball_number, total_balls)
+    return np.array([round(p, 4) for p in pressure.tolist()])
+
+
+def _frame_momentum(frame: MatchFrame, window: int = 12) -> np.ndarray:
+    """
+    Vectorized _compute_momentum: a weighted convolution over the last
+    `window` balls, accumulated oldest-to-newest like the scalar version.
+    """
+    n = frame.n
+    ball_score = frame.runs / 6.0 - frame.is_wicket * 1.0
+    padded = np.concatenate([np.zeros(window - 1), ball_score])
+    # Balls actually in each window; weights run 1..length over those balls
+    length = np.minimum(np.arange(1, n + 1), window)
+
+    weighted_sum = np.zeros(n)
+    for p in range(window):
+        weight = np.maximum(p - (window - length) + 1, 0)
+        weighted_sum += padded[p:p + n] * weight
+
+    momentum = np.clip(weighted_sum / (length * (length + 1) // 2), -1.0, 1.0)
+    return np.array([round(m, 4) for m in momentum.tolist()])
+
+
+def _multiplier_kernel(
+    pressures: np.ndarray,
+    is_wicket: np.ndarray,
+    is_six: np.ndarray,
+    is_four: np.ndarray,
+    is_drop: Optional[np.ndarray] = None,
+    is_drama: Optional[np.ndarray] = None,
+) -> np.ndarray:
+    """E(t) event multipliers, applied in _emotion_score order."""
+    multiplier = np.ones(np.shape(pressures))
+    multiplier = np.where(is_wicket, multiplier * 1.4, multiplier)
+    multiplier = np.where(is_six & (pressures > 0.6), multiplier * 1.5,
+                          np.where(is_six, multiplier * 1.2, multiplier))
+    multiplier = np.where(is_four & (pressures > 0.7), multiplier * 1.3,
+                          np.where(is_four, multiplier * 1.1, multiplier))
+    if is_drop is not None:
+        multiplier = np.where(is_drop, multiplier * 1.3, multiplier)
+    if is_drama is not None:
+        multiplier = np.where(is_drama, multiplier * 1.15, multiplier)
+    return multiplier
+
+
+def _raw_emotion_kernel(
+    sentiments: np.ndarray,
+    pressures: np.ndarray,
+    momentums: np.ndarray,
+    multipliers: np.ndarray,
+) -> np.ndarray:
+    """E(t) before EMA smoothing, capped at 100."""
+    S = (sentiments + 1) / 2
+    P = pressures
+    M = (momentums + 1) / 2
+
+    base = 100 * (0.25 * S + 0.40 * P + 0.15 * M + 0.20 * S * P)
+    return np.minimum(base * multipliers, 100.0)
+
+
+def _frame_multipliers(frame: MatchFrame, pressures: np.ndarray) -> np.ndarray:
+    """E(t) event multipliers for every ball of the frame."""
+    return _multiplier_kernel(
+        pressures, frame.is_wicket, frame.is_six, frame.is_four, frame.is_drop, frame.is_drama,
+    )
+
+
+def _frame_emotion(
+    sentiments: np.ndarray,
+    pressures: np.ndarray,
+    momentums: np.ndarray,
+    multipliers: np.ndarray,
+    prev_ema: float = 20.0,
+    alpha: float = 0.3,
+) -> List[float]:
+    """Vectorized raw E(t); only the EMA recurrence runs as a loop."""
+    raw = _raw_emotion_kernel(sentiments, pressures, momentums, multipliers)
+
+    emotions = []
+    for value in raw.tolist():
+        prev_ema = round(alpha * value + (1 - alpha) * prev_ema, 2)
+        emotions.append(prev_ema)
+    return emotions
+
+
+def _frame_momentum_shifts(frame: MatchFrame, momentums: np.ndarray) -> List[Dict]:
+    prev, curr = momentums[:-1], momentums[1:]
+    shifted = (prev != 0.0) & ((prev > 0) != (curr > 0)) & (np.abs(curr - prev) > 0.4)
+    shifts = []
+    for i in (np.flatnonzero(shifted) + 1).tolist():
+        ball = frame.commentary[i]
+        shifts.append({
+            "ball_number": i + 1,
+            "over": ball.get("over", 0),
+            "from": round(float(momentums[i - 1]), 2),
+            "to": round(float(momentums[i]), 2),
+            "description": ball.get("text", "")[:80],
+        })
+    return shifts
+
+
+def _frame_key_moments(frame: MatchFrame, emotions: np.ndarray, limit: int = 10) -> List[Dict]:
+    """Top moments by E(t) score; ties keep ball order like a stable sort."""
+    notable = frame.is_wicket | frame.is_six | frame.is_four | frame.is_drop | (emotions > 65)
+    candidates = np.flatnonzero(notable)
+    order = candidates[np.argsort(-emotions[candidates], kind="stable")][:limit]
+    return [
+        _key_moment(i, frame.commentary[i], float(emotions[i]))
+        for i in order.tolist()
+    ]
+
+
+def _frame_phases(frame: MatchFrame, emotions: np.ndarray) -> List[Dict]:
+    """
+    Vectorized _identify_phases: 4 equal chunks. Peaks use reduceat; the
+    means keep the baseline's left-to-right Python sum so rounding matches.
+    """
+    n = frame.n
+    if n == 0:
+        return []
+
+    quarter = max(n // 4, 1)
+    names = ["Calm Opening", "Building Tension", "High Intensity", "Peak Emotion"]
+    bounds = [(0, quarter), (quarter, quarter * 2), (quarter * 2, quarter * 3), (quarter * 3, n)]
+    bounds = [(name, start, end) for name, (start, end) in zip(names, bounds) if start < min(end, n)]
+    starts = np.array([start for _, start, _ in bounds])
+    ends = np.array([min(end, n) for _, _, end in bounds])
+
+    peaks = np.maximum.reduceat(emotions, starts)
+    events = np.flatnonzero(frame.is_wicket | frame.is_six)
+    first_event = np.searchsorted(events, starts)
+
+    phases = []
+    for k, (name, start, end) in enumerate(bounds):
+        stop = int(ends[k])
+        key_event = ""
+        if first_event[k] < len(events) and events[first_event[k]] < stop:
+            key_event = frame.texts[events[first_event[k]]][:80]
+
+        phases.append({
+            "name": name,
+            "over_start": frame.commentary[start].get("over", 0),
+            "over_end": frame.commentary[stop - 1].get("over", 0),
+            "avg_et": round(sum(emotions[start:stop].tolist()) / (stop - start), 1),
+            "peak_et": round(float(peaks[k]), 1),
+            "key_event": key_event or "Steady play",
+        })
+
+    return phases
+
+
+def _frame_heatmap(frame: MatchFrame, emotions: np.ndarray, emotions_bowling: np.ndarray) -> List[Dict]:
+    """Vectorized _over_heatmap: per-over groupby via bincount."""
+    if frame.n == 0:
+        return []
+    overs, inverse = np.unique(frame.over, return_inverse=True)
+    counts = np.bincount(inverse)
+    sums = np.bincount(inverse, weights=emotions)
+    sums_bowl = np.bincount(inverse, weights=emotions_bowling)
+    runs = np.bincount(inverse, weights=frame.runs).astype(np.int64)
+    wickets = np.bincount(inverse, weights=frame.is_wicket).astype(np.int64)
+    peaks = np.full(len(overs), -np.inf)
+    peaks_bowl = np.full(len(overs), -np.inf)
+    np.maximum.at(peaks, inverse, emotions)
+    np.maximum.at(peaks_bowl, inverse, emotions_bowling)
+
+    heatmap = []
+    for k, over_num in enumerate(overs.tolist()):
+        avg_emotion = round(float(sums[k]) / int(counts[k]), 1)
+        avg_emotion_bowl = round(float(sums_bowl[k]) / int(counts[k]), 1)
+        heatmap.append({
+            "over": over_num,
             "avg_emotion": avg_emotion,
-            "peak_emotion": peak_emotion,
-            "avg_emotion_bowling": avg_emotion_bowling,
-            "peak_emotion_bowling": peak_emotion_bowling,
-            "avg_pressure": avg_pressure,
+            "peak_emotion": round(float(peaks[k]), 1),
+            "avg_emotion_bowling": avg_emotion_bowl,
+            "peak_emotion_bowling": round(float(peaks_bowl[k]), 1),
+            "runs": int(runs[k]),
+            "wickets": int(wickets[k]),
+            "intensity": _heatmap_intensity(avg_emotion),
+            "intensity_bowling": _heatmap_intensity(avg_emotion_bowl),
+        })
+    return heatmap
+
+
+def _frame_batter_cards(frame: MatchFrame, emotions: np.ndarray) -> List[Dict]:
+    """Batter cards for the current pair using interned batter ids."""
+    # Find current batters (last 2 unique batters in recent balls)
+    recent_batters = []
+    for ball in reversed(frame.commentary):
+        b = ball.get("batter", "")
+        if b and b not in recent_batters:
+            recent_batters.append(b)
+        if len(recent_batters) >= 2:
+            break
+
+    index = {name: k for k, name in enumerate(frame.batter_names)}
+    cards = []
+    for batter in recent_batters:
+        if batter not in index:
+            continue
+        mask = frame.batter_ids == index[batter]
+        s = _new_batter_stats()
+        s["runs"] = int(frame.runs[mask].sum())
+        s["balls"] = int(mask.sum())
+        s["fours"] = int(frame.is_four[mask].sum())
+        s["sixes"] = int(frame.is_six[mask].sum())
+        s["dots"] = int(frame.is_dot[mask].sum())
+        s["emotions"] = emotions[mask].tolist()
+        cards.append(_batter_card(batter, s))
+    return cards
+
+
+# ─── Main Analysis Function ───────────────────────────────────────────────────
+# Top-level keys of the analyze_match() result, in output order.
+ANALYSIS_SECTIONS = (
+    "match_info",
+    "summary",
+    "ball_by_ball",
+    "current_state",
+    "key_moments",
+    "emotional_phases",
+    "emotional_phases_bowling",
+    "heatmap",
+    "momentum_shifts",
+)
+# Keys of each ball_by_ball row, in output order
+BALL_FIELDS = (
+    "ball_number",
+    "over",
+    "text",
+    "runs",
+    "is_wicket",
+    "is_four",
+    "is_six",
+    "batter",
+    "bowler",
+    "emotion_score",
+    "emotion_score_bowling",
+    "pressure",
+    "momentum",
+    "phase",
+)
+# Sections that need the batting / bowling E(t) series (and so sentiment)
+_EMOTION_SECTIONS = frozenset(ANALYSIS_SECTIONS) - {"match_info", "momentum_shifts"}
+_BOWLING_SECTIONS = _EMOTION_SECTIONS - {"key_moments", "emotional_phases"}
+
+
+# Bump when the E(t) formulas or the output structure change, so cached
+# analyses from an older engine are not served.
+ENGINE_VERSION = "2.1"
+_analysis_fingerprint: Optional[str] = None
+
+
+def analysis_fingerprint() -> str:
+    """
+    Identity of everything besides the input that shapes analyze_match()
+    output: engine version, sentiment mode and the model files in use.
+    """
+    global _analysis_fingerprint
+    if _analysis_fingerprint is None:
+        model = _backend_fingerprint(EMOTION_BACKEND) if os.path.exists(MODEL_PATH) else "keywords"
+        routing = f"cascade@{LEXICON_CONFIDENCE}" if SENTIMENT_MODE == "cascade" else SENTIMENT_MODE
+        _analysis_fingerprint = f"{ENGINE_VERSION}:{routing}:{model}"
+    return _analysis_fingerprint
+
+
+def _resolve_sections(sections: Optional[List[str]]) -> frozenset:
+    if sections is None:
+        return frozenset(ANALYSIS_SECTIONS)
+    unknown = sorted(set(sections) - set(ANALYSIS_SECTIONS))
+    if unknown:
+        raise ValueError(f"Unknown analysis section(s): {', '.join(unknown)}")
+    return frozenset(sections)
+
+
+def select_balls(
+    rows: List[Dict],
+    start: Optional[int] = None,
+    end: Optional[int] = None,
+    fields: Optional[List[str]] = None,
+) -> List[Dict]:
+    """
+    Balls `start`..`end` (1-based ball numbers, inclusive) of a ball_by_ball
+    list, keeping only `fields`; ball_number is always kept so slices can be
+    stitched back together.
+    """
+    if fields is not None:
+        unknown = sorted(set(fields) - set(BALL_FIELDS))
+        if unknown:
+            raise ValueError(f"Unknown ball field(s): {', '.join(unknown)}")
+    window = rows[max((start or 1) - 1, 0):end]
+    if fields is None:
+        return window
+    keep = ["ball_number"] + [field for field in BALL_FIELDS if field in fields and field != "ball_number"]
+    return [{field: row[field] for field in keep} for row in window]
+
+
+def analyze_match(commentary: List[Dict], match_info: Dict, sections: Optional[List[str]] = None) -> Dict:
+    """
+    Full match emotion analysis.
+    Returns structured data for all dashboard components.
+    `sections` limits the result to those keys of ANALYSIS_SECTIONS and
+    skips the work only the others need; sentiment is not run at all when
+    no emotion-based section is requested.
+    """
+    wanted = _resolve_sections(sections)
+    total_balls = match_info.get("total_balls", len(commentary))
+    target = match_info.get("target", 0)
+    frame = MatchFrame(commentary)
+    result: Dict[str, Any] = {}
+
+    momentums = _frame_momentum(frame)
+    momentum_shifts = _frame_momentum_shifts(frame, momentums)
+    ball_momentums = momentums.tolist()
+
+    if wanted & _EMOTION_SECTIONS:
+        # Sentiment for the whole innings in length-sorted mini-batches
+        sentiments = np.asarray(_sentiment_scores(frame.texts), dtype=float)
+
+        # Pressure and event multipliers as column kernels
+        pressures = _frame_pressure(frame, target, total_balls)
+        multipliers = _frame_multipliers(frame, pressures)
+
+        # E(t) - Batting
+        ball_emotions = _frame_emotion(sentiments, pressures, momentums, multipliers)
+        emotions = np.asarray(ball_emotions, dtype=float)
+        ball_pressures = pressures.tolist()
+
+    if wanted & _BOWLING_SECTIONS:
+        # E(t) - Bowling (Invert sentiment and momentum, keep pressure)
+        # Note: Pressure component might need adjustment, but for now assuming "Game Pressure" applies to both
+        ball_emotions_bowling = _frame_emotion(-sentiments, pressures, -momentums, multipliers)
+        emotions_bowling = np.asarray(ball_emotions_bowling, dtype=float)
+
+    wickets_fallen = int(frame.is_wicket.sum())
+    runs_scored = int(frame.runs.sum())
+
+    if "match_info" in wanted:
+        result["match_info"] = match_info
+
+    if "summary" in wanted:
+        # Aggregate outputs
+        result["summary"] = {
+            "avg_emotion": round(sum(ball_emotions) / max(len(ball_emotions), 1), 1),
+            "peak_emotion": round(max(ball_emotions) if ball_emotions else 0, 1),
+            "avg_emotion_bowling": round(sum(ball_emotions_bowling) / max(len(ball_emotions_bowling), 1), 1),
+            "peak_emotion_bowling": round(max(ball_emotions_bowling) if ball_emotions_bowling else 0, 1),
+            "avg_pressure": round(sum(ball_pressures) / max(len(ball_pressures), 1), 3),
             "momentum_shifts": len(momentum_shifts),
             "total_balls": len(commentary),
             "wickets_fallen": wickets_fallen,
             "runs_scored": runs_scored,
-        },
-        "ball_by_ball": [
+        }
+
+    if "ball_by_ball" in wanted:
+        result["ball_by_ball"] = [
             {
                 "ball_number": i + 1,
-                "over": commentary[i].get("over", 0),
-                "text": commentary[i].get("text", ""),
-                "runs": commentary[i].get("runs", 0),
-                "is_wicket": commentary[i].get("is_wicket", False),
-                "is_four": commentary[i].get("is_four", False),
-                "is_six": commentary[i].get("is_six", False),
-                "batter": commentary[i].get("batter", ""),
-                "bowler": commentary[i].get("bowler", ""),
+                "over": ball.get("over", 0),
+                "text": ball.get("text", ""),
+                "runs": ball.get("runs", 0),
+                "is_wicket": ball.get("is_wicket", False),
+                "is_four": ball.get("is_four", False),
+                "is_six": ball.get("is_six", False),
+                "batter": ball.get("batter", ""),
+                "bowler": ball.get("bowler", ""),
                 "emotion_score": ball_emotions[i],
                 "emotion_score_bowling": ball_emotions_bowling[i],
                 "pressure": ball_pressures[i],
                 "momentum": ball_momentums[i],
                 "phase": _phase_label(ball_emotions[i]),
             }
-            for i in range(len(commentary))
-        ],
-        "current_state": {
+            for i, ball in enumerate(commentary)
+        ]
+
+    if "current_state" in wanted:
+        current_emotion = ball_emotions[-1] if ball_emotions else 0
+        current_emotion_bowling = ball_emotions_bowling[-1] if ball_emotions_bowling else 0
+        current_pressure = ball_pressures[-1] if ball_pressures else 0
+        current_momentum = ball_momentums[-1] if ball_momentums else 0
+
+        # Collapse risk (using last state)
+        runs_needed_final = max(target - runs_scored, 0)
+        balls_remaining_final = max(total_balls - len(commentary), 0)
+        rrr_final = (runs_needed_final / balls_remaining_final * 6) if balls_remaining_final > 0 else 0
+        collapse = _collapse_risk(commentary[-18:], current_pressure, rrr_final)
+
+        result["current_state"] = {
             "emotion_score": round(current_emotion, 1),
             "emotion_score_bowling": round(current_emotion_bowling, 1),
             "pressure": round(current_pressure, 3),
             "momentum": round(current_momentum, 3),
-            "phase": current_phase,
+            "phase": _phase_label(current_emotion),
             "collapse_risk": collapse,
-            "batter_cards": batter_cards,
-        },
-        "key_moments": key_moments,
-        "emotional_phases": phases,
-        "emotional_phases_bowling": phases_bowling,
-        "heatmap": heatmap,
-        "momentum_shifts": momentum_shifts, # Could also produce momentum_shifts_bowling
-    }
+            "batter_cards": _frame_batter_cards(frame, emotions),
+        }
+
+    if "key_moments" in wanted:
+        result["key_moments"] = _frame_key_moments(frame, emotions)
+    if "emotional_phases" in wanted:
+        result["emotional_phases"] = _frame_phases(frame, emotions)
+    if "emotional_phases_bowling" in wanted:
+        result["emotional_phases_bowling"] = _frame_phases(frame, emotions_bowling)
+    if "heatmap" in wanted:
+        result["heatmap"] = _frame_heatmap(frame, emotions, emotions_bowling)
+    if "momentum_shifts" in wanted:
+        result["momentum_shifts"] = momentum_shifts  # Could also produce momentum_shifts_bowling
+
+    return result
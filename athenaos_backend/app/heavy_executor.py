@@ -0,0 +1,101 @@
+"""
+AthenaOS Heavy Executor
+Bounded thread pool for CPU-heavy request work (analysis, inference, story
+generation), kept apart from the server's shared threadpool so cheap
+endpoints stay responsive. Work beyond the worker + queue capacity is
+rejected immediately instead of piling up.
+"""
+
+import asyncio
+import math
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict
+
+
+class ExecutorSaturated(Exception):
+    """Raised when every worker is busy and the queue is full."""
+
+    def __init__(self, retry_after: int):
+        super().__init__(f"Executor saturated; retry after {retry_after}s")
+        self.retry_after = retry_after
+
+
+class HeavyExecutor:
+    """
+    `workers` threads plus at most `max_queue` waiting jobs. run() awaits a
+    job from async code; when no slot is free it raises ExecutorSaturated
+    with a Retry-After estimate from recent job durations.
+    """
+
+    def __init__(self, workers: int = 2, max_queue: int = 8, name: str = "heavy"):
+        self.workers = max(workers, 1)
+        self.max_queue = max(max_queue, 0)
+        self._pool = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix=f"athena-{name}")
+        self._slots = threading.BoundedSemaphore(self.workers + self.max_queue)
+        self._lock = threading.Lock()
+        self._pending = 0
+        self._running = 0
+        self._avg_seconds = 1.0  # EMA of job duration, seeds Retry-After
+        self.completed = 0
+        self.failed = 0
+        self.rejected = 0
+
+    def retry_after(self) -> int:
+        with self._lock:
+            backlog = self._pending + 1
+        return max(1, math.ceil(backlog / self.workers * self._avg_seconds))
+
+    def _call(self, fn: Callable, args: tuple, kwargs: dict) -> Any:
+        start = time.perf_counter()
+        with self._lock:
+            self._running += 1
+        try:
+            result = fn(*args, **kwargs)
+            ok = True
+            return result
+        except Exception:
+            ok = False
+            raise
+        finally:
+            elapsed = time.perf_counter() - start
+            with self._lock:
+                self._running -= 1
+                self._pending -= 1
+                self._avg_seconds = 0.8 * self._avg_seconds + 0.2 * elapsed
+                if ok:
+                    self.completed += 1
+                else:
+                    self.failed += 1
+            self._slots.release()
+
+    async def run(self, fn: Callable, *args, **kwargs) -> Any:
+        """Run fn(*args, **kwargs) on the pool, or raise ExecutorSaturated."""
+        if not self._slots.acquire(blocking=False):
+            with self._lock:
+                self.rejected += 1
+            raise ExecutorSaturated(self.retry_after())
+        with self._lock:
+            self._pending += 1
+        try:
+            future = self._pool.submit(self._call, fn, args, kwargs)
+        except Exception:
+            with self._lock:
+                self._pending -= 1
+            self._slots.release()
+            raise
+        return await asyncio.wrap_future(future)
+
+    def stats(self) -> Dict:
+        with self._lock:
+            return {
+                "workers": self.workers,
+                "max_queue": self.max_queue,
+                "running": self._running,
+                "queued": self._pending - self._running,
+                "completed": self.completed,
+                "failed": self.failed,
+                "rejected": self.rejected,
+                "avg_job_ms": round(self._avg_seconds * 1000, 1),
+            }
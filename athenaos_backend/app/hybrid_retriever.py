@@ -0,0 +1,187 @@
+"""
+AthenaOS Hybrid Retriever
+Dense + lexical retrieval for the RAG knowledge base: an in-process IVF
+index (k-means coarse quantizer, float16 or int8 vectors) for approximate
+nearest neighbours, a BM25 inverted index over the same chunks, and
+reciprocal-rank fusion of the two rankings. Top-k selection uses
+np.argpartition instead of a full sort.
+"""
+
+import math
+import re
+from collections import Counter
+from typing import Dict, List, Optional, Sequence
+
+import numpy as np
+
+_TOKEN = re.compile(r"[a-z0-9]+(?:\.[0-9]+)?")
+
+# Below this many chunks a flat scan beats probing inverted lists
+FLAT_MAX_CHUNKS = 4096
+
+
+def tokenize(text: str) -> List[str]:
+    return _TOKEN.findall(text.lower())
+
+
+def top_k(scores: np.ndarray, k: int) -> np.ndarray:
+    """Indices of the k highest scores, best first (argpartition + sort of k)."""
+    if k <= 0 or scores.size == 0:
+        return np.empty(0, dtype=np.int64)
+    if k < scores.size:
+        part = np.argpartition(-scores, k - 1)[:k]
+    else:
+        part = np.arange(scores.size)
+    return part[np.argsort(-scores[part], kind="stable")]
+
+
+# ─── Dense: IVF ──────────────────────────────────────────────────────────────
+def _quantize(vectors: np.ndarray, dtype: str):
+    """(codes, per-vector scale or None) for float16 / int8 storage."""
+    if dtype == "int8":
+        scale = np.abs(vectors).max(axis=1) / 127.0
+        scale[scale == 0] = 1.0
+        codes = np.round(vectors / scale[:, None]).astype(np.int8)
+        return codes, scale.astype(np.float32)
+    if dtype == "float16":
+        return vectors.astype(np.float16), None
+    return vectors.astype(np.float32), None
+
+
+def _kmeans(vectors: np.ndarray, k: int, iterations: int = 10, sample: int = 32768, seed: int = 0) -> np.ndarray:
+    """Spherical k-means centroids, trained on a sample of the vectors."""
+    rng = np.random.default_rng(seed)
+    if vectors.shape[0] > sample:
+        vectors = vectors[rng.choice(vectors.shape[0], sample, replace=False)]
+    centroids = vectors[rng.choice(vectors.shape[0], k, replace=False)].copy()
+    for _ in range(iterations):
+        assign = np.argmax(vectors @ centroids.T, axis=1)
+        sums = np.zeros_like(centroids)
+        np.add.at(sums, assign, vectors)
+        counts = np.bincount(assign, minlength=k)
+        empty = counts == 0
+        # Re-seed empty lists from random points so every list stays in use
+        sums[empty] = vectors[rng.choice(vectors.shape[0], int(empty.sum()))]
+        norms = np.linalg.norm(sums, axis=1, keepdims=True)
+        norms[norms == 0] = 1.0
+        centroids = sums / norms
+    return centroids.astype(np.float32)
+
+
+class IVFIndex:
+    """
+    Inner-product ANN over normalized vectors. Vectors are grouped by their
+    nearest centroid into contiguous inverted lists; a query scans the
+    `nprobe` closest lists. Corpora of FLAT_MAX_CHUNKS or fewer are scanned
+    exhaustively (still quantized).
+    """
+
+    def __init__(self, vectors: np.ndarray, dtype: str = "float16", nlist: Optional[int] = None,
+                 nprobe: int = 8, seed: int = 0):
+        vectors = np.asarray(vectors, dtype=np.float32)
+        self.size, self.dim = vectors.shape if vectors.ndim == 2 else (0, 0)
+        self.dtype = dtype
+        self.nprobe = nprobe
+        if nlist is None:
+            nlist = 1 if self.size <= FLAT_MAX_CHUNKS else int(math.sqrt(self.size))
+        self.nlist = max(1, min(nlist, self.size))
+
+        if self.nlist > 1:
+            self.centroids = _kmeans(vectors, self.nlist, seed=seed)
+            assign = np.argmax(vectors @ self.centroids.T, axis=1)
+        else:
+            self.centroids = None
+            assign = np.zeros(self.size, dtype=np.int64)
+        order = np.argsort(assign, kind="stable")
+        self.ids = order
+        self.offsets = np.concatenate([[0], np.cumsum(np.bincount(assign, minlength=self.nlist))])
+        self.codes, self.scales = _quantize(vectors[order], dtype)
+
+    def _scan(self, rows: slice, query: np.ndarray) -> np.ndarray:
+        scores = self.codes[rows].astype(np.float32) @ query
+        if self.scales is not None:
+            scores *= self.scales[rows]
+        return scores
+
+    def search(self, query: np.ndarray, k: int, nprobe: Optional[int] = None) -> List[int]:
+        """Ids of the ~k nearest chunks by inner product, best first."""
+        if self.size == 0:
+            return []
+        query = np.asarray(query, dtype=np.float32).reshape(-1)
+        if self.centroids is None:
+            return self.ids[top_k(self._scan(slice(None), query), k)].tolist()
+
+        probe = top_k(self.centroids @ query, min(nprobe or self.nprobe, self.nlist))
+        ids, scores = [], []
+        for lst in probe:
+            rows = slice(self.offsets[lst], self.offsets[lst + 1])
+            ids.append(self.ids[rows])
+            scores.append(self._scan(rows, query))
+        ids, scores = np.concatenate(ids), np.concatenate(scores)
+        return ids[top_k(scores, k)].tolist()
+
+    def memory_bytes(self) -> int:
+        extra = self.scales.nbytes if self.scales is not None else 0
+        return self.codes.nbytes + extra + (self.centroids.nbytes if self.centroids is not None else 0)
+
+
+# ─── Lexical: BM25 ───────────────────────────────────────────────────────────
+class BM25Index:
+    """Okapi BM25 over an inverted index with precomputed per-posting weights."""
+
+    def __init__(self, texts: Sequence[str], k1: float = 1.5, b: float = 0.75):
+        self.size = len(texts)
+        postings: Dict[str, List] = {}
+        lengths = np.zeros(self.size, dtype=np.float32)
+        for doc, text in enumerate(texts):
+            counts = Counter(tokenize(text))
+            lengths[doc] = sum(counts.values())
+            for term, tf in counts.items():
+                postings.setdefault(term, []).append((doc, tf))
+
+        avg_len = float(lengths.mean()) if self.size and lengths.mean() > 0 else 1.0
+        self.postings: Dict[str, tuple] = {}
+        for term, entries in postings.items():
+            docs = np.fromiter((d for d, _ in entries), dtype=np.int64, count=len(entries))
+            tfs = np.fromiter((tf for _, tf in entries), dtype=np.float32, count=len(entries))
+            idf = math.log(1 + (self.size - len(entries) + 0.5) / (len(entries) + 0.5))
+            norm = k1 * (1 - b + b * lengths[docs] / avg_len)
+            self.postings[term] = (docs, (idf * tfs * (k1 + 1) / (tfs + norm)).astype(np.float32))
+
+    def search(self, text: str, k: int) -> List[int]:
+        """Ids of the top-k chunks sharing at least one query term, best first."""
+        scores = np.zeros(self.size, dtype=np.float32)
+        for term in set(tokenize(text)):
+            if term in self.postings:
+                docs, weights = self.postings[term]
+                scores[docs] += weights
+        best = top_k(scores, k)
+        return best[scores[best] > 0].tolist()
+
+
+# ─── Fusion ──────────────────────────────────────────────────────────────────
+def reciprocal_rank_fusion(rankings: Sequence[Sequence[int]], k: int = 60) -> List[int]:
+    """Ids ordered by sum of 1 / (k + rank) across rankings (ties keep first-seen order)."""
+    fused: Dict[int, float] = {}
+    for ranking in rankings:
+        for rank, doc in enumerate(ranking, start=1):
+            fused[doc] = fused.get(doc, 0.0) + 1.0 / (k + rank)
+    return sorted(fused, key=lambda doc: -fused[doc])
+
+
+class HybridRetriever:
+    """IVF dense ranking + BM25 ranking over the same chunks, fused with RRF."""
+
+    def __init__(self, embeddings: np.ndarray, texts: Sequence[str], dtype: str = "int8",
+                 nprobe: int = 8, depth: int = 50, rrf_k: int = 60):
+        self.dense = IVFIndex(embeddings, dtype=dtype, nprobe=nprobe)
+        self.lexical = BM25Index(texts)
+        self.depth = depth
+        self.rrf_k = rrf_k
+
+    def search(self, query_vector: np.ndarray, query_text: str, k: int = 3) -> List[int]:
+        depth = max(self.depth, k)
+        return reciprocal_rank_fusion(
+            [self.dense.search(query_vector, depth), self.lexical.search(query_text, depth)],
+            k=self.rrf_k,
+        )[:k]
@@ -0,0 +1,157 @@
+"""
+AthenaOS Knowledge-Base Index
+Loads RAG documents from a directory of markdown/JSON files and keeps their
+embedding matrix on disk (.npy, memory-mapped on load) with a manifest of
+model name + per-document content hashes, so a restart re-encodes nothing
+and an edit re-encodes only the documents that changed.
+"""
+
+import hashlib
+import json
+import os
+import re
+from pathlib import Path
+from typing import Callable, Dict, List, Optional
+
+import numpy as np
+
+_ORDER_PREFIX = re.compile(r"^\d+_")
+
+
+# ─── Documents ───────────────────────────────────────────────────────────────
+def _markdown_document(path: Path) -> Dict:
+    """`# Title` on the first line, the rest is content; id is the file stem without an `NN_` order prefix."""
+    text = path.read_text(encoding="utf-8")
+    first, _, content = text.partition("\n")
+    title = first[2:].strip() if first.startswith("# ") else path.stem
+    if not first.startswith("# "):
+        content = text
+    return {"id": _ORDER_PREFIX.sub("", path.stem), "title": title, "content": content}
+
+
+def load_documents(kb_dir: Path) -> List[Dict]:
+    """
+    Every *.md / *.json document in `kb_dir`, in file-name order. A JSON file
+    holds one {"id", "title", "content"} object or a list of them.
+    """
+    documents = []
+    for path in sorted(Path(kb_dir).iterdir()):
+        if path.suffix == ".md":
+            documents.append(_markdown_document(path))
+        elif path.suffix == ".json":
+            with open(path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+            for doc in data if isinstance(data, list) else [data]:
+                documents.append({"id": doc.get("id", path.stem), "title": doc.get("title", ""), "content": doc["content"]})
+    return documents
+
+
+def document_text(doc: Dict) -> str:
+    """The text that gets embedded for a document."""
+    return f"{doc['title']}\n{doc['content']}"
+
+
+def document_hash(doc: Dict) -> str:
+    return hashlib.sha256(document_text(doc).encode("utf-8")).hexdigest()
+
+
+# ─── Embedding Index ─────────────────────────────────────────────────────────
+class EmbeddingIndex:
+    """
+    Embedding matrix for a document list, persisted as
+    `{cache_dir}/{model}.{version}.npy` + `{model}.json`. `encode` maps a
+    list of texts to a 2-D array (normalized by the caller's model if wanted).
+
+    Each save writes a new, never-overwritten matrix file and then atomically
+    replaces the manifest that names it, so a reader (or a crash between the
+    two writes) always sees a manifest and a matrix from the same build.
+    """
+
+    def __init__(self, model_name: str, encode: Callable[[List[str]], np.ndarray], cache_dir: Optional[str] = None):
+        self.model_name = model_name
+        self.encode = encode
+        self.cache_dir = Path(cache_dir) if cache_dir else None
+        self.encoded = 0  # documents encoded by the last build()
+        self.reused = 0
+
+    def _slug(self) -> str:
+        return re.sub(r"[^A-Za-z0-9._-]+", "_", self.model_name)
+
+    def _manifest_path(self) -> Path:
+        return self.cache_dir / f"{self._slug()}.json"
+
+    def _load_persisted(self):
+        """(hashes, mmap'd matrix) of the persisted index, or ([], None) if absent or built with another model."""
+        if self.cache_dir is None:
+            return [], None
+        try:
+            with open(self._manifest_path(), "r", encoding="utf-8") as f:
+                manifest = json.load(f)
+            if manifest.get("model") != self.model_name:
+                return [], None
+            matrix = np.load(self.cache_dir / Path(manifest["matrix"]).name, mmap_mode="r")
+            hashes = manifest["hashes"]
+        except (OSError, ValueError, KeyError):
+            return [], None
+        if matrix.ndim != 2 or matrix.shape[0] != len(hashes):
+            return [], None
+        return hashes, matrix
+
+    def build(self, documents: List[Dict]) -> np.ndarray:
+        """Embeddings for `documents` (row i = document i), encoding only unseen content."""
+        hashes = [document_hash(doc) for doc in documents]
+        persisted_hashes, persisted = self._load_persisted()
+        if persisted is not None and persisted_hashes == hashes:
+            self.encoded, self.reused = 0, len(hashes)
+            return persisted
+
+        cached = {h: i for i, h in enumerate(persisted_hashes)}
+        missing = [i for i, h in enumerate(hashes) if h not in cached]
+        fresh = {}
+        if missing:
+            vectors = np.asarray(self.encode([document_text(documents[i]) for i in missing]), dtype=np.float32)
+            fresh = {hashes[i]: vectors[k] for k, i in enumerate(missing)}
+        self.encoded, self.reused = len(missing), len(hashes) - len(missing)
+        if not hashes:
+            return np.zeros((0, 0), dtype=np.float32)
+
+        matrix = np.vstack([fresh[h] if h in fresh else persisted[cached[h]] for h in hashes]).astype(np.float32)
+        if self.cache_dir is not None:
+            self._save(matrix, hashes)
+        return matrix
+
+    def _save(self, matrix: np.ndarray, hashes: List[str]) -> None:
+        os.makedirs(self.cache_dir, exist_ok=True)
+        slug = self._slug()
+        version = hashlib.sha256("\n".join(hashes).encode("utf-8")).hexdigest()[:16]
+        matrix_path = self.cache_dir / f"{slug}.{version}.npy"
+        manifest_path = self._manifest_path()
+
+        tmp_matrix = self.cache_dir / f"{slug}.{version}.tmp"
+        with open(tmp_matrix, "wb") as f:
+            np.save(f, matrix)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_matrix, matrix_path)
+
+        # The manifest swap is the commit point for the new build
+        tmp_manifest = manifest_path.with_suffix(".json.tmp")
+        with open(tmp_manifest, "w", encoding="utf-8") as f:
+            json.dump({
+                "model": self.model_name,
+                "dim": int(matrix.shape[1]) if matrix.size else 0,
+                "matrix": matrix_path.name,
+                "hashes": hashes,
+            }, f)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_manifest, manifest_path)
+
+        # Older builds (and the pre-versioned `{slug}.npy`); open memory maps keep working
+        build = re.compile(re.escape(slug) + r"(\.[0-9a-f]{16})?\.npy")
+        for stale in self.cache_dir.iterdir():
+            if stale != matrix_path and build.fullmatch(stale.name):
+                try:
+                    stale.unlink()
+                except OSError:
+                    pass
@@ -0,0 +1,230 @@
+"""
+AthenaOS Match Catalog
+SQLite index of the match archive's metadata, keyed by file path and
+(mtime, size), plus matches bulk-imported into the match store. A refresh
+only re-reads files (and stored matches) that changed, and skips the scan
+altogether while the directory and the store are unchanged, so listing,
+filtering and paging cost the same whether the archive holds 5 matches or
+50,000.
+"""
+
+import base64
+import json
+import os
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+# Metadata columns, in the order /matches returns them
+CATALOG_FIELDS = ("match_id", "title", "team_batting", "team_bowling", "venue", "date", "format", "description")
+SORT_FIELDS = ("match_id", "date", "title", "venue")
+_DEFAULTS = {"title": "Unknown", "format": "T20"}
+# Stored matches are indexed as "store:{match_id}@{digest}", so a re-import
+# shows up as a new key and the old row is dropped like a deleted file
+_STORE_PREFIX = "store:"
+
+
+def _encode_cursor(sort_value: str, match_id: str) -> str:
+    return base64.urlsafe_b64encode(json.dumps([sort_value, match_id]).encode("utf-8")).decode("ascii")
+
+
+def _decode_cursor(cursor: str) -> Tuple[str, str]:
+    try:
+        sort_value, match_id = json.loads(base64.urlsafe_b64decode(cursor.encode("ascii")))
+        return str(sort_value), str(match_id)
+    except Exception:
+        raise ValueError("Invalid cursor")
+
+
+class MatchCatalog:
+    """
+    Match metadata for every *.json file in `data_dir`, and for every match
+    in `store` (a MatchStore) that was imported from elsewhere. Refreshes
+    are throttled to one check per `refresh_interval` seconds, and a check
+    only rescans when the directory's mtime or the store's version moved.
+    Files rewritten in place leave the directory mtime alone, so a full
+    rescan also runs every `full_scan_interval` seconds. The index lives in
+    memory unless `db_path` is given.
+    """
+
+    def __init__(self, data_dir: Path, db_path: Optional[str] = None, refresh_interval: float = 2.0,
+                 store: Optional[Any] = None, full_scan_interval: float = 60.0):
+        self.data_dir = Path(data_dir)
+        self.store = store
+        self.refresh_interval = refresh_interval
+        self.full_scan_interval = full_scan_interval
+        self._lock = threading.Lock()
+        self._scanned_at = 0.0
+        self._full_scan_at = 0.0
+        self._signature: Optional[tuple] = None
+        self.files_indexed = 0
+        self.scans = 0
+
+        if db_path:
+            os.makedirs(os.path.dirname(os.path.abspath(db_path)), exist_ok=True)
+        self._db = sqlite3.connect(db_path or ":memory:", check_same_thread=False)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS matches ("
+            " path TEXT PRIMARY KEY, mtime_ns INTEGER NOT NULL, size INTEGER NOT NULL, "
+            + ", ".join(f"{field} TEXT NOT NULL DEFAULT ''" for field in CATALOG_FIELDS)
+            + ")"
+        )
+        for field in SORT_FIELDS:
+            self._db.execute(f"CREATE INDEX IF NOT EXISTS matches_{field} ON matches ({field}, match_id)")
+        self._db.commit()
+
+    def _read_info(self, path: str) -> Optional[Dict]:
+        if path.startswith(_STORE_PREFIX):
+            # Served by the store under its own id, whatever match_info says
+            match_id = path[len(_STORE_PREFIX):].rsplit("@", 1)[0]
+            info = self.store.match_info(match_id)
+            if info is None:
+                return None
+        else:
+            try:
+                with open(path, "r", encoding="utf-8") as f:
+                    info = json.load(f).get("match_info", {})
+            except Exception:
+                return None
+            match_id = info.get("match_id", Path(path).stem)
+        row = {field: str(info.get(field, _DEFAULTS.get(field, "")) or "") for field in CATALOG_FIELDS}
+        row["match_id"] = str(match_id)
+        return row
+
+    def _stored(self, on_disk: Dict[str, Tuple[int, int]]) -> Dict[str, Tuple[int, int]]:
+        """Index keys for store matches not already listed from `data_dir`."""
+        data_dir = os.path.abspath(self.data_dir)
+        local = {Path(path).stem for path in on_disk}
+        keys = {}
+        for match_id, digest, source in self.store.sources():
+            if match_id in local or (source and os.path.dirname(os.path.abspath(source)) == data_dir):
+                continue
+            keys[f"{_STORE_PREFIX}{match_id}@{digest}"] = (0, 0)
+        return keys
+
+    def _signature_now(self) -> tuple:
+        """What a rescan could pick up: the directory's mtime and the store's version."""
+        try:
+            dir_mtime = os.stat(self.data_dir).st_mtime_ns
+        except OSError:
+            dir_mtime = None
+        return dir_mtime, self.store.version() if self.store is not None else None
+
+    def refresh(self, force: bool = False) -> int:
+        """Re-index new or changed files and drop deleted ones; returns files re-read."""
+        with self._lock:
+            now = time.monotonic()
+            if not force and now - self._scanned_at < self.refresh_interval:
+                return 0
+            self._scanned_at = now
+            # Taken before the scan, so changes made during it trigger the next one
+            signature = self._signature_now()
+            if not force and signature == self._signature and now - self._full_scan_at < self.full_scan_interval:
+                return 0
+            self._signature = signature
+            self._full_scan_at = now
+            self.scans += 1
+
+            on_disk: Dict[str, Tuple[int, int]] = {}
+            if self.data_dir.exists():
+                with os.scandir(self.data_dir) as entries:
+                    for entry in entries:
+                        if entry.name.endswith(".json") and entry.is_file():
+                            stat = entry.stat()
+                            on_disk[entry.path] = (stat.st_mtime_ns, stat.st_size)
+            if self.store is not None:
+                on_disk.update(self._stored(on_disk))
+
+            indexed = {
+                path: (mtime_ns, size)
+                for path, mtime_ns, size in self._db.execute("SELECT path, mtime_ns, size FROM matches")
+            }
+            removed = [(path,) for path in indexed if path not in on_disk]
+            changed = [path for path, stamp in on_disk.items() if indexed.get(path) != stamp]
+
+            if removed:
+                self._db.executemany("DELETE FROM matches WHERE path = ?", removed)
+            for path in changed:
+                row = self._read_info(path)
+                if row is None:
+                    # Unreadable files are skipped, as the listing always did
+                    self._db.execute("DELETE FROM matches WHERE path = ?", (path,))
+                    continue
+                mtime_ns, size = on_disk[path]
+                self._db.execute(
+                    f"INSERT OR REPLACE INTO matches (path, mtime_ns, size, {', '.join(CATALOG_FIELDS)}) "
+                    f"VALUES (?, ?, ?, {', '.join('?' * len(CATALOG_FIELDS))})",
+                    (path, mtime_ns, size, *(row[field] for field in CATALOG_FIELDS)),
+                )
+            if removed or changed:
+                self._db.commit()
+            self.files_indexed += len(changed)
+            return len(changed)
+
+    def query(
+        self,
+        team: Optional[str] = None,
+        venue: Optional[str] = None,
+        format: Optional[str] = None,
+        date_from: Optional[str] = None,
+        date_to: Optional[str] = None,
+        sort: str = "match_id",
+        descending: bool = False,
+        limit: int = 50,
+        cursor: Optional[str] = None,
+    ) -> Dict:
+        """
+        One page of matches. `team` and `venue` match case-insensitive
+        substrings (team checks both sides), dates are inclusive ISO
+        bounds, and `cursor` continues from a previous page's next_cursor.
+        """
+        if sort not in SORT_FIELDS:
+            raise ValueError(f"Unknown sort field {sort!r}; expected one of {SORT_FIELDS}")
+        self.refresh()
+
+        where: List[str] = []
+        params: List = []
+        if team:
+            where.append("(team_batting LIKE ? OR team_bowling LIKE ?)")
+            params += [f"%{team}%", f"%{team}%"]
+        if venue:
+            where.append("venue LIKE ?")
+            params.append(f"%{venue}%")
+        if format:
+            where.append("format = ? COLLATE NOCASE")
+            params.append(format)
+        if date_from:
+            where.append("date >= ?")
+            params.append(date_from)
+        if date_to:
+            where.append("date <= ?")
+            params.append(date_to)
+        if cursor:
+            sort_value, match_id = _decode_cursor(cursor)
+            where.append(f"({sort}, match_id) {'<' if descending else '>'} (?, ?)")
+            params += [sort_value, match_id]
+
+        direction = "DESC" if descending else "ASC"
+        sql = (
+            f"SELECT {', '.join(CATALOG_FIELDS)} FROM matches"
+            + (f" WHERE {' AND '.join(where)}" if where else "")
+            + f" ORDER BY {sort} {direction}, match_id {direction} LIMIT ?"
+        )
+        limit = max(1, limit)
+        with self._lock:
+            rows = self._db.execute(sql, params + [limit + 1]).fetchall()
+
+        matches = [dict(zip(CATALOG_FIELDS, row)) for row in rows[:limit]]
+        next_cursor = None
+        if len(rows) > limit:
+            last = matches[-1]
+            next_cursor = _encode_cursor(last[sort], last["match_id"])
+        return {"matches": matches, "next_cursor": next_cursor}
+
+    def stats(self) -> Dict:
+        with self._lock:
+            count = self._db.execute("SELECT COUNT(*) FROM matches").fetchone()[0]
+        return {"matches": count, "files_indexed": self.files_indexed, "scans": self.scans}
@@ -0,0 +1,331 @@
+"""
+AthenaOS Match Simulator
+Monte Carlo rollouts of the rest of an innings, all rollouts at once as
+NumPy arrays: win probability, the pressure / E(t) distribution over the
+next over, and what-if outcomes for the next ball.
+"""
+
+import os
+import time
+from typing import Dict, List, Optional, Sequence
+
+import numpy as np
+
+from app.emotion_engine import (
+    _multiplier_kernel,
+    _pressure_kernel,
+    _raw_emotion_kernel,
+    analyze_match,
+)
+
+# ─── Configuration ────────────────────────────────────────────────────────────
+SIMULATION_ROLLOUTS = int(os.getenv("ATHENA_SIMULATION_ROLLOUTS", "20000"))
+# Cap on simulated balls per call (rollouts × balls remaining): long states
+# get fewer rollouts so a call stays inside the ~50 ms budget
+SIMULATION_BALL_BUDGET = int(os.getenv("ATHENA_SIMULATION_BALL_BUDGET", "1000000"))
+MIN_ROLLOUTS = 2000
+RATE_WINDOW = 30          # recent balls weighted twice in the outcome rates
+PRIOR_BALLS = 30.0        # strength of the T20 prior, in pseudo-balls
+OVER_ROLLOUTS = 2048      # rollouts used for the next-over E(t) distribution
+_TABLE_SIZE = 1 << 16     # outcome lookup table, sampled with uint16 draws
+
+# ─── Ball Outcomes ────────────────────────────────────────────────────────────
+OUTCOMES = ("wicket", "dot", "single", "two", "three", "four", "six", "extra")
+_OUTCOME_RUNS = np.array([0, 0, 1, 2, 3, 4, 6, 1], dtype=np.int16)
+# Typical commentary sentiment per outcome, batting perspective
+_OUTCOME_SENTIMENT = np.array([-0.6, -0.2, 0.05, 0.1, 0.15, 0.5, 0.7, 0.0])
+# Women's T20 per-ball outcome prior (~6.3 runs per over)
+_PRIOR_RATES = np.array([0.04, 0.40, 0.33, 0.07, 0.01, 0.10, 0.02, 0.03])
+WHAT_IF_OUTCOMES = ("wicket", "dot", "four", "six")
+
+
+def _ball_outcome(ball: Dict) -> int:
+    if ball.get("is_wicket"):
+        return 0
+    if ball.get("is_wide") or ball.get("is_noball"):
+        return 7
+    if ball.get("is_six"):
+        return 6
+    if ball.get("is_four"):
+        return 5
+    return 1 + min(max(int(ball.get("runs", 0)), 0), 3)
+
+
+def outcome_rates(commentary: List[Dict], window: int = RATE_WINDOW) -> np.ndarray:
+    """
+    Per-ball outcome probabilities (OUTCOMES order): the innings so far,
+    with the last `window` balls counted twice, smoothed by the T20 prior.
+    """
+    outcomes = np.array([_ball_outcome(ball) for ball in commentary], dtype=np.int64)
+    counts = np.bincount(outcomes, minlength=len(OUTCOMES)).astype(float)
+    counts += np.bincount(outcomes[-window:], minlength=len(OUTCOMES)) if window else 0
+    counts += PRIOR_BALLS * _PRIOR_RATES
+    return counts / counts.sum()
+
+
+def _outcome_table(rates: np.ndarray) -> np.ndarray:
+    """Outcome ids laid out so a uniform uint16 index samples `rates`."""
+    counts = np.floor(rates * _TABLE_SIZE).astype(np.int64)
+    counts[np.argmax(counts)] += _TABLE_SIZE - counts.sum()
+    return np.repeat(np.arange(len(OUTCOMES), dtype=np.uint8), counts)
+
+
+def _percentiles(values: np.ndarray, digits: int = 1) -> Dict:
+    p10, p50, p90 = np.percentile(values, [10, 50, 90])
+    return {
+        "mean": round(float(values.mean()), digits),
+        "p10": round(float(p10), digits),
+        "p50": round(float(p50), digits),
+        "p90": round(float(p90), digits),
+    }
+
+
+def _over_outlook(over: Dict[str, np.ndarray], current_pressure: float) -> Dict:
+    """
+    Share of rollouts where the next over is a momentum surge (12+ runs,
+    no wicket), a pressure build-up (a wicket, or pressure up by 0.05),
+    or otherwise stable.
+    """
+    surge = (over["runs"] >= 12) & ~over["wicket"]
+    build_up = ~surge & (over["wicket"] | (over["pressure"] - current_pressure > 0.05))
+    return {
+        "stable": round(float(np.mean(~surge & ~build_up)), 4),
+        "pressure_build_up": round(float(build_up.mean()), 4),
+        "momentum_surge": round(float(surge.mean()), 4),
+    }
+
+
+# ─── Rollouts ─────────────────────────────────────────────────────────────────
+def _runs_before_wickets(tail_runs: np.ndarray, tail_wickets: np.ndarray, wicket_counts: Sequence[int]) -> List[np.ndarray]:
+    """
+    For each k in `wicket_counts`, the runs every rollout scores before its
+    k-th wicket (all of its runs if it loses fewer). Wicket positions and
+    running totals are only built for rollouts that lose enough wickets
+    to be bowled out.
+    """
+    n = len(tail_runs)
+    total = tail_runs.sum(axis=1, dtype=np.int32)
+    lost = np.count_nonzero(tail_wickets, axis=1)
+
+    positive = [k for k in wicket_counts if k > 0]
+    all_out = np.flatnonzero(lost >= min(positive)) if positive else np.zeros(0, dtype=np.int64)
+    scored = np.cumsum(tail_runs[all_out], axis=1, dtype=np.int32)
+    _, cols = np.nonzero(tail_wickets[all_out])
+    first = np.cumsum(lost[all_out]) - lost[all_out]
+    position = np.empty(n, dtype=np.int64)
+    position[all_out] = np.arange(len(all_out))
+
+    result = []
+    for k in wicket_counts:
+        if k <= 0:
+            result.append(np.zeros(n, dtype=np.int32))
+            continue
+        runs = total.copy()
+        out = np.flatnonzero(lost >= k)
+        at = position[out]
+        runs[out] = scored[at, cols[first[at] + k - 1]]
+        result.append(runs)
+    return result
+
+
+def _next_over(
+    outcomes: np.ndarray,
+    runs_needed: Optional[int],
+    wickets_fallen: int,
+    balls_bowled: int,
+    balls_remaining: int,
+    total_balls: int,
+    prev_ema: float,
+    recent_scores: Sequence[float],
+) -> Dict[str, np.ndarray]:
+    """Pressure, momentum and E(t) ball by ball over the simulated next over."""
+    n, k = outcomes.shape
+    runs = _OUTCOME_RUNS[outcomes]
+    is_wicket = outcomes == 0
+    over_runs = np.cumsum(runs, axis=1)
+    over_wickets = np.cumsum(is_wicket, axis=1)
+
+    step = np.arange(1, k + 1)
+    needed = np.maximum(runs_needed - over_runs, 0) if runs_needed is not None else np.zeros((n, k))
+    pressures = _pressure_kernel(
+        needed,
+        np.maximum(balls_remaining - step, 0),
+        np.minimum(wickets_fallen + over_wickets, 10),
+        balls_bowled + step,
+        total_balls,
+    )
+
+    # Momentum: the 12-ball weighted window over real + simulated balls
+    history = np.asarray(recent_scores, dtype=float)[-11:]
+    scores = np.concatenate([np.broadcast_to(history, (n, len(history))), runs / 6.0 - is_wicket], axis=1)
+    momentums = np.empty((n, k))
+    for j in range(k):
+        end = len(history) + j + 1
+        weights = np.arange(1, min(end, 12) + 1)
+        momentums[:, j] = np.clip(scores[:, end - len(weights):end] @ weights / weights.sum(), -1.0, 1.0)
+
+    multipliers = _multiplier_kernel(pressures, is_wicket, outcomes == 6, outcomes == 5)
+    raw = _raw_emotion_kernel(_OUTCOME_SENTIMENT[outcomes], pressures, momentums, multipliers)
+    emotion = np.full(n, float(prev_ema))
+    for j in range(k):
+        emotion = 0.3 * raw[:, j] + 0.7 * emotion
+
+    return {
+        "pressure": pressures[:, -1],
+        "emotion": emotion,
+        "runs": over_runs[:, -1],
+        "wicket": over_wickets[:, -1] > 0,
+    }
+
+
+def simulate_state(
+    runs_needed: Optional[int],
+    balls_remaining: int,
+    wickets_fallen: int,
+    total_balls: int,
+    rates: Optional[np.ndarray] = None,
+    prev_ema: float = 20.0,
+    recent_scores: Sequence[float] = (),
+    n_sims: Optional[int] = None,
+    seed: Optional[int] = None,
+) -> Dict:
+    """
+    Roll out the remaining `balls_remaining` balls `n_sims` times from a
+    match state. `runs_needed` is None when there is no chase target, in
+    which case only the projected runs still to come are reported.
+
+    Every rollout shares balls 2..N across the next-ball what-ifs (common
+    random numbers), so outcome deltas are not swamped by sampling noise,
+    and the overall win probability is the rate-weighted mix of them.
+    Rollouts are capped at SIMULATION_BALL_BUDGET / balls_remaining (but
+    never below MIN_ROLLOUTS); the count actually used is in "rollouts".
+    """
+    start = time.perf_counter()
+    balls_remaining = max(int(balls_remaining), 0)
+    n_sims = n_sims or SIMULATION_ROLLOUTS
+    if balls_remaining:
+        n_sims = min(n_sims, max(SIMULATION_BALL_BUDGET // balls_remaining, MIN_ROLLOUTS))
+    rates = _PRIOR_RATES if rates is None else np.asarray(rates, dtype=float)
+    wickets_left = max(10 - int(wickets_fallen), 0)
+    chasing = runs_needed is not None
+    balls_bowled = max(total_balls - balls_remaining, 0)
+
+    result: Dict = {
+        "rollouts": n_sims,
+        "runs_needed": runs_needed,
+        "balls_remaining": balls_remaining,
+        "wickets_fallen": int(wickets_fallen),
+        "outcome_rates": {name: round(float(p), 4) for name, p in zip(OUTCOMES, rates)},
+    }
+
+    if balls_remaining == 0 or wickets_left == 0 or (chasing and runs_needed <= 0):
+        result.update({
+            "win_probability": (1.0 if runs_needed <= 0 else 0.0) if chasing else None,
+            "projected_runs_remaining": None,
+            "next_over": None,
+            "what_if": {},
+            "elapsed_ms": round((time.perf_counter() - start) * 1000, 2),
+        })
+        return result
+
+    rng = np.random.default_rng(seed)
+    # Sample every ball of every rollout as a uint16 index into the outcome
+    # table; wickets sit at the start of the table, so they are a compare
+    table = _outcome_table(rates)
+    wicket_slots = int(np.count_nonzero(table == 0))
+    draws = np.frombuffer(rng.bytes(2 * n_sims * balls_remaining), dtype=np.uint16)
+    draws = draws.reshape(n_sims, balls_remaining)
+    runs = _OUTCOME_RUNS[table][draws]
+    wickets = draws < wicket_slots
+
+    # Balls 2..N: runs scored before all out, with and without a wicket now
+    runs_after = dict(enumerate(
+        _runs_before_wickets(runs[:, 1:], wickets[:, 1:], [wickets_left, wickets_left - 1])
+    ))
+
+    # Outcome-conditioned win probability for every possible next ball
+    win_given = np.zeros(len(OUTCOMES))
+    for o in range(len(OUTCOMES)):
+        scored = runs_after[int(o == 0)]
+        if chasing:
+            win_given[o] = np.count_nonzero(scored >= runs_needed - _OUTCOME_RUNS[o]) / n_sims
+    win_probability = float(rates @ win_given) if chasing else None
+
+    projected = runs[:, 0] + np.where(wickets[:, 0], runs_after[1], runs_after[0])
+
+    current_pressure = float(_pressure_kernel(
+        np.array(runs_needed if chasing else 0), np.array(balls_remaining),
+        np.array(min(wickets_fallen, 10)), np.array(balls_bowled), total_balls,
+    ))
+    over_args = (runs_needed, wickets_fallen, balls_bowled, balls_remaining, total_balls, prev_ema, recent_scores)
+    # The per-ball E(t) recurrence is the costly part; its percentiles are
+    # already stable on a few thousand rollouts
+    over_balls = min(6, balls_remaining)
+    over_outcomes = table[draws[:OVER_ROLLOUTS, :over_balls]]
+    next_over = _next_over(over_outcomes, *over_args)
+
+    what_if = {}
+    for name in WHAT_IF_OUTCOMES:
+        o = OUTCOMES.index(name)
+        forced = over_outcomes.copy()
+        forced[:, 0] = o
+        scenario = _next_over(forced, *over_args)
+        what_if[name] = {
+            "win_probability": round(float(win_given[o]), 4) if chasing else None,
+            "win_delta": round(float(win_given[o]) - win_probability, 4) if chasing else None,
+            "pressure_next_over": round(float(np.median(scenario["pressure"])), 3),
+            "emotion_next_over": round(float(np.median(scenario["emotion"])), 1),
+        }
+
+    result.update({
+        "win_probability": round(win_probability, 4) if chasing else None,
+        "projected_runs_remaining": _percentiles(projected.astype(float)),
+        "next_over": {
+            "balls": over_balls,
+            "pressure": _percentiles(next_over["pressure"], 3),
+            "emotion": _percentiles(next_over["emotion"]),
+            "runs": _percentiles(next_over["runs"].astype(float)),
+            "wicket_probability": round(float(next_over["wicket"].mean()), 4),
+            "outlook": _over_outlook(next_over, current_pressure),
+        },
+        "what_if": what_if,
+        "elapsed_ms": round((time.perf_counter() - start) * 1000, 2),
+    })
+    return result
+
+
+def simulate_match(
+    commentary: List[Dict],
+    match_info: Dict,
+    current_state: Optional[Dict] = None,
+    n_sims: Optional[int] = None,
+    seed: Optional[int] = None,
+) -> Dict:
+    """
+    Simulate the rest of the innings from the end of `commentary`.
+    `current_state` is analyze_match()'s current_state section; it is
+    computed here when not supplied.
+    """
+    total_balls = match_info.get("total_balls", len(commentary))
+    target = match_info.get("target", 0)
+    runs_scored = sum(ball.get("runs", 0) for ball in commentary)
+    wickets_fallen = sum(1 for ball in commentary if ball.get("is_wicket"))
+
+    if current_state is None:
+        current_state = analyze_match(commentary, match_info, sections=["current_state"])["current_state"]
+
+    result = simulate_state(
+        runs_needed=max(target - runs_scored, 0) if target else None,
+        balls_remaining=max(total_balls - len(commentary), 0),
+        wickets_fallen=wickets_fallen,
+        total_balls=total_balls,
+        rates=outcome_rates(commentary),
+        prev_ema=current_state.get("emotion_score", 20.0),
+        recent_scores=[
+            ball.get("runs", 0) / 6.0 - (1.0 if ball.get("is_wicket") else 0.0)
+            for ball in commentary[-11:]
+        ],
+        n_sims=n_sims,
+        seed=seed,
+    )
+    return result
@@ -0,0 +1,240 @@
+"""
+AthenaOS Match Store
+SQLite archive for matches: match_info and ball rows are stored separately,
+so a ball range or a single column can be read without loading the match.
+Reads go through SQLite's memory-mapped I/O; bulk import ingests the
+data/*.json layout and skips files whose mtime and size are unchanged.
+"""
+
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional
+
+# Ball fields with their own column; anything else round-trips through `extra`
+BALL_COLUMNS = (
+    "ball", "over", "text", "runs",
+    "is_wicket", "is_four", "is_six", "is_dot", "is_drop", "is_noball", "is_wide",
+    "batter", "bowler",
+)
+_BOOL_COLUMNS = frozenset(c for c in BALL_COLUMNS if c.startswith("is_"))
+_COLUMN_SQL = ", ".join(f'"{c}"' for c in BALL_COLUMNS)
+
+
+def _ball_row(match_id: str, number: int, ball: Dict) -> tuple:
+    # An explicit null in a column field is kept in `extra` so it survives
+    # the round trip instead of reading back as a missing field
+    extra = {k: v for k, v in ball.items() if k not in BALL_COLUMNS or v is None}
+    return (
+        match_id, number,
+        *(ball.get(column) for column in BALL_COLUMNS),
+        json.dumps(extra, separators=(",", ":")) if extra else None,
+    )
+
+
+def _ball_dict(row: tuple) -> Dict:
+    """Inverse of _ball_row (minus the key columns); missing fields stay missing, nulls stay null."""
+    ball = {}
+    for column, value in zip(BALL_COLUMNS, row):
+        if value is None:
+            continue
+        ball[column] = bool(value) if column in _BOOL_COLUMNS else value
+    if row[-1]:
+        ball.update(json.loads(row[-1]))
+    return ball
+
+
+class MatchStore:
+    """
+    Matches keyed by match id (the source file's stem). Each match keeps
+    the SHA-256 of its source so analysis cache keys survive the import.
+    A file whose stem is already held by another existing source file is
+    rejected rather than overwriting that match.
+    """
+
+    def __init__(self, db_path: Optional[str] = None, mmap_bytes: int = 256 << 20):
+        self.db_path = db_path
+        if db_path:
+            os.makedirs(os.path.dirname(os.path.abspath(db_path)), exist_ok=True)
+        self._db = sqlite3.connect(db_path or ":memory:", check_same_thread=False)
+        self._lock = threading.Lock()
+        self._writes = 0
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute(f"PRAGMA mmap_size={int(mmap_bytes)}")
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS matches ("
+            " match_id TEXT PRIMARY KEY, match_info TEXT NOT NULL, balls INTEGER NOT NULL,"
+            " digest TEXT NOT NULL, source TEXT, mtime_ns INTEGER, size INTEGER)"
+        )
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS balls ("
+            " match_id TEXT NOT NULL, n INTEGER NOT NULL, "
+            + ", ".join(f'"{c}"' for c in BALL_COLUMNS)
+            + ", extra TEXT, PRIMARY KEY (match_id, n)) WITHOUT ROWID"
+        )
+        self._db.commit()
+
+    # ─── Import ───────────────────────────────────────────────────────────────
+    def _write(self, match_id: str, data: Dict, digest: str, source: Optional[str] = None,
+               mtime_ns: Optional[int] = None, size: Optional[int] = None) -> None:
+        """
+        Replace one match inside a savepoint: if any ball fails to insert the
+        previous rows come back untouched. The source stamp is written last,
+        so a file that failed to import is never taken as current.
+        """
+        commentary = data.get("commentary", [])
+        if not self._db.in_transaction:
+            self._db.execute("BEGIN")
+        self._db.execute("SAVEPOINT write_match")
+        try:
+            self._db.execute("DELETE FROM balls WHERE match_id = ?", (match_id,))
+            self._db.execute(
+                "INSERT OR REPLACE INTO matches (match_id, match_info, balls, digest, source, mtime_ns, size)"
+                " VALUES (?, ?, ?, ?, ?, NULL, NULL)",
+                (match_id, json.dumps(data.get("match_info", {})), len(commentary), digest, source),
+            )
+            self._db.executemany(
+                f"INSERT INTO balls (match_id, n, {_COLUMN_SQL}, extra) VALUES ({', '.join('?' * (len(BALL_COLUMNS) + 3))})",
+                (_ball_row(match_id, n, ball) for n, ball in enumerate(commentary, start=1)),
+            )
+            self._db.execute(
+                "UPDATE matches SET mtime_ns = ?, size = ? WHERE match_id = ?", (mtime_ns, size, match_id)
+            )
+        except Exception:
+            self._db.execute("ROLLBACK TO write_match")
+            self._db.execute("RELEASE write_match")
+            raise
+        self._db.execute("RELEASE write_match")
+        self._writes += 1
+
+    def put(self, match_id: str, data: Dict) -> str:
+        """Store a match given as {"match_info", "commentary"}; returns its digest."""
+        digest = hashlib.sha256(json.dumps(data, sort_keys=True).encode("utf-8")).hexdigest()
+        with self._lock:
+            self._write(match_id, data, digest)
+            self._db.commit()
+        return digest
+
+    def is_current(self, path: Path) -> bool:
+        """Whether `path` is already imported at its current mtime and size."""
+        stat = path.stat()
+        with self._lock:
+            row = self._db.execute(
+                "SELECT mtime_ns, size FROM matches WHERE match_id = ? AND source = ?",
+                (path.stem, str(path)),
+            ).fetchone()
+        return row == (stat.st_mtime_ns, stat.st_size)
+
+    def import_files(self, paths: Iterable[Path], force: bool = False) -> Dict:
+        """
+        Bulk-import match JSON files in one transaction; unchanged files are
+        skipped, files whose match id belongs to another source are counted
+        as duplicates, and a file that fails leaves its previous rows intact.
+        """
+        counts = {"imported": 0, "unchanged": 0, "duplicate": 0, "failed": 0}
+        with self._lock:
+            for path in paths:
+                path = Path(path)
+                try:
+                    stat = path.stat()
+                    row = self._db.execute(
+                        "SELECT source, mtime_ns, size FROM matches WHERE match_id = ?", (path.stem,)
+                    ).fetchone()
+                    if row is not None and row[0] != str(path):
+                        # A moved file (old source gone) or a put() match may be replaced
+                        if row[0] and Path(row[0]).exists():
+                            print(f"DEBUG: Skipping {path}: match id {path.stem!r} already imported from {row[0]}")
+                            counts["duplicate"] += 1
+                            continue
+                    elif not force and row is not None and row[1:] == (stat.st_mtime_ns, stat.st_size):
+                        counts["unchanged"] += 1
+                        continue
+                    raw = path.read_bytes()
+                    self._write(path.stem, json.loads(raw), hashlib.sha256(raw).hexdigest(),
+                                str(path), stat.st_mtime_ns, stat.st_size)
+                    counts["imported"] += 1
+                except Exception as e:
+                    print(f"DEBUG: Skipping {path}: {type(e).__name__}: {e}")
+                    counts["failed"] += 1
+            self._db.commit()
+        return counts
+
+    def import_dir(self, data_dir: Path, force: bool = False) -> Dict:
+        return self.import_files(sorted(Path(data_dir).glob("*.json")), force=force)
+
+    # ─── Reads ────────────────────────────────────────────────────────────────
+    def _header(self, match_id: str) -> Optional[tuple]:
+        with self._lock:
+            return self._db.execute(
+                "SELECT match_info, balls, digest FROM matches WHERE match_id = ?", (match_id,)
+            ).fetchone()
+
+    def version(self) -> tuple:
+        """Changes whenever a match is written, here or by another connection to the same file."""
+        with self._lock:
+            return self._writes, self._db.execute("PRAGMA data_version").fetchone()[0]
+
+    def sources(self) -> List[tuple]:
+        """(match_id, digest, source) for every stored match."""
+        with self._lock:
+            return self._db.execute("SELECT match_id, digest, source FROM matches").fetchall()
+
+    def __contains__(self, match_id: str) -> bool:
+        return self._header(match_id) is not None
+
+    def match_info(self, match_id: str) -> Optional[Dict]:
+        header = self._header(match_id)
+        return json.loads(header[0]) if header else None
+
+    def ball_count(self, match_id: str) -> int:
+        header = self._header(match_id)
+        return header[1] if header else 0
+
+    def digest(self, match_id: str) -> Optional[str]:
+        header = self._header(match_id)
+        return header[2] if header else None
+
+    def balls(self, match_id: str, start: int = 0, stop: Optional[int] = None) -> List[Dict]:
+        """commentary[start:stop] for non-negative bounds, read by primary key range."""
+        stop = self.ball_count(match_id) if stop is None else stop
+        if stop <= start:
+            return []
+        with self._lock:
+            rows = self._db.execute(
+                f"SELECT {_COLUMN_SQL}, extra FROM balls WHERE match_id = ? AND n > ? AND n <= ? ORDER BY n",
+                (match_id, start, stop),
+            ).fetchall()
+        return [_ball_dict(row) for row in rows]
+
+    def column(self, match_id: str, name: str, start: int = 0, stop: Optional[int] = None) -> List[Any]:
+        """One ball field for commentary[start:stop], without reading the others."""
+        if name not in BALL_COLUMNS:
+            raise ValueError(f"Unknown ball column {name!r}; expected one of {BALL_COLUMNS}")
+        stop = self.ball_count(match_id) if stop is None else stop
+        with self._lock:
+            values = [value for (value,) in self._db.execute(
+                f'SELECT "{name}" FROM balls WHERE match_id = ? AND n > ? AND n <= ? ORDER BY n',
+                (match_id, start, stop),
+            )]
+        if name in _BOOL_COLUMNS:
+            return [None if value is None else bool(value) for value in values]
+        return values
+
+    def load(self, match_id: str) -> Optional[Dict]:
+        """The whole match in the data/*.json layout."""
+        info = self.match_info(match_id)
+        if info is None:
+            return None
+        return {"match_info": info, "commentary": self.balls(match_id)}
+
+    def stats(self) -> Dict:
+        with self._lock:
+            matches, balls = self._db.execute("SELECT COUNT(*), COALESCE(SUM(balls), 0) FROM matches").fetchone()
+        return {
+            "matches": matches,
+            "balls": balls,
+            "db_bytes": os.path.getsize(self.db_path) if self.db_path and os.path.exists(self.db_path) else 0,
+        }
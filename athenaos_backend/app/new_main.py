@@ -3,20 +3,42 @@ AthenaOS FastAPI Backend — Main Server
 All endpoints for emotion analysis, chatbot, and story generation.
 """
 
+import asyncio
+import hashlib
 import json
 import os
+import threading
+from collections import OrderedDict
 from pathlib import Path
-from typing import List, Optional, Dict, Any
+from typing import List, Optional, Dict, Any, Tuple, Union
 
 from dotenv import load_dotenv
 load_dotenv()
 
-from fastapi import FastAPI, HTTPException, UploadFile, File
+from fastapi import FastAPI, HTTPException, UploadFile, File, Header, Query, Request
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import Response, StreamingResponse
 from pydantic import BaseModel
 
-from app.emotion_engine import analyze_match
-from app.rag_pipeline import chat as rag_chat, generate_story
+from app.analysis_cache import AnalysisCache
+from app.broadcast_hub import BroadcastHub, sse_frame
+from app.emotion_engine import (
+    ANALYSIS_SECTIONS,
+    analysis_fingerprint,
+    analyze_match,
+    inference_stats,
+    match_deltas,
+    select_balls,
+    sentiment_cache_stats,
+    sentiment_routing_stats,
+)
+from app.heavy_executor import ExecutorSaturated, HeavyExecutor
+from app.match_catalog import MatchCatalog
+from app.match_simulator import simulate_match
+from app.match_store import MatchStore
+from app.rag_pipeline import armor_stats, chat as rag_chat, chat_cache_stats, chat_stream, generate_story, story_stream
+from app.response_encoding import EncodedJSON, encode_response, negotiate_coding, negotiate_media_type
+from app.single_flight import SingleFlight
 
 # ─── App Setup ────────────────────────────────────────────────────────────────
 app = FastAPI(
@@ -35,72 +57,385 @@ app.add_middleware(
 
 # ─── Data Loading ─────────────────────────────────────────────────────────────
 DATA_DIR = Path(__file__).parent / "data"
-_match_cache: Dict[str, Dict] = {}
 
+# Ball-level match archive. data/*.json files are imported on first use (and
+# re-imported when they change); import_matches.py bulk-loads an archive.
+MATCH_STORE_PATH = os.getenv(
+    "ATHENA_MATCH_STORE",
+    str(Path(__file__).parent.parent / ".cache" / "match_store.sqlite3"),
+)
+_store = MatchStore(MATCH_STORE_PATH or None)
+
+MATCH_CACHE_SIZE = int(os.getenv("ATHENA_MATCH_CACHE_SIZE", "32"))
+# match_id -> (match data, SHA-256 of its source), least recently used first
+_match_cache: "OrderedDict[str, tuple]" = OrderedDict()
+_match_cache_lock = threading.Lock()
 
-def _load_match(match_id: str) -> Dict:
-    if match_id in _match_cache:
-        return _match_cache[match_id]
+# Concurrent requests for the same match file, analysis or story share one
+# in-flight computation instead of each starting their own. Endpoints
+# coalesce on the event loop (_run_heavy_once) before taking an executor
+# slot; the blocking helpers also coalesce across threads.
+_flights = SingleFlight()
+
+
+def _load_match_entry(match_id: str) -> tuple:
+    # A cached copy is only used while it matches the stored (current) digest
+    digest = _ensure_stored(match_id)
+    with _match_cache_lock:
+        entry = _match_cache.get(match_id)
+        if entry is not None and entry[1] == digest:
+            _match_cache.move_to_end(match_id)
+            return entry
+    return _flights.do(f"match:{match_id}", _read_match, match_id)
+
+
+def _ensure_stored(match_id: str) -> str:
+    """Import/refresh the match's data file if needed; returns the match digest."""
     path = DATA_DIR / f"{match_id}.json"
-    if not path.exists():
+    if path.exists():
+        if not _store.is_current(path):
+            _store.import_files([path])
+    digest = _store.digest(match_id)
+    if digest is None:
         raise HTTPException(status_code=404, detail=f"Match {match_id} not found")
-    with open(path, "r", encoding="utf-8") as f:
-        data = json.load(f)
-    _match_cache[match_id] = data
-    return data
-
-
-def _list_matches() -> List[Dict]:
-    matches = []
-    if DATA_DIR.exists():
-        for path in sorted(DATA_DIR.glob("*.json")):
-            try:
-                with open(path, "r", encoding="utf-8") as f:
-                    data = json.load(f)
-                info = data.get("match_info", {})
-                matches.append({
-                    "match_id": info.get("match_id", path.stem),
-                    "title": info.get("title", "Unknown"),
-                    "team_batting": info.get("team_batting", ""),
-                    "team_bowling": info.get("team_bowling", ""),
-                    "venue": info.get("venue", ""),
-                    "date": info.get("date", ""),
-                    "format": info.get("format", "T20"),
-                    "description": info.get("description", ""),
-                })
-            except Exception:
-                continue
-    return matches
-
-
-# In-memory analysis cache
-_analysis_cache: Dict[str, Dict] = {}
+    return digest
+
+
+def _read_match(match_id: str) -> tuple:
+    _ensure_stored(match_id)
+    entry = (_store.load(match_id), _store.digest(match_id))
+    with _match_cache_lock:
+        _match_cache[match_id] = entry
+        while len(_match_cache) > MATCH_CACHE_SIZE:
+            _match_cache.popitem(last=False)
+    return entry
+
+
+def _load_match(match_id: str) -> Dict:
+    return _load_match_entry(match_id)[0]
+
+
+# Metadata index of DATA_DIR plus store-imported matches; only files whose
+# mtime/size changed (and re-imported matches) are re-read.
+# Set ATHENA_CATALOG_PATH="" to keep the index in memory only.
+CATALOG_PATH = os.getenv(
+    "ATHENA_CATALOG_PATH",
+    str(Path(__file__).parent.parent / ".cache" / "match_catalog.sqlite3"),
+)
+_catalog = MatchCatalog(DATA_DIR, db_path=CATALOG_PATH or None, store=_store)
+
+
+# Analysis results keyed by input content + engine/model fingerprint.
+# ATHENA_ANALYSIS_CACHE points the optional disk tier at a SQLite file.
+_analysis_cache = AnalysisCache(
+    max_bytes=int(os.getenv("ATHENA_ANALYSIS_CACHE_BYTES", str(64 << 20))),
+    ttl=float(os.getenv("ATHENA_ANALYSIS_CACHE_TTL", "0")) or None,
+    db_path=os.getenv("ATHENA_ANALYSIS_CACHE") or None,
+)
+
+# CPU-heavy work (analysis, inference, transcription, simulation) runs
+# here instead of the shared threadpool. Beyond HEAVY_WORKERS running and
+# HEAVY_QUEUE waiting jobs, requests get HEAVY_REJECT_STATUS + Retry-After.
+HEAVY_WORKERS = int(os.getenv("ATHENA_HEAVY_WORKERS", "2"))
+HEAVY_QUEUE = int(os.getenv("ATHENA_HEAVY_QUEUE", "8"))
+HEAVY_REJECT_STATUS = int(os.getenv("ATHENA_HEAVY_REJECT_STATUS", "503"))
+_heavy = HeavyExecutor(workers=HEAVY_WORKERS, max_queue=HEAVY_QUEUE)
+
+
+async def _run_heavy(fn, *args, **kwargs):
+    try:
+        return await _heavy.run(fn, *args, **kwargs)
+    except ExecutorSaturated as e:
+        raise HTTPException(
+            status_code=HEAVY_REJECT_STATUS,
+            detail="Server busy, please retry",
+            headers={"Retry-After": str(e.retry_after)},
+        )
+
+
+async def _run_network(fn, *args, **kwargs):
+    """
+    Network-bound work (LLM calls, scraping) mostly waits on I/O, so it runs
+    on the event loop's default threadpool and never holds a heavy worker.
+    """
+    return await asyncio.to_thread(fn, *args, **kwargs)
+
+
+async def _run_heavy_once(key: str, fn, *args):
+    """
+    _run_heavy for requests that compute the same thing: concurrent callers
+    with the same `key` await the first caller's job on the event loop
+    instead of each taking an executor slot (or a 503 when none is left).
+    """
+    return await _flights.run(key, _run_heavy, fn, *args)
+
+
+def _preloaded_once(match_id: str, sections: Optional[List[str]] = None):
+    """Coalesced _analyze_preloaded(match_id, sections)."""
+    variant = ",".join(sorted(set(sections))) if sections is not None else "*"
+    return _run_heavy_once(f"preloaded:{match_id}:{variant}", _analyze_preloaded, match_id, sections)
+
+
+# What each consumer of a pre-loaded analysis actually reads
+CHAT_SECTIONS = ["match_info", "summary", "current_state"]
+
+
+def _cached_analysis(
+    content_key: str, sections: Optional[List[str]] = None, encoded: bool = False
+) -> Union[Dict, EncodedJSON, None]:
+    """
+    Cached analysis for `content_key`; a full analysis also serves any
+    section subset. With `encoded`, an entry stored for exactly these
+    sections comes back as its cached JSON bytes instead of being decoded.
+    """
+    unknown = sorted(set(sections or []) - set(ANALYSIS_SECTIONS))
+    if unknown:
+        raise HTTPException(status_code=400, detail=f"Unknown analysis section(s): {', '.join(unknown)}")
+
+    fingerprint = analysis_fingerprint()
+    raw = _analysis_cache.get_encoded(AnalysisCache.key(content_key, None, fingerprint))
+    if raw is not None and sections is not None:
+        cached = json.loads(raw)
+        return {key: cached[key] for key in ANALYSIS_SECTIONS if key in sections}
+    if raw is None and sections is not None:
+        raw = _analysis_cache.get_encoded(AnalysisCache.key(content_key, sorted(set(sections)), fingerprint))
+    if raw is None:
+        return None
+    return EncodedJSON(raw) if encoded else json.loads(raw)
+
+
+def _analyze(
+    commentary: List[Dict],
+    match_info: Dict,
+    sections: Optional[List[str]] = None,
+    content_key: Optional[str] = None,
+) -> Dict:
+    """
+    Cached analyze_match(). `content_key` identifies the input when the
+    caller already has a digest for it (a match file, an upload); otherwise
+    the commentary and match_info are hashed.
+    """
+    content_key = content_key or AnalysisCache.key(commentary, match_info)
+    cached = _cached_analysis(content_key, sections)
+    if cached is not None:
+        return cached
+
+    cache_key = AnalysisCache.key(
+        content_key, sorted(set(sections)) if sections is not None else None, analysis_fingerprint()
+    )
+
+    def compute() -> Dict:
+        # A flight that finished just before this one started has already
+        # stored its result.
+        cached = _analysis_cache.get(cache_key)
+        if cached is not None:
+            return cached
+        result = analyze_match(commentary, match_info, sections=sections)
+        _analysis_cache.put(cache_key, result)
+        return result
+
+    return _flights.do(f"analysis:{cache_key}", compute)
+
+
+def _analyze_preloaded(match_id: str, sections: Optional[List[str]] = None) -> Dict:
+    """Cached analysis of a pre-loaded match, keyed by its file contents."""
+    match_data, digest = _load_match_entry(match_id)
+    commentary = match_data.get("commentary", [])
+    match_info = match_data.get("match_info", {})
+
+    if not commentary:
+        raise HTTPException(status_code=400, detail="No commentary data found")
+
+    return _analyze(commentary, match_info, sections, content_key=f"match:{digest}")
+
+
+def _project_balls(result: Dict, ball_from: Optional[int], ball_to: Optional[int], ball_fields: Optional[List[str]]) -> Dict:
+    """`result` with its ball_by_ball narrowed to a ball range / field subset (cache left untouched)."""
+    if "ball_by_ball" not in result or (ball_from is None and ball_to is None and ball_fields is None):
+        return result
+    try:
+        rows = select_balls(result["ball_by_ball"], ball_from, ball_to, ball_fields)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return {**result, "ball_by_ball": rows}
+
+
+def _respond(request: Request, content: Any) -> Response:
+    """Analysis payload in the layout/compression the client negotiated."""
+    return encode_response(content, request.headers.get("accept"), request.headers.get("accept-encoding"))
+
+
+# Pre-loaded analyses only change with the data file, engine or model, so GET
+# resources carry strong ETags over those and can be cached by browsers/CDNs.
+ANALYSIS_MAX_AGE = int(os.getenv("ATHENA_ANALYSIS_MAX_AGE", "300"))
+ANALYSIS_CDN_MAX_AGE = int(os.getenv("ATHENA_ANALYSIS_CDN_MAX_AGE", "86400"))
+
+
+def _etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    # If-None-Match uses the weak comparison
+    return any(tag.strip().removeprefix("W/") == etag for tag in if_none_match.split(","))
+
+
+async def _conditional_response(request: Request, match_id: str, variant: Any, build) -> Response:
+    """
+    ETag-validated response for a pre-loaded match resource. The tag covers
+    the match digest, analysis fingerprint, `variant` (the query) and the
+    negotiated representation; a matching If-None-Match gets a 304 before
+    `build` (an async callable returning the content) runs.
+    """
+    accept = request.headers.get("accept")
+    accept_encoding = request.headers.get("accept-encoding")
+    # Stat + SQLite lookup (and a re-import if the file changed): keep it off the loop
+    digest = await asyncio.to_thread(_ensure_stored, match_id)
+    etag = '"' + AnalysisCache.key(
+        digest, analysis_fingerprint(), variant, negotiate_media_type(accept), negotiate_coding(accept_encoding)
+    )[:32] + '"'
+    headers = {
+        "ETag": etag,
+        "Cache-Control": f"public, max-age={ANALYSIS_MAX_AGE}, s-maxage={ANALYSIS_CDN_MAX_AGE}",
+    }
+    if _etag_matches(request.headers.get("if-none-match"), etag):
+        return Response(status_code=304, headers={**headers, "Vary": "Accept, Accept-Encoding"})
+    content = await build(digest)
+    return await asyncio.to_thread(encode_response, content, accept, accept_encoding, headers=headers)
+
+
+def _csv(value: Optional[str]) -> Optional[List[str]]:
+    return [item.strip() for item in value.split(",") if item.strip()] if value else None
+
+
+# ─── Live Stream ──────────────────────────────────────────────────────────────
+# Seconds between balls when replaying a pre-loaded match as a live stream
+STREAM_INTERVAL = float(os.getenv("ATHENA_STREAM_INTERVAL", "1.0"))
+
+
+def _stream_frames(match_id: str) -> Dict:
+    """
+    One pre-serialized SSE frame per ball of a pre-loaded match, built once
+    and shared by every viewer; the event id is the ball number.
+    """
+    match_data, digest = _load_match_entry(match_id)
+    commentary = match_data.get("commentary", [])
+    match_info = match_data.get("match_info", {})
+    if not commentary:
+        raise HTTPException(status_code=400, detail="No commentary data found")
+
+    cache_key = AnalysisCache.key(f"match:{digest}", "stream", analysis_fingerprint())
+
+    def compute() -> Dict:
+        cached = _analysis_cache.get(cache_key)
+        if cached is not None:
+            return cached
+        deltas = match_deltas(commentary, match_info)
+        frames = {
+            "match_info": match_info,
+            "frames": [sse_frame("ball", delta, delta["ball"]["ball_number"]) for delta in deltas],
+        }
+        _analysis_cache.put(cache_key, frames)
+        return frames
+
+    return _flights.do(f"stream:{cache_key}", compute)
+
+
+def _resume_from(from_ball: int, last_event_id: Optional[str]) -> int:
+    if last_event_id and last_event_id.isdigit():
+        return max(from_ball, int(last_event_id))
+    return from_ball
+
+
+def _event_stream(events) -> StreamingResponse:
+    return StreamingResponse(
+        events,
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+# Live matches: one analysis and one serialized frame per ball, fanned out to
+# every subscriber. Viewers more than LIVE_MAX_LAG balls behind skip ahead;
+# a match with no new ball for LIVE_IDLE_TIMEOUT seconds is ended.
+LIVE_MAX_LAG = int(os.getenv("ATHENA_LIVE_MAX_LAG", "32"))
+LIVE_IDLE_TIMEOUT = float(os.getenv("ATHENA_LIVE_IDLE_TIMEOUT", "1800"))
+_hub = BroadcastHub(run=_run_heavy, max_lag=LIVE_MAX_LAG, idle_timeout=LIVE_IDLE_TIMEOUT)
+_replays = set()
+
+
+async def _replay_live(match_id: str, commentary: List[Dict], interval: float) -> None:
+    """Feed a pre-loaded match into its live channel, one ball per interval."""
+    try:
+        for ball in commentary:
+            while True:
+                try:
+                    await _hub.publish(match_id, [ball])
+                    break
+                except HTTPException as e:
+                    if e.status_code != HEAVY_REJECT_STATUS:
+                        raise
+                    await asyncio.sleep(int(e.headers["Retry-After"]))
+            await asyncio.sleep(interval)
+    except (KeyError, ValueError):
+        return  # channel ended early
+    except Exception as e:
+        print(f"DEBUG: Live replay of {match_id} failed: {type(e).__name__}: {e}")
+    _hub.close(match_id)
 
 
 # ─── Request/Response Models ──────────────────────────────────────────────────
 class PreloadedRequest(BaseModel):
     match_id: str
+    sections: Optional[List[str]] = None
+    ball_from: Optional[int] = None  # 1-based, inclusive
+    ball_to: Optional[int] = None
+    ball_fields: Optional[List[str]] = None
 
 
 class CommentaryRequest(BaseModel):
     commentary: List[Dict]
     match_info: Optional[Dict] = None
+    sections: Optional[List[str]] = None
+    ball_from: Optional[int] = None  # 1-based, inclusive
+    ball_to: Optional[int] = None
+    ball_fields: Optional[List[str]] = None
 
 
 class URLRequest(BaseModel):
     url: str
+    sections: Optional[List[str]] = None
+    ball_from: Optional[int] = None  # 1-based, inclusive
+    ball_to: Optional[int] = None
+    ball_fields: Optional[List[str]] = None
 
 
 class ChatRequest(BaseModel):
     message: str
     match_id: Optional[str] = None
     history: Optional[List[Dict]] = None
+    session_id: Optional[str] = None  # answers in one session share an ArmorIQ intent token
 
 
 class StoryRequest(BaseModel):
     match_id: str
 
 
+class LiveStartRequest(BaseModel):
+    match_info: Optional[Dict] = None
+    replay_interval: Optional[float] = None  # replay the pre-loaded match at this pace (seconds/ball)
+
+
+class LiveBallsRequest(BaseModel):
+    balls: List[Dict]
+
+
+class SimulationRequest(BaseModel):
+    match_id: str
+    ball: Optional[int] = None  # simulate from after this ball (default: latest)
+    seed: Optional[int] = None
+
+
 # ─── Endpoints ────────────────────────────────────────────────────────────────
 @app.get("/health")
 def health_check():
@@ -110,37 +445,126 @@ def health_check():
         "status": "ok", 
         "project": "AthenaOS", 
         "version": "2.0.0",
-        "armoriq": "connected" if armor else "disconnected"
+        "armoriq": "connected" if armor else "disconnected",
+        "armoriq_intents": armor_stats(),
+        "sentiment_cache": sentiment_cache_stats(),
+        "sentiment_routing": sentiment_routing_stats(),
+        "analysis_cache": _analysis_cache.stats(),
+        "inference": inference_stats(),
+        "chat_cache": chat_cache_stats(),
+        "heavy_executor": _heavy.stats(),
+        "single_flight": _flights.stats(),
+        "catalog": _catalog.stats(),
+        "match_store": _store.stats(),
+        "live": {key: value for key, value in _hub.stats().items() if key != "matches"},
     }
 
 
 @app.get("/matches")
-def list_matches():
-    """List all pre-loaded matches."""
-    return {"matches": _list_matches()}
+def list_matches(
+    team: Optional[str] = None,
+    venue: Optional[str] = None,
+    format: Optional[str] = None,
+    date_from: Optional[str] = None,
+    date_to: Optional[str] = None,
+    sort: str = "match_id",
+    order: str = Query("asc", pattern="^(asc|desc)$"),
+    limit: int = Query(50, ge=1, le=500),
+    cursor: Optional[str] = None,
+):
+    """List pre-loaded matches, filtered, sorted and paged by cursor."""
+    try:
+        return _catalog.query(
+            team=team,
+            venue=venue,
+            format=format,
+            date_from=date_from,
+            date_to=date_to,
+            sort=sort,
+            descending=order == "desc",
+            limit=limit,
+            cursor=cursor,
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
+@app.get("/matches/{match_id}/analysis")
+async def match_analysis(
+    match_id: str,
+    request: Request,
+    sections: Optional[str] = None,
+    ball_from: Optional[int] = Query(None, ge=1),
+    ball_to: Optional[int] = Query(None, ge=1),
+    ball_fields: Optional[str] = None,
+):
+    """
+    Cacheable GET form of /analyze/preloaded: comma-separated `sections`
+    and `ball_fields`, ETag + Cache-Control, 304 on If-None-Match.
+    """
+    section_list, field_list = _csv(sections), _csv(ball_fields)
+
+    projected = not (ball_from is None and ball_to is None and field_list is None)
+
+    async def build(digest: str) -> Union[Dict, EncodedJSON]:
+        # Cache reads (SQLite, zlib, JSON decoding) and ball slicing stay off the loop
+        analysis = await asyncio.to_thread(_cached_analysis, f"match:{digest}", section_list, not projected)
+        if analysis is None:
+            analysis = await _preloaded_once(match_id, section_list)
+        if projected:
+            analysis = await asyncio.to_thread(_project_balls, analysis, ball_from, ball_to, field_list)
+        return analysis
+
+    variant = ("analysis", sorted(section_list) if section_list else None, ball_from, ball_to, field_list)
+    return await _conditional_response(request, match_id, variant, build)
+
+
+@app.get("/matches/{match_id}/balls")
+async def match_balls(
+    match_id: str,
+    request: Request,
+    from_ball: Optional[int] = Query(None, alias="from", ge=1),
+    to_ball: Optional[int] = Query(None, alias="to", ge=1),
+    fields: Optional[str] = None,
+):
+    """
+    Slice of a pre-loaded match's ball_by_ball analysis: balls from..to
+    (1-based, inclusive), optionally only the comma-separated `fields`.
+    """
+    field_list = _csv(fields)
+
+    def page(analysis: Dict) -> Dict:
+        rows = analysis["ball_by_ball"]
+        try:
+            balls = select_balls(rows, from_ball, to_ball, field_list)
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+        return {
+            "match_id": match_id,
+            "total_balls": len(rows),
+            "from": balls[0]["ball_number"] if balls else None,
+            "to": balls[-1]["ball_number"] if balls else None,
+            "balls": balls,
+        }
+
+    async def build(digest: str) -> Dict:
+        analysis = await asyncio.to_thread(_cached_analysis, f"match:{digest}", ["ball_by_ball"])
+        if analysis is None:
+            analysis = await _preloaded_once(match_id, ["ball_by_ball"])
+        return await asyncio.to_thread(page, analysis)
+
+    return await _conditional_response(request, match_id, ("balls", from_ball, to_ball, field_list), build)
 
 
 @app.post("/analyze/preloaded")
-def analyze_preloaded(req: PreloadedRequest):
-    """Analyze a pre-loaded match by ID."""
-    # Check cache
-    if req.match_id in _analysis_cache:
-        return _analysis_cache[req.match_id]
-
-    match_data = _load_match(req.match_id)
-    commentary = match_data.get("commentary", [])
-    match_info = match_data.get("match_info", {})
-
-    if not commentary:
-        raise HTTPException(status_code=400, detail="No commentary data found")
-
-    result = analyze_match(commentary, match_info)
-    _analysis_cache[req.match_id] = result
-    return result
+async def analyze_preloaded(req: PreloadedRequest, request: Request):
+    """Analyze a pre-loaded match by ID (optionally only some sections)."""
+    result = await _preloaded_once(req.match_id, req.sections)
+    return _respond(request, _project_balls(result, req.ball_from, req.ball_to, req.ball_fields))
 
 
 @app.post("/analyze/commentary")
-def analyze_commentary(req: CommentaryRequest):
+async def analyze_commentary(req: CommentaryRequest, request: Request):
     """Analyze user-pasted commentary."""
     if not req.commentary:
         raise HTTPException(status_code=400, detail="No commentary provided")
@@ -161,85 +585,268 @@ def analyze_commentary(req: CommentaryRequest):
         total_runs = sum(b.get("runs", 0) for b in req.commentary)
         match_info["target"] = total_runs + 1  # estimate
 
-    result = analyze_match(req.commentary, match_info)
-    return result
+    sections = sorted(set(req.sections)) if req.sections is not None else None
+    key = f"commentary:{AnalysisCache.key(req.commentary, match_info, sections)}"
+    result = await _run_heavy_once(key, _analyze, req.commentary, match_info, req.sections)
+    return _respond(request, _project_balls(result, req.ball_from, req.ball_to, req.ball_fields))
 
 
-@app.post("/analyze/url")
-def analyze_url(req: URLRequest):
-    """Scrape ESPN URL and analyze."""
+def _scrape(url: str) -> Dict:
     try:
         from app.scraper import scrape_espn
-        match_data = scrape_espn(req.url)
-        result = analyze_match(match_data["commentary"], match_data["match_info"])
-        return result
+        return scrape_espn(url)
     except ImportError:
         raise HTTPException(status_code=501, detail="Scraper module not available")
     except Exception as e:
         raise HTTPException(status_code=400, detail=f"Failed to scrape URL: {str(e)}")
 
 
+async def _scrape_and_analyze(url: str, sections: Optional[List[str]]) -> Dict:
+    match_data = await _run_network(_scrape, url)
+    return await _run_heavy(_analyze, match_data["commentary"], match_data["match_info"], sections)
+
+
+@app.post("/analyze/url")
+async def analyze_url(req: URLRequest, request: Request):
+    """Scrape ESPN URL and analyze."""
+    sections = ",".join(sorted(set(req.sections))) if req.sections is not None else "*"
+    result = await _flights.run(f"url:{req.url}:{sections}", _scrape_and_analyze, req.url, req.sections)
+    return _respond(request, _project_balls(result, req.ball_from, req.ball_to, req.ball_fields))
+
+
+def _transcribe_and_analyze(content: bytes, filename: str, content_key: str) -> Dict:
+    from app.video_processor import process_video
+    # 1. Transcribe video -> commentary + info
+    raw_data = process_video(content, filename)
+
+    # 2. Analyze the commentary -> full stats
+    return _analyze(raw_data["commentary"], raw_data["match_info"], content_key=content_key)
+
+
 @app.post("/analyze/video")
-async def analyze_video(file: UploadFile = File(...)):
+async def analyze_video(request: Request, file: UploadFile = File(...)):
     """Process uploaded video/audio → Whisper transcription → analyze."""
     try:
-        from app.video_processor import process_video
         content = await file.read()
-        # 1. Transcribe video -> commentary + info
-        raw_data = process_video(content, file.filename or "upload.mp4")
-        
-        # 2. Analyze the commentary -> full stats
-        result = analyze_match(raw_data["commentary"], raw_data["match_info"])
-        return result
+        filename = file.filename or "upload.mp4"
+
+        # Same upload analyzed before -> skip transcription entirely
+        content_key = f"video:{hashlib.sha256(content).hexdigest()}:{filename}"
+        cached = _analysis_cache.get(AnalysisCache.key(content_key, None, analysis_fingerprint()))
+        if cached is not None:
+            return _respond(request, cached)
+
+        result = await _run_heavy(_transcribe_and_analyze, content, filename, content_key)
+        return _respond(request, result)
+    except HTTPException:
+        raise
     except ImportError:
         raise HTTPException(status_code=501, detail="Video processor not available")
     except Exception as e:
         raise HTTPException(status_code=400, detail=f"Failed to process video: {str(e)}")
 
 
+def _predict_preloaded(req: SimulationRequest) -> Dict:
+    _ensure_stored(req.match_id)
+    match_info = _store.match_info(req.match_id)
+
+    if req.ball is None or req.ball >= _store.ball_count(req.match_id):
+        commentary = _load_match(req.match_id).get("commentary", [])
+        current_state = _analyze_preloaded(req.match_id, ["current_state"])["current_state"]
+    else:
+        if req.ball < 1:
+            raise HTTPException(status_code=400, detail="ball must be at least 1")
+        # Only the prefix is read from the store
+        commentary = _store.balls(req.match_id, 0, req.ball)
+        current_state = None
+
+    simulation = simulate_match(commentary, match_info, current_state, seed=req.seed)
+    return {"match_id": req.match_id, "ball": len(commentary), "simulation": simulation}
+
+
+@app.post("/predict/preloaded")
+async def predict_preloaded(req: SimulationRequest):
+    """Monte Carlo win probability, next-over outlook and next-ball what-ifs."""
+    return await _run_heavy_once(f"predict:{req.match_id}:{req.ball}:{req.seed}", _predict_preloaded, req)
+
+
+@app.get("/stream/preloaded/{match_id}")
+async def stream_preloaded(
+    match_id: str,
+    request: Request,
+    interval: Optional[float] = None,
+    from_ball: int = Query(0, alias="from"),
+    last_event_id: Optional[str] = Header(None),
+):
+    """
+    Server-sent events replay of a pre-loaded match: a `start` event with
+    match_info, one `ball` delta per delivery, then `end`. Reconnecting
+    clients resume after Last-Event-ID (or ?from=<ball number>).
+    """
+    stream = await _run_heavy_once(f"stream:{match_id}", _stream_frames, match_id)
+    frames = stream["frames"]
+    start = min(max(_resume_from(from_ball, last_event_id), 0), len(frames))
+    delay = STREAM_INTERVAL if interval is None else max(interval, 0.0)
+
+    async def events():
+        yield sse_frame("start", {"match_info": stream["match_info"], "total_balls": len(frames), "from": start})
+        for frame in frames[start:]:
+            if await request.is_disconnected():
+                return
+            yield frame
+            await asyncio.sleep(delay)
+        yield sse_frame("end", {"total_balls": len(frames)})
+
+    return _event_stream(events())
+
+
+@app.get("/live")
+def list_live():
+    """Live matches and their subscriber counts."""
+    return _hub.stats()
+
+
+@app.post("/live/{match_id}/start")
+async def start_live(match_id: str, req: LiveStartRequest):
+    """
+    Open a live channel. Without match_info, the pre-loaded match's info is
+    used; with replay_interval, its commentary is fed in at that pace.
+    """
+    if _hub.get(match_id) is not None:
+        raise HTTPException(status_code=409, detail=f"Match {match_id} is already live")
+
+    match_info = req.match_info
+    commentary: List[Dict] = []
+    if match_info is None or req.replay_interval is not None:
+        match_data = _load_match(match_id)
+        match_info = match_info or match_data.get("match_info", {})
+        commentary = match_data.get("commentary", [])
+
+    channel = _hub.open(match_id, match_info)
+    if req.replay_interval is not None:
+        task = asyncio.create_task(_replay_live(match_id, commentary, max(req.replay_interval, 0.0)))
+        _replays.add(task)
+        task.add_done_callback(_replays.discard)
+    return channel.stats()
+
+
+@app.post("/live/{match_id}/balls")
+async def publish_live(match_id: str, req: LiveBallsRequest):
+    """Ingest the next deliveries of a live match and broadcast them."""
+    if _hub.get(match_id) is None:
+        raise HTTPException(status_code=404, detail=f"Match {match_id} is not live")
+    try:
+        balls = await _hub.publish(match_id, req.balls)
+    except (KeyError, ValueError):
+        raise HTTPException(status_code=409, detail=f"Match {match_id} has ended")
+    return {"match_id": match_id, "balls": balls}
+
+
+@app.post("/live/{match_id}/end")
+def end_live(match_id: str):
+    """End a live match; connected viewers receive the remaining balls and `end`."""
+    if _hub.get(match_id) is None:
+        raise HTTPException(status_code=404, detail=f"Match {match_id} is not live")
+    _hub.close(match_id)
+    return {"match_id": match_id, "status": "ended"}
+
+
+@app.get("/live/{match_id}/stream")
+async def stream_live(
+    match_id: str,
+    from_ball: int = Query(0, alias="from"),
+    last_event_id: Optional[str] = Header(None),
+):
+    """Server-sent events for a live match, shared with every other viewer."""
+    channel = _hub.get(match_id)
+    if channel is None:
+        raise HTTPException(status_code=404, detail=f"Match {match_id} is not live")
+    return _event_stream(_hub.subscribe(channel, _resume_from(from_ball, last_event_id)))
+
+
+def _chat_context(match_id: str) -> Tuple[Optional[Dict], Optional[str]]:
+    """(match context, semantic cache scope) for a chat about `match_id`."""
+    try:
+        match_context = _analyze_preloaded(match_id, CHAT_SECTIONS)
+        # Answers about a match are reused only while its analysis is unchanged
+        return match_context, f"{match_id}:{_store.digest(match_id)}:{analysis_fingerprint()}"
+    except Exception:
+        return None, None
+
+
+async def _chat_context_once(req: ChatRequest) -> Tuple[Optional[Dict], Optional[str]]:
+    """Coalesced _chat_context; questions without a match never touch the executor."""
+    if not req.match_id:
+        return None, None
+    return await _run_heavy_once(f"chat-context:{req.match_id}", _chat_context, req.match_id)
+
+
 @app.post("/chat")
-def chat_endpoint(req: ChatRequest):
+async def chat_endpoint(req: ChatRequest):
     """RAG-powered chatbot."""
-    match_context = None
-    if req.match_id:
-        if req.match_id in _analysis_cache:
-            match_context = _analysis_cache[req.match_id]
-        else:
-            try:
-                match_data = _load_match(req.match_id)
-                match_context = analyze_match(
-                    match_data.get("commentary", []),
-                    match_data.get("match_info", {}),
-                )
-                _analysis_cache[req.match_id] = match_context
-            except Exception:
-                pass
-
-    response = rag_chat(
+    match_context, cache_scope = await _chat_context_once(req)
+    response = await _run_network(
+        rag_chat,
         message=req.message,
         match_context=match_context,
         history=req.history or [],
+        cache_scope=cache_scope,
+        session_id=req.session_id,
     )
     return {"response": response, "match_id": req.match_id}
 
 
-@app.post("/report/generate")
-def generate_report(req: StoryRequest):
-    """Generate AI story + full report data."""
-    if req.match_id in _analysis_cache:
-        match_data = _analysis_cache[req.match_id]
-    else:
-        raw = _load_match(req.match_id)
-        match_data = analyze_match(raw.get("commentary", []), raw.get("match_info", {}))
-        _analysis_cache[req.match_id] = match_data
+def _token_stream(request: Request, chunks, end: Dict) -> StreamingResponse:
+    """SSE `token` events ({"text"}) for each generated chunk, then `end`."""
+
+    async def events():
+        async for text in chunks:
+            if await request.is_disconnected():
+                return
+            yield sse_frame("token", {"text": text})
+        yield sse_frame("end", end)
 
-    story = generate_story(match_data)
+    return _event_stream(events())
+
+
+@app.post("/chat/stream")
+async def chat_stream_endpoint(req: ChatRequest, request: Request):
+    """RAG chatbot answer streamed token by token as server-sent events."""
+    match_context, cache_scope = await _chat_context_once(req)
+    chunks = chat_stream(
+        message=req.message,
+        match_context=match_context,
+        history=req.history or [],
+        cache_scope=cache_scope,
+        session_id=req.session_id,
+    )
+    return _token_stream(request, chunks, {"match_id": req.match_id})
+
+
+async def _generate_report(match_id: str) -> Dict:
+    # The report returns the whole analysis alongside the story
+    match_data = await _preloaded_once(match_id)
+
+    story = await _run_network(generate_story, match_data, match_id)
     return {
         "story": story,
         "match_data": match_data,
     }
 
 
+@app.post("/report/generate")
+async def generate_report(req: StoryRequest, request: Request):
+    """Generate AI story + full report data."""
+    return _respond(request, await _flights.run(f"report:{req.match_id}", _generate_report, req.match_id))
+
+
+@app.post("/report/stream")
+async def stream_report(req: StoryRequest, request: Request):
+    """The report story streamed token by token; the analysis itself is at /matches/{id}/analysis."""
+    match_data = await _preloaded_once(req.match_id)
+    return _token_stream(request, story_stream(match_data, req.match_id), {"match_id": req.match_id})
+
+
 if __name__ == "__main__":
     import uvicorn
     uvicorn.run(app, host="0.0.0.0", port=8000)
@@ -1,13 +1,18 @@
 """
 AthenaOS RAG Pipeline
-In-memory knowledge base + sentence-transformers embeddings + Gemini 1.5 Flash
+File-backed knowledge base + persisted sentence-transformers embeddings + Gemini 1.5 Flash
 for chatbot and story generation.
 """
 
 import os
 import json
+import time
+import asyncio
+import threading
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor, TimeoutError as FutureTimeout
 import numpy as np
-from typing import List, Dict, Optional
+from typing import Any, AsyncIterator, List, Dict, Optional, Tuple
 from dotenv import load_dotenv
 env_path = os.path.join(os.path.dirname(os.path.dirname(__file__)), ".env")
 print(f"DEBUG: Loading .env from: {env_path}")
@@ -24,14 +29,43 @@ except ImportError:
 from sentence_transformers import SentenceTransformer
 from armoriq_sdk import ArmorIQClient
 
+from app.hybrid_retriever import HybridRetriever
+from app.kb_index import EmbeddingIndex, document_text, load_documents
+from app.semantic_cache import SemanticCache
+from app.single_flight import SingleFlight
+
 # ─── ArmorIQ Configuration ───────────────────────────────────────────────────
 _armor_client: Optional[ArmorIQClient] = None
+_armor_lock = threading.Lock()
+
+# Intent capture runs on its own threads alongside retrieval/prompt building;
+# answers wait at most ARMOR_TIMEOUT seconds (from the start of the request)
+# for it. With ARMOR_WORKERS busy and ARMOR_QUEUE captures waiting, further
+# requests skip capture and carry the offline footer. A token is reused for
+# ARMOR_TOKEN_TTL only within one client chat session (or one match's story);
+# a chat without a session_id captures its own.
+ARMOR_TIMEOUT = float(os.getenv("ATHENA_ARMOR_TIMEOUT", "2.0"))
+ARMOR_TOKEN_TTL = float(os.getenv("ATHENA_ARMOR_TOKEN_TTL", "300"))
+ARMOR_TOKEN_CACHE_SIZE = 256
+ARMOR_WORKERS = int(os.getenv("ATHENA_ARMOR_WORKERS", "4"))
+ARMOR_QUEUE = int(os.getenv("ATHENA_ARMOR_QUEUE", "16"))
+_armor_pool = ThreadPoolExecutor(max_workers=ARMOR_WORKERS, thread_name_prefix="armoriq")
+_armor_slots = threading.BoundedSemaphore(ARMOR_WORKERS + ARMOR_QUEUE)
+_armor_stats = {"submitted": 0, "skipped": 0}
+_intent_tokens: "OrderedDict[str, Tuple[Any, float]]" = OrderedDict()
+_token_flights = SingleFlight()
+
+CHAT_FOOTER = "\n\n*AthenaBot can make mistakes. Please verify by yourself.*"
+ARMOR_OFFLINE_FOOTER = "\n\n[Security: ArmorIQ Offline / Fallback Mode]" + CHAT_FOOTER
+
 
 def _get_armor_client():
     global _armor_client
-    if _armor_client is None:
+    if _armor_client is not None:
+        return _armor_client
+    with _armor_lock:
         api_key = os.getenv("ARMOR_IQ_API_KEY", "")
-        if api_key:
+        if _armor_client is None and api_key:
             try:
                 print(f"DEBUG: Initializing ArmorIQClient with key: {api_key[:10]}...")
                 _armor_client = ArmorIQClient(
@@ -45,135 +79,98 @@ def _get_armor_client():
                 print(f"DEBUG: ArmorIQClient Initialization Error: {e}")
     return _armor_client
 
+
+def _intent_token(armor, scope: Optional[str], llm: str, prompt: str, plan: Dict):
+    """
+    Intent token for `scope` (a chat session, a match story) from the shared
+    client, reused until it expires; concurrent first requests share one
+    capture. Without a scope every call captures its own token.
+    """
+    if scope is None:
+        return _capture_token(armor, None, llm, prompt, plan)
+    with _armor_lock:
+        cached = _intent_tokens.get(scope)
+        if cached is not None and cached[1] > time.time():
+            _intent_tokens.move_to_end(scope)
+            return cached[0]
+    return _token_flights.do(scope, _capture_token, armor, scope, llm, prompt, plan)
+
+
+def _capture_token(armor, scope: Optional[str], llm: str, prompt: str, plan: Dict):
+    now = time.time()
+    capture = armor.capture_plan(llm=llm, prompt=prompt, plan=plan)
+    print("DEBUG: ArmorIQ requesting Intent Token...")
+    token = armor.get_intent_token(capture)
+    if scope is None:
+        return token
+
+    expires = now + ARMOR_TOKEN_TTL
+    sdk_expiry = getattr(token, "expires_at", None)
+    if isinstance(sdk_expiry, (int, float)):
+        expires = min(expires, sdk_expiry)
+    with _armor_lock:
+        _intent_tokens[scope] = (token, expires)
+        while len(_intent_tokens) > ARMOR_TOKEN_CACHE_SIZE:
+            _intent_tokens.popitem(last=False)
+    return token
+
+
+def _submit_intent(fn, *args) -> Optional[Future]:
+    """fn(*args) on the ArmorIQ pool, or None (capture skipped) when it is saturated."""
+    if not _armor_slots.acquire(blocking=False):
+        with _armor_lock:
+            _armor_stats["skipped"] += 1
+        print("DEBUG: ArmorIQ pool saturated, skipping intent capture")
+        return None
+    try:
+        future = _armor_pool.submit(fn, *args)
+    except Exception:
+        _armor_slots.release()
+        raise
+    future.add_done_callback(lambda _: _armor_slots.release())
+    with _armor_lock:
+        _armor_stats["submitted"] += 1
+    return future
+
+
+def armor_stats() -> Dict:
+    with _armor_lock:
+        return {**_armor_stats, "tokens": len(_intent_tokens)}
+
+
+def _intent_result(future: Optional[Future], started: float, default: Any = None) -> Any:
+    """`future`'s result if it lands within ARMOR_TIMEOUT of `started`, else `default`."""
+    if future is None:
+        return default
+    try:
+        return future.result(timeout=max(0.0, started + ARMOR_TIMEOUT - time.perf_counter()))
+    except FutureTimeout:
+        print(f"DEBUG: ArmorIQ Intent Assurance timed out after {ARMOR_TIMEOUT}s")
+        return default
+
+
+async def _intent_result_async(future: Optional[Future], started: float, default: Any = None) -> Any:
+    if future is None:
+        return default
+    try:
+        return await asyncio.wait_for(
+            asyncio.shield(asyncio.wrap_future(future)),
+            timeout=max(0.0, started + ARMOR_TIMEOUT - time.perf_counter()),
+        )
+    except asyncio.TimeoutError:
+        print(f"DEBUG: ArmorIQ Intent Assurance timed out after {ARMOR_TIMEOUT}s")
+        return default
+
 # ─── Knowledge Base ───────────────────────────────────────────────────────────
-KNOWLEDGE_BASE = [
-    {
-        "id": "et_formula",
-        "title": "E(t) Emotion Formula",
-        "content": """
-The E(t) formula is AthenaOS's core emotional quantification engine.
-E(t) = 100 × (0.25·S + 0.40·P + 0.15·M + 0.20·S×P) × event_multipliers
-Where:
-- S = Sentiment score [0,1] derived from VADER with cricket-specific lexicon
-- P = Pressure Index [0,1] — weighted combination of RRR, wickets, phase, close-match factor
-- M = Momentum [0,1] — last 12 balls weighted average
-- S×P = Interaction term — captures how sentiment amplifies under pressure
-Event multipliers: wicket=1.4x, six under pressure (P>0.6)=1.5x, four under pressure (P>0.7)=1.3x, dropped catch=1.3x, dramatic phrase=1.15x
-Final output is EMA-smoothed with α=0.3 to prevent spike artifacts.
-Score ranges: 0-35 = CALM, 35-55 = BUILDING, 55-75 = HIGH INTENSITY, 75-100 = PEAK EMOTION
-""",
-    },
-    {
-        "id": "pressure_index",
-        "title": "Pressure Index Methodology",
-        "content": """
-The Pressure Index (0 to 1) quantifies the psychological burden on the batting team.
-Components:
-- 35% RRR Pressure: Required Run Rate / 15, capped at 1.0. A RRR of 15 = maximum pressure.
-- 25% Wickets Pressure: Exponential function — losing 8 wickets is exponentially worse than 4.
-  Formula: (exp(wickets/4) - 1) / (exp(10/4) - 1)
-- 20% Phase Pressure: Exponential increase in later overs. (ball_number/total_balls)^1.5
-- 20% Close Match Factor: Peaks when chase is ~50% complete. 1 - |completion - 0.5| × 2
-Pressure levels: 0-0.25 = LOW, 0.25-0.5 = MODERATE, 0.5-0.75 = HIGH, 0.75-1.0 = EXTREME
-""",
-    },
-    {
-        "id": "resilience_metric",
-        "title": "Resilience Metric Definition",
-        "content": """
-Resilience in AthenaOS measures a batter's ability to maintain performance under emotional pressure.
-Resilience Score (0-100) = 100 - (emotion_standard_deviation × 2)
-A high resilience score means the batter's emotional state remained consistent even as match pressure escalated.
-Clutch Rating categories:
-- Elite Clutch: SR > 150 with 2+ sixes — thrives under maximum pressure
-- Solid: SR > 120 — reliable under pressure
-- Fair: SR > 90 — slightly affected by pressure
-- Cold: SR ≤ 90 — struggles under pressure
-Emotional Profile categories:
-- Ice Cold: avg_emotion ≤ 35 — unaffected, machine-like consistency
-- Steady: avg_emotion 35-50 — controlled, professional
-- Intense: avg_emotion 50-70 — engaged, competitive
-- On Fire: avg_emotion > 70 — peak performance state
-""",
-    },
-    {
-        "id": "collapse_risk",
-        "title": "Collapse Risk Algorithm",
-        "content": """
-Collapse Risk % predicts the probability of a batting collapse in the next 3 overs.
-Base risk: 10%
-Additions:
-- 3+ wickets in last 3 overs: +35%
-- 2 wickets in last 3 overs: +20%
-- >50% dot balls in last 3 overs: +15%
-- Pressure > 0.7 (extreme): +15%
-- Pressure > 0.5 (high): +8%
-- RRR > 12: +15%
-- RRR > 9: +8%
-Maximum cap: 95%
-Risk levels: 0-30% = Low, 30-50% = Medium, 50-70% = High, 70-95% = Critical
-""",
-    },
-    {
-        "id": "harmanpreet_case_study",
-        "title": "Harmanpreet Kaur — Case Study in Clutch Performance",
-        "content": """
-Harmanpreet Kaur's 171* against Australia in the 2018 ICC Women's World Cup semi-final is the defining case study for AthenaOS.
-In that innings, Harmanpreet faced a collapsing team (India had lost wickets at regular intervals) and responded with an extraordinary display of controlled aggression.
-AthenaOS analysis of that innings would show:
-- Pressure Index peaked at 0.85+ in the middle overs
-- E(t) scores consistently above 80 during her assault
-- Resilience score: 94/100 — almost no variance in performance despite escalating pressure
-- Clutch Rating: Elite Clutch — SR of 191 with 20 fours and 7 sixes
-- Emotional Profile: On Fire — sustained peak emotion state for 115 balls
-- Momentum shift: India's momentum went from -0.7 to +0.9 within 5 overs of her acceleration
-This innings exemplifies how AthenaOS can identify and quantify the psychological turning point of a match.
-""",
-    },
-    {
-        "id": "wpl_context",
-        "title": "Women's Premier League (WPL) Context",
-        "content": """
-The Women's Premier League (WPL) launched in 2023 is India's premier women's T20 franchise tournament.
-Teams: Mumbai Indians Women, Delhi Capitals Women, Royal Challengers Bangalore Women, UP Warriorz, Gujarat Giants.
-AthenaOS was built specifically for the WPL context — to help fans, coaches, and analysts understand the emotional narrative of women's cricket.
-Key WPL emotional patterns observed:
-- Death over pressure (overs 16-20) generates the highest E(t) scores
-- Powerplay wickets have outsized psychological impact (pressure multiplier effect)
-- Momentum shifts in WPL matches are more frequent than in bilateral series
-- Harmanpreet Kaur (MI-W captain) consistently shows Elite Clutch ratings in pressure situations
-The WPL represents a new era for women's cricket in India, and AthenaOS aims to give it the analytical depth it deserves.
-""",
-    },
-    {
-        "id": "momentum_theory",
-        "title": "Momentum Theory in Cricket",
-        "content": """
-Momentum in AthenaOS is calculated as a weighted average of the last 12 balls' outcomes.
-Formula: weighted_sum / total_weight where recent balls have higher weights (1 to 12).
-Ball score = runs/6 - (1 if wicket else 0)
-Momentum range: -1.0 (complete bowling dominance) to +1.0 (complete batting dominance)
-Momentum shift is detected when: sign changes AND magnitude > 0.4
-Psychological research shows momentum in cricket is real — teams that score 15+ in an over gain a psychological edge that affects the next 3 overs.
-In women's cricket, momentum shifts tend to be more decisive — once a team gains momentum, they hold it longer on average.
-""",
-    },
-    {
-        "id": "affective_computing",
-        "title": "Affective Computing Foundation",
-        "content": """
-AthenaOS is built on the principles of Affective Computing, pioneered by Rosalind Picard at MIT Media Lab (1997).
-Affective Computing is the study and development of systems that can recognize, interpret, process, and simulate human emotions.
-In sports analytics, affective computing enables:
-- Quantification of psychological states from observable data (commentary, events)
-- Real-time emotional tracking without biometric sensors
-- Narrative generation that captures the human story behind statistics
-AthenaOS applies affective computing to cricket by treating ball-by-ball commentary as an emotional signal stream.
-The E(t) formula is our implementation of Picard's affect recognition framework adapted for cricket's unique emotional vocabulary.
-Key insight: Cricket commentary is rich in emotional language — words like "magnificent", "disaster", "heartbreak" carry precise emotional valence that VADER (with cricket-specific lexicon) can quantify.
-""",
-    },
-]
+# Documents live as markdown/JSON files; embeddings persist across restarts
+KB_DIR = os.getenv("ATHENA_KB_DIR", os.path.join(os.path.dirname(__file__), "knowledge_base"))
+KB_INDEX_DIR = os.getenv(
+    "ATHENA_KB_INDEX_DIR",
+    os.path.join(os.path.dirname(os.path.dirname(__file__)), ".cache", "kb_index"),
+)
+EMBEDDING_MODEL = "all-MiniLM-L6-v2"
+
+KNOWLEDGE_BASE = load_documents(KB_DIR)
 
 
 # ─── Embedding Model ──────────────────────────────────────────────────────────
@@ -184,27 +181,43 @@ _embeddings: Optional[np.ndarray] = None
 def _get_model() -> SentenceTransformer:
     global _model
     if _model is None:
-        _model = SentenceTransformer("all-MiniLM-L6-v2")
+        _model = SentenceTransformer(EMBEDDING_MODEL)
     return _model
 
 
+def _encode_documents(texts: List[str]) -> np.ndarray:
+    return _get_model().encode(texts, normalize_embeddings=True)
+
+
 def _get_embeddings() -> np.ndarray:
+    """Document embeddings from the on-disk index; only new or edited documents are encoded."""
     global _embeddings
     if _embeddings is None:
-        model = _get_model()
-        texts = [f"{doc['title']}\n{doc['content']}" for doc in KNOWLEDGE_BASE]
-        _embeddings = model.encode(texts, normalize_embeddings=True)
+        index = EmbeddingIndex(EMBEDDING_MODEL, _encode_documents, KB_INDEX_DIR)
+        _embeddings = index.build(KNOWLEDGE_BASE)
+        print(f"DEBUG: KB index ready ({index.reused} cached, {index.encoded} encoded)")
     return _embeddings
 
 
-def _retrieve(query: str, top_k: int = 3) -> List[Dict]:
-    """Cosine similarity retrieval."""
-    model = _get_model()
-    embeddings = _get_embeddings()
-    query_emb = model.encode([query], normalize_embeddings=True)
-    scores = np.dot(embeddings, query_emb.T).flatten()
-    top_indices = np.argsort(scores)[::-1][:top_k]
-    return [KNOWLEDGE_BASE[i] for i in top_indices]
+_retriever: Optional[HybridRetriever] = None
+
+
+def _get_retriever() -> HybridRetriever:
+    global _retriever
+    if _retriever is None:
+        _retriever = HybridRetriever(_get_embeddings(), [document_text(doc) for doc in KNOWLEDGE_BASE])
+    return _retriever
+
+
+def _embed_query(query: str) -> np.ndarray:
+    return _get_model().encode([query], normalize_embeddings=True)[0]
+
+
+def _retrieve(query: str, top_k: int = 3, query_emb: Optional[np.ndarray] = None) -> List[Dict]:
+    """Hybrid retrieval: ANN cosine similarity + BM25, fused by reciprocal rank."""
+    if query_emb is None:
+        query_emb = _embed_query(query)
+    return [KNOWLEDGE_BASE[i] for i in _get_retriever().search(query_emb, query, k=top_k)]
 
 
 # ─── Gemini Setup ─────────────────────────────────────────────────────────────
@@ -219,14 +232,45 @@ def _get_gemini():
         return genai.GenerativeModel("gemini-1.5-flash")  # type: ignore
 
 
+async def _stream_gemini(gemini, contents, legacy_contents, max_output_tokens: int, temperature: float) -> AsyncIterator[str]:
+    """Text chunks of a streamed Gemini completion (async API of either SDK)."""
+    if _GENAI_NEW:
+        stream = await gemini.aio.models.generate_content_stream(
+            model="gemini-2.0-flash",
+            contents=contents,
+            config=genai_types.GenerateContentConfig(
+                max_output_tokens=max_output_tokens, temperature=temperature
+            ),
+        )
+        async for chunk in stream:
+            if chunk.text:
+                yield chunk.text
+    else:
+        response = await gemini.generate_content_async(
+            legacy_contents,
+            generation_config={"max_output_tokens": max_output_tokens, "temperature": temperature},
+            stream=True,
+        )
+        async for chunk in response:
+            if chunk.text:
+                yield chunk.text
+
+
 # ─── Chatbot ──────────────────────────────────────────────────────────────────
-def chat(
-    message: str,
-    match_context: Optional[Dict] = None,
-    history: Optional[List[Dict]] = None,
-) -> str:
-    """RAG-powered chatbot response."""
-    # 1. ArmorIQ Intent Assurance (Do this first!)
+# Near-duplicate questions in the same scope are answered without Gemini
+_response_cache = SemanticCache(
+    threshold=float(os.getenv("ATHENA_CHAT_CACHE_THRESHOLD", "0.92")),
+    max_entries=int(os.getenv("ATHENA_CHAT_CACHE_SIZE", "1024")),
+    ttl=float(os.getenv("ATHENA_CHAT_CACHE_TTL", "3600")),
+)
+
+
+def chat_cache_stats() -> Dict:
+    return _response_cache.stats()
+
+
+def _chat_intent(message: str, session_id: Optional[str]) -> str:
+    """ArmorIQ intent assurance for a chat answer; returns the footer to append."""
     armor = _get_armor_client()
     if armor:
         plan_dict = {
@@ -240,24 +284,22 @@ def chat(
         }
         try:
             print(f"DEBUG: ArmorIQ capturing plan for: {message[:30]}...")
-            capture = armor.capture_plan(
-                llm="gemini-2.0-flash",
-                prompt=message,
-                plan=plan_dict
-            )
-            print("DEBUG: ArmorIQ requesting Intent Token...")
-            token = armor.get_intent_token(capture)
+            scope = f"chat:{session_id}" if session_id else None
+            token = _intent_token(armor, scope, "gemini-2.0-flash", message, plan_dict)
             print(f"DEBUG: ArmorIQ Dashboard Sync Success. Token: {token.token_id}")
             # Attach token to a context variable to return it later
-            message_meta = f"\n\n[Security: ArmorIQ Verified intent-token={token.token_id[:12]}]\n*AthenaBot can make mistakes. Please verify by yourself.*"
+            message_meta = f"\n\n[Security: ArmorIQ Verified intent-token={token.token_id[:12]}]" + CHAT_FOOTER
         except Exception as e:
             print(f"DEBUG: ArmorIQ Intent Assurance Error: {type(e).__name__}: {e}")
-            message_meta = "\n\n[Security: ArmorIQ Offline / Fallback Mode]\n*AthenaBot can make mistakes. Please verify by yourself.*"
+            message_meta = ARMOR_OFFLINE_FOOTER
     else:
-        message_meta = "\n\n*AthenaBot can make mistakes. Please verify by yourself.*"
+        message_meta = CHAT_FOOTER
+    return message_meta
 
-    # 2. Retrieve relevant knowledge
-    retrieved = _retrieve(message, top_k=3)
+
+def _chat_prompt(message: str, match_context: Optional[Dict], query_emb: np.ndarray) -> str:
+    """System prompt with the retrieved knowledge and match context."""
+    retrieved = _retrieve(message, top_k=3, query_emb=query_emb)
     knowledge_text = "\n\n".join(
         f"[{doc['title']}]\n{doc['content'].strip()}" for doc in retrieved
     )
@@ -293,12 +335,41 @@ KNOWLEDGE BASE:
 
 Answer the user's question using the knowledge base and match context above.
 If you don't have enough data, say so honestly rather than making things up."""
+    return system_prompt
+
+
+def chat(
+    message: str,
+    match_context: Optional[Dict] = None,
+    history: Optional[List[Dict]] = None,
+    cache_scope: Optional[str] = None,
+    session_id: Optional[str] = None,
+) -> str:
+    """
+    RAG-powered chatbot response. `cache_scope` identifies the match state
+    the answer depends on (None for questions without match context).
+    Cached answers go through the same intent assurance as fresh ones,
+    under the intent token of `session_id` (a fresh capture without one).
+    """
+    # 1. ArmorIQ Intent Assurance, in flight during the cache lookup / retrieval
+    started = time.perf_counter()
+    intent = _submit_intent(_chat_intent, message, session_id)
+
+    query_emb = _embed_query(message)
+    cached = _response_cache.get(query_emb, cache_scope)
+    if cached is not None:
+        return cached + _intent_result(intent, started, ARMOR_OFFLINE_FOOTER)
+
+    # 2. Retrieve relevant knowledge
+    system_prompt = _chat_prompt(message, match_context, query_emb)
+    message_meta = _intent_result(intent, started, ARMOR_OFFLINE_FOOTER)
 
     gemini = _get_gemini()
     if not gemini:
         return _fallback_response(message, match_context) + message_meta
 
     try:
+        start = time.perf_counter()
         if _GENAI_NEW:
             response = gemini.models.generate_content(
                 model="gemini-2.0-flash",
@@ -307,18 +378,66 @@ If you don't have enough data, say so honestly rather than making things up."""
                     max_output_tokens=512, temperature=0.7
                 ),
             )
-            return response.text + message_meta
         else:
             response = gemini.generate_content(
                 [system_prompt, f"User question: {message}"],
                 generation_config={"max_output_tokens": 512, "temperature": 0.7},
             )
-            return response.text + message_meta
+        _response_cache.put(query_emb, response.text, cache_scope, time.perf_counter() - start)
+        return response.text + message_meta
     except Exception as e:
         print(f"DEBUG: Generation Error: {e}")
         return _fallback_response(message, match_context) + message_meta
 
 
+async def chat_stream(
+    message: str,
+    match_context: Optional[Dict] = None,
+    history: Optional[List[Dict]] = None,
+    cache_scope: Optional[str] = None,
+    session_id: Optional[str] = None,
+) -> AsyncIterator[str]:
+    """chat() as text chunks: Gemini tokens as they arrive, then the security footer."""
+    started = time.perf_counter()
+    intent = _submit_intent(_chat_intent, message, session_id)
+
+    query_emb = await asyncio.to_thread(_embed_query, message)
+    cached = _response_cache.get(query_emb, cache_scope)
+    if cached is not None:
+        yield cached
+        yield await _intent_result_async(intent, started, ARMOR_OFFLINE_FOOTER)
+        return
+
+    system_prompt = await asyncio.to_thread(_chat_prompt, message, match_context, query_emb)
+    message_meta = await _intent_result_async(intent, started, ARMOR_OFFLINE_FOOTER)
+
+    gemini = _get_gemini()
+    if not gemini:
+        yield _fallback_response(message, match_context)
+        yield message_meta
+        return
+
+    parts: List[str] = []
+    try:
+        start = time.perf_counter()
+        async for text in _stream_gemini(
+            gemini,
+            f"{system_prompt}\n\nUser question: {message}",
+            [system_prompt, f"User question: {message}"],
+            max_output_tokens=512,
+            temperature=0.7,
+        ):
+            parts.append(text)
+            yield text
+        _response_cache.put(query_emb, "".join(parts), cache_scope, time.perf_counter() - start)
+    except Exception as e:
+        print(f"DEBUG: Generation Error: {e}")
+        # Once tokens are out the answer stands; only a silent failure falls back
+        if not parts:
+            yield _fallback_response(message, match_context)
+    yield message_meta
+
+
 def _fallback_response(message: str, match_context: Optional[Dict]) -> str:
     """Fallback when Gemini is unavailable — keyword-aware responses."""
     msg_lower = message.lower()
@@ -454,30 +573,29 @@ def _fallback_response(message: str, match_context: Optional[Dict]) -> str:
 
 
 # ─── Story Generation ─────────────────────────────────────────────────────────
-def generate_story(match_data: Dict) -> str:
-    """Generate AI match narrative using Hero's Journey structure."""
-    try:
-        info = match_data.get("match_info", {})
-        summary = match_data.get("summary", {})
-        key_moments = match_data.get("key_moments", [])[:5]
-        phases = match_data.get("emotional_phases", [])
-        batter_cards = match_data.get("current_state", {}).get("batter_cards", [])
-
-        # Build context
-        moments_text = "\n".join(
-            f"- Ball {m['ball_number']}: {m['description'][:100]} (E(t)={m['emotion_score']})"
-            for m in key_moments
-        )
-        phases_text = "\n".join(
-            f"- {p['name']} (Overs {p['over_start']}-{p['over_end']}): avg E(t)={p['avg_et']}, peak={p['peak_et']}"
-            for p in phases
-        )
-        batters_text = "\n".join(
-            f"- {b['name']}: {b['runs']} runs, SR {b['strike_rate']}, Clutch: {b['clutch_rating']}, Profile: {b['emotional_profile']}"
-            for b in batter_cards
-        )
+def _story_prompt(match_data: Dict) -> str:
+    """Narrative prompt from the analysis summary, key moments, phases and batters."""
+    info = match_data.get("match_info", {})
+    summary = match_data.get("summary", {})
+    key_moments = match_data.get("key_moments", [])[:5]
+    phases = match_data.get("emotional_phases", [])
+    batter_cards = match_data.get("current_state", {}).get("batter_cards", [])
+
+    # Build context
+    moments_text = "\n".join(
+        f"- Ball {m['ball_number']}: {m['description'][:100]} (E(t)={m['emotion_score']})"
+        for m in key_moments
+    )
+    phases_text = "\n".join(
+        f"- {p['name']} (Overs {p['over_start']}-{p['over_end']}): avg E(t)={p['avg_et']}, peak={p['peak_et']}"
+        for p in phases
+    )
+    batters_text = "\n".join(
+        f"- {b['name']}: {b['runs']} runs, SR {b['strike_rate']}, Clutch: {b['clutch_rating']}, Profile: {b['emotional_profile']}"
+        for b in batter_cards
+    )
 
-        prompt = f"""Write a compelling cricket match narrative for:
+    prompt = f"""Write a compelling cricket match narrative for:
 Match: {info.get('title', 'Unknown Match')}
 Teams: {info.get('team_batting', '')} vs {info.get('team_bowling', '')}
 Venue: {info.get('venue', '')}
@@ -503,33 +621,46 @@ Write a 3-paragraph narrative using the Hero's Journey structure:
 3. The Resolution (climax, emotional peak, outcome)
 
 Use specific E(t) scores and player names. Make it feel like a sports broadcast story. Be vivid and emotional."""
+    return prompt
 
-        # ArmorIQ Intent Assurance
-        armor = _get_armor_client()
-        if armor:
-            plan_dict = {
-                "goal": "Generate AI match narrative using Hero's Journey structure",
-                "steps": [
-                    {
-                        "action": "generate_story",
-                        "description": f"Create narrative for: {info.get('title')}"
-                    }
-                ]
-            }
-            try:
-                capture = armor.capture_plan(
-                    llm="gemini-2.0-flash",
-                    prompt="Generate match story",
-                    plan=plan_dict
-                )
-                # Request token to register intent on ArmorIQ Dashboard
-                armor.get_intent_token(capture)
-            except Exception as e:
-                print(f"ArmorIQ Story Intent Error: {e}")
+
+def _story_intent(match_id: Optional[str], info: Dict) -> None:
+    """Register the story generation intent on the ArmorIQ dashboard."""
+    armor = _get_armor_client()
+    if armor:
+        plan_dict = {
+            "goal": "Generate AI match narrative using Hero's Journey structure",
+            "steps": [
+                {
+                    "action": "generate_story",
+                    "description": f"Create narrative for: {info.get('title')}"
+                }
+            ]
+        }
+        try:
+            # Request token to register intent on ArmorIQ Dashboard
+            scope = f"story:{match_id}" if match_id else None
+            _intent_token(armor, scope, "gemini-2.0-flash", "Generate match story", plan_dict)
+        except Exception as e:
+            print(f"ArmorIQ Story Intent Error: {e}")
+
+
+def _story_fallback(match_data: Dict) -> str:
+    return _fallback_story(match_data.get("match_info", {}), match_data.get("summary", {}), match_data.get("key_moments", []))
+
+
+def generate_story(match_data: Dict, match_id: Optional[str] = None) -> str:
+    """Generate AI match narrative using Hero's Journey structure."""
+    try:
+        # ArmorIQ Intent Assurance, in flight while the prompt is built
+        started = time.perf_counter()
+        intent = _submit_intent(_story_intent, match_id, match_data.get("match_info", {}))
+        prompt = _story_prompt(match_data)
+        _intent_result(intent, started)
 
         gemini = _get_gemini()
         if not gemini:
-            return _fallback_story(info, summary, key_moments)
+            return _story_fallback(match_data)
 
         if _GENAI_NEW:
             response = gemini.models.generate_content(
@@ -548,7 +679,34 @@ Use specific E(t) scores and player names. Make it feel like a sports broadcast
         
     except Exception:
         # If anything fails (API or data parsing), use fallback
-        return _fallback_story(match_data.get("match_info", {}), match_data.get("summary", {}), match_data.get("key_moments", []))
+        return _story_fallback(match_data)
+
+
+async def story_stream(match_data: Dict, match_id: Optional[str] = None) -> AsyncIterator[str]:
+    """generate_story() as text chunks, streamed from Gemini as they arrive."""
+    try:
+        started = time.perf_counter()
+        intent = _submit_intent(_story_intent, match_id, match_data.get("match_info", {}))
+        prompt = _story_prompt(match_data)
+        await _intent_result_async(intent, started)
+    except Exception:
+        yield _story_fallback(match_data)
+        return
+
+    gemini = _get_gemini()
+    if not gemini:
+        yield _story_fallback(match_data)
+        return
+
+    streamed = False
+    try:
+        async for text in _stream_gemini(gemini, prompt, prompt, max_output_tokens=800, temperature=0.8):
+            streamed = True
+            yield text
+    except Exception as e:
+        print(f"DEBUG: Story Generation Error: {e}")
+        if not streamed:
+            yield _story_fallback(match_data)
 
 
 def _fallback_story(info: Dict, summary: Dict, key_moments: List) -> str:
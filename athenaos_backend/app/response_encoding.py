@@ -0,0 +1,153 @@
+"""
+AthenaOS Response Encoding
+Content negotiation for analysis payloads: row JSON (default), columnar JSON
+(one array per field instead of repeating keys on every ball), or columnar
+MessagePack, chosen by the Accept header; bodies above a size threshold are
+brotli- or gzip-compressed per Accept-Encoding. orjson, msgpack and brotli
+are used when installed, with stdlib fallbacks for JSON and gzip.
+"""
+
+import gzip
+import json
+import os
+from typing import Any, Dict, List, Optional
+
+from fastapi import Response
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import msgpack
+except ImportError:
+    msgpack = None
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+JSON = "application/json"
+COLUMNAR_JSON = "application/vnd.athena.columnar+json"
+MSGPACK = "application/msgpack"
+_MSGPACK_ALIASES = {MSGPACK, "application/x-msgpack", "application/vnd.msgpack"}
+
+# Bodies smaller than this are sent uncompressed
+COMPRESS_MIN_BYTES = int(os.getenv("ATHENA_COMPRESS_MIN_BYTES", "1024"))
+GZIP_LEVEL = 6
+BROTLI_QUALITY = 5
+
+
+# ─── Layout ──────────────────────────────────────────────────────────────────
+def to_columns(rows: List[Dict]) -> Optional[Dict[str, List]]:
+    """{field: [values]} for a non-empty list of dicts sharing one key set, else None."""
+    if not rows or not all(isinstance(row, dict) for row in rows):
+        return None
+    if any(row.keys() != rows[0].keys() for row in rows):
+        return None
+    return {field: [row[field] for row in rows] for field in rows[0]}
+
+
+def columnar(content: Any) -> Any:
+    """`content` with every uniform list of dicts (at any depth) turned into columns."""
+    if isinstance(content, dict):
+        return {key: columnar(value) for key, value in content.items()}
+    if isinstance(content, list):
+        columns = to_columns(content)
+        if columns is not None:
+            return {field: [columnar(v) for v in values] for field, values in columns.items()}
+        return [columnar(value) for value in content]
+    return content
+
+
+# ─── Serialization ───────────────────────────────────────────────────────────
+def dumps_json(content: Any) -> bytes:
+    if orjson is not None:
+        return orjson.dumps(content, option=orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS)
+    return json.dumps(content, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+
+class EncodedJSON(bytes):
+    """A payload already serialized by dumps_json (e.g. a cached analysis), sent as-is for JSON."""
+
+
+def encode(content: Any, media_type: str) -> bytes:
+    if isinstance(content, EncodedJSON):
+        if media_type == JSON:
+            return bytes(content)
+        content = json.loads(content)
+    if media_type == MSGPACK:
+        return msgpack.packb(columnar(content), use_bin_type=True)
+    if media_type == COLUMNAR_JSON:
+        return dumps_json(columnar(content))
+    return dumps_json(content)
+
+
+def compress(body: bytes, coding: Optional[str]) -> bytes:
+    if coding == "br":
+        return brotli.compress(body, quality=BROTLI_QUALITY)
+    if coding == "gzip":
+        # A fixed header mtime keeps the body byte-identical under one strong ETag
+        return gzip.compress(body, compresslevel=GZIP_LEVEL, mtime=0)
+    return body
+
+
+# ─── Negotiation ─────────────────────────────────────────────────────────────
+def _ranked(header: Optional[str]) -> List[str]:
+    """Header values ordered by q (stable for ties), dropping q=0."""
+    ranked = []
+    for position, part in enumerate((header or "").split(",")):
+        value, _, params = part.strip().partition(";")
+        q = 1.0
+        for param in params.split(";"):
+            name, _, raw = param.strip().partition("=")
+            if name == "q":
+                try:
+                    q = float(raw)
+                except ValueError:
+                    q = 0.0
+        if value and q > 0:
+            ranked.append((-q, position, value.strip().lower()))
+    return [value for _, _, value in sorted(ranked)]
+
+
+def negotiate_media_type(accept: Optional[str]) -> str:
+    for value in _ranked(accept):
+        if value == COLUMNAR_JSON:
+            return COLUMNAR_JSON
+        if value in _MSGPACK_ALIASES and msgpack is not None:
+            return MSGPACK
+        if value in (JSON, "application/*", "*/*"):
+            return JSON
+    return JSON
+
+
+def negotiate_coding(accept_encoding: Optional[str]) -> Optional[str]:
+    for value in _ranked(accept_encoding):
+        if value == "br" and brotli is not None:
+            return "br"
+        if value in ("gzip", "*"):
+            return "gzip"
+    return None
+
+
+def encode_response(
+    content: Any,
+    accept: Optional[str] = None,
+    accept_encoding: Optional[str] = None,
+    status_code: int = 200,
+    headers: Optional[Dict[str, str]] = None,
+) -> Response:
+    """A Response holding `content` in the negotiated layout and compression."""
+    media_type = negotiate_media_type(accept)
+    body = encode(content, media_type)
+    response_headers = {"Vary": "Accept, Accept-Encoding", **(headers or {})}
+    if len(body) >= COMPRESS_MIN_BYTES:
+        coding = negotiate_coding(accept_encoding)
+        if coding:
+            body = compress(body, coding)
+            response_headers["Content-Encoding"] = coding
+    return Response(body, status_code=status_code, media_type=media_type, headers=response_headers)
+
@@ -9,6 +9,8 @@ from typing import Dict, List, Optional
 import requests
 from requests.exceptions import RequestException
 
+from app.commentary_features import extract_features
+
 def _fetch_page(url: str) -> str:
     """
     Fetch page content using a session to maintain cookies.
@@ -44,32 +46,7 @@ def _fetch_page(url: str) -> str:
 
 def _parse_ball(text: str, ball_num: int) -> Dict:
     """Parse a single ball commentary text into structured data."""
-    text_lower = text.lower()
-
-    is_wicket = any(w in text_lower for w in ["out!", "wicket", "caught", "bowled", "lbw", "stumped", "run out"])
-    is_six = "six" in text_lower or "sixes" in text_lower or "6!" in text
-    is_four = ("four" in text_lower or "boundary" in text_lower or "4!" in text) and not is_six
-    is_dot = "dot" in text_lower or (not is_wicket and not is_six and not is_four and "no run" in text_lower)
-    is_wide = "wide" in text_lower
-    is_noball = "no ball" in text_lower or "no-ball" in text_lower
-
-    # Extract runs
-    runs = 0
-    if is_six:
-        runs = 6
-    elif is_four:
-        runs = 4
-    elif is_wide or is_noball:
-        runs = 1
-    elif is_wicket:
-        runs = 0
-    else:
-        # Try to find run count in text
-        for pattern in [r"\b([1-3])\s+run", r"takes?\s+([1-3])", r"([1-3])\s+more"]:
-            m = re.search(pattern, text_lower)
-            if m:
-                runs = int(m.group(1))
-                break
+    features = extract_features(text)
 
     # Extract over number
     over = (ball_num - 1) // 6 + 1
@@ -78,14 +55,14 @@ def _parse_ball(text: str, ball_num: int) -> Dict:
         "ball": ball_num,
         "over": over,
         "text": text.strip(),
-        "runs": runs,
-        "is_wicket": is_wicket,
-        "is_four": is_four,
-        "is_six": is_six,
-        "is_dot": is_dot,
-        "is_drop": "dropped" in text_lower or "drop" in text_lower,
-        "is_noball": is_noball,
-        "is_wide": is_wide,
+        "runs": features["runs"],
+        "is_wicket": features["is_wicket"],
+        "is_four": features["is_four"],
+        "is_six": features["is_six"],
+        "is_dot": features["is_dot"],
+        "is_drop": features["is_drop"],
+        "is_noball": features["is_noball"],
+        "is_wide": features["is_wide"],
         "batter": "",
         "bowler": "",
     }
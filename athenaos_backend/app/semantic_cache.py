@@ -0,0 +1,105 @@
+"""
+AthenaOS Semantic Response Cache
+Chat answers keyed by the question's embedding instead of its exact text:
+a new question whose normalized embedding is within `threshold` cosine
+similarity of a cached one, in the same scope (match + analysis version),
+is answered from cache. Bounded by entry count (LRU across all scopes)
+with an optional TTL.
+"""
+
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, Optional, Tuple
+
+import numpy as np
+
+GLOBAL_SCOPE = "global"
+
+
+class SemanticCache:
+    """
+    Entries are grouped per scope so a lookup only compares against
+    questions asked about the same match state. Each entry remembers how
+    long its answer took to generate, so hits report the LLM time saved.
+    """
+
+    def __init__(self, threshold: float = 0.92, max_entries: int = 1024, ttl: Optional[float] = None):
+        self.threshold = threshold
+        self.max_entries = max_entries
+        self.ttl = ttl or None
+        # (scope, entry id) -> (embedding, response, generation seconds, stored at); LRU order
+        self._entries: "OrderedDict[Tuple[str, int], Tuple[np.ndarray, str, float, float]]" = OrderedDict()
+        self._scopes: Dict[str, set] = {}
+        self._next_id = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        self.saved_seconds = 0.0
+
+    def _drop(self, key: Tuple[str, int]) -> None:
+        self._entries.pop(key)
+        ids = self._scopes[key[0]]
+        ids.discard(key[1])
+        if not ids:
+            del self._scopes[key[0]]
+
+    def get(self, embedding: np.ndarray, scope: Optional[str] = None) -> Optional[str]:
+        """Cached answer for the closest question in `scope` above the threshold, or None."""
+        scope = scope or GLOBAL_SCOPE
+        embedding = np.asarray(embedding, dtype=np.float32).reshape(-1)
+        with self._lock:
+            keys = [(scope, entry_id) for entry_id in self._scopes.get(scope, ())]
+            if self.ttl is not None:
+                now = time.time()
+                for key in [k for k in keys if now - self._entries[k][3] > self.ttl]:
+                    self._drop(key)
+                    self.expirations += 1
+                    keys.remove(key)
+            if keys:
+                scores = np.stack([self._entries[key][0] for key in keys]) @ embedding
+                best = int(np.argmax(scores))
+                if scores[best] >= self.threshold:
+                    key = keys[best]
+                    self._entries.move_to_end(key)
+                    _, response, seconds, _ = self._entries[key]
+                    self.hits += 1
+                    self.saved_seconds += seconds
+                    return response
+            self.misses += 1
+            return None
+
+    def put(self, embedding: np.ndarray, response: str, scope: Optional[str] = None, seconds: float = 0.0) -> None:
+        scope = scope or GLOBAL_SCOPE
+        with self._lock:
+            key = (scope, self._next_id)
+            self._next_id += 1
+            self._entries[key] = (np.asarray(embedding, dtype=np.float32).reshape(-1), response, seconds, time.time())
+            self._scopes.setdefault(scope, set()).add(key[1])
+            while len(self._entries) > self.max_entries:
+                self._drop(next(iter(self._entries)))
+                self.evictions += 1
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._scopes.clear()
+
+    def stats(self) -> Dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "scopes": len(self._scopes),
+                "max_entries": self.max_entries,
+                "threshold": self.threshold,
+                "ttl_seconds": self.ttl,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "expirations": self.expirations,
+                "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+                "saved_llm_seconds": round(self.saved_seconds, 3),
+            }
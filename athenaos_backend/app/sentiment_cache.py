@@ -0,0 +1,142 @@
+"""
+AthenaOS Sentiment Cache
+Content-addressed cache for commentary sentiment scores: an in-process LRU
+in front of a SQLite store, keyed by normalized text hash + model fingerprint.
+"""
+
+import hashlib
+import os
+import sqlite3
+import threading
+from collections import OrderedDict
+from typing import Dict, Iterable, Optional
+
+
+def model_fingerprint(model_path: str, *extra_files: str) -> str:
+    """
+    SHA-256 over every file in the model directory (names + contents),
+    plus any derived artifacts such as an ONNX export.
+    """
+    digest = hashlib.sha256()
+    paths = []
+    for root, dirs, files in os.walk(model_path):
+        dirs.sort()
+        paths.extend(os.path.join(root, name) for name in sorted(files))
+    for path in paths + list(extra_files):
+        digest.update(os.path.relpath(path, model_path).encode("utf-8"))
+        with open(path, "rb") as f:
+            for chunk in iter(lambda: f.read(1 << 20), b""):
+                digest.update(chunk)
+    return digest.hexdigest()[:16]
+
+
+def normalize_text(text: str) -> str:
+    """
+    Case- and whitespace-insensitive form of a commentary line.
+    The emotion model uses an uncased WordPiece tokenizer, so texts that
+    normalize equally also tokenize equally.
+    """
+    return " ".join(text.lower().split())
+
+
+class SentimentCache:
+    """
+    Two-tier score cache. Lookups hit the LRU first, then SQLite. Rows are
+    keyed by model fingerprint, so retraining the model (or switching
+    backend) never reads stale scores, and workers on different backends
+    can share one file. Rows of other models are only dropped by an
+    explicit purge_other_models().
+    """
+
+    def __init__(self, fingerprint: str, db_path: Optional[str] = None, max_entries: int = 50000):
+        self.fingerprint = fingerprint
+        self.db_path = db_path
+        self.max_entries = max_entries
+        self._memory: "OrderedDict[str, float]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._db: Optional[sqlite3.Connection] = None
+        self.memory_hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+
+        if db_path:
+            os.makedirs(os.path.dirname(os.path.abspath(db_path)), exist_ok=True)
+            self._db = sqlite3.connect(db_path, check_same_thread=False)
+            self._db.execute("PRAGMA journal_mode=WAL")
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS sentiment ("
+                " model TEXT NOT NULL, text_hash TEXT NOT NULL, score REAL NOT NULL,"
+                " PRIMARY KEY (model, text_hash))"
+            )
+            self._db.commit()
+
+    @staticmethod
+    def key(text: str) -> str:
+        return hashlib.sha1(normalize_text(text).encode("utf-8")).hexdigest()
+
+    def get_many(self, keys: Iterable[str]) -> Dict[str, float]:
+        """Return cached scores for the given keys; absent keys are omitted."""
+        found: Dict[str, float] = {}
+        pending = []
+        with self._lock:
+            for key in dict.fromkeys(keys):
+                if key in self._memory:
+                    self._memory.move_to_end(key)
+                    found[key] = self._memory[key]
+                    self.memory_hits += 1
+                else:
+                    pending.append(key)
+
+            if pending and self._db is not None:
+                for start in range(0, len(pending), 500):
+                    chunk = pending[start:start + 500]
+                    rows = self._db.execute(
+                        f"SELECT text_hash, score FROM sentiment WHERE model = ? "
+                        f"AND text_hash IN ({','.join('?' * len(chunk))})",
+                        (self.fingerprint, *chunk),
+                    ).fetchall()
+                    for key, score in rows:
+                        found[key] = score
+                        self._remember(key, score)
+                        self.disk_hits += 1
+
+            self.misses += sum(1 for key in pending if key not in found)
+        return found
+
+    def put_many(self, scores: Dict[str, float]) -> None:
+        with self._lock:
+            for key, score in scores.items():
+                self._remember(key, score)
+            if self._db is not None and scores:
+                self._db.executemany(
+                    "INSERT OR REPLACE INTO sentiment (model, text_hash, score) VALUES (?, ?, ?)",
+                    [(self.fingerprint, key, score) for key, score in scores.items()],
+                )
+                self._db.commit()
+
+    def purge_other_models(self) -> int:
+        """Maintenance: delete rows written under any other model fingerprint; returns the count."""
+        if self._db is None:
+            return 0
+        with self._lock:
+            deleted = self._db.execute("DELETE FROM sentiment WHERE model != ?", (self.fingerprint,)).rowcount
+            self._db.commit()
+        return deleted
+
+    def _remember(self, key: str, score: float) -> None:
+        self._memory[key] = score
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_entries:
+            self._memory.popitem(last=False)
+
+    def stats(self) -> Dict:
+        lookups = self.memory_hits + self.disk_hits + self.misses
+        return {
+            "model_fingerprint": self.fingerprint,
+            "memory_entries": len(self._memory),
+            "memory_hits": self.memory_hits,
+            "disk_hits": self.disk_hits,
+            "misses": self.misses,
+            "hit_rate": round((self.memory_hits + self.disk_hits) / lookups, 4) if lookups else 0.0,
+            "disk_enabled": self._db is not None,
+        }
@@ -1,6 +1,23 @@
-from ..models.emotion_models import EmotionPoint
+from typing import Optional
 
-def predict_next_turn(timeline: list[EmotionPoint]) -> dict:
+from ..match_simulator import simulate_state
+from ..models.emotion_models import EmotionPoint, MatchContext
+
+T20_BALLS = 120
+
+def _simulated_outlook(context: MatchContext) -> Optional[dict]:
+    """Monte Carlo outlook for a chase state; None if the context is incomplete."""
+    if context is None or context.runs_needed is None or context.balls_remaining is None:
+        return None
+    wickets_left = context.wickets_left if context.wickets_left is not None else 10
+    return simulate_state(
+        runs_needed=context.runs_needed,
+        balls_remaining=context.balls_remaining,
+        wickets_fallen=10 - wickets_left,
+        total_balls=max(T20_BALLS, context.balls_remaining),
+    )
+
+def predict_next_turn(timeline: list[EmotionPoint], context: Optional[MatchContext] = None) -> dict:
     if not timeline or len(timeline) < 2:
         return {"prediction": "Neutral", "confidence": 0.5, "window": "Next over"}
         
@@ -26,7 +43,7 @@ def predict_next_turn(timeline: list[EmotionPoint]) -> dict:
     else:
         confidence = 0.4
         
-    return {
+    result = {
         "prediction": prediction,
         "confidence": confidence,
         "window": "Next 6 balls",
@@ -47,3 +64,28 @@ def predict_next_turn(timeline: list[EmotionPoint]) -> dict:
         "insight_fan": "This phase rewards patience. Expect steady accumulation.",
         "insight_analyst": "Low variance phase; momentum likely unchanged unless wicket occurs in next 2 overs."
     }
+
+    # With a live match state, replace the canned figures with simulated ones
+    sim = _simulated_outlook(context)
+    if sim and sim["next_over"]:
+        outlook = sim["next_over"]["outlook"]
+        wicket = sim["what_if"]["wicket"]
+        rrr = context.runs_needed / context.balls_remaining * 6
+        result["drivers"] = [
+            f"Required Run Rate at {rrr:.1f}",
+            f"Win probability {sim['win_probability']:.0%} over {sim['rollouts']:,} simulations",
+            f"Wicket chance next over {sim['next_over']['wicket_probability']:.0%}",
+            f"Emotional volatility currently {'high' if volatility > 0.5 else 'low'}",
+        ]
+        result["probabilities"] = {
+            "Stable Phase": outlook["stable"],
+            "Pressure Build-up": outlook["pressure_build_up"],
+            "Momentum Surge": outlook["momentum_surge"],
+        }
+        result["what_if"] = (
+            f"If a wicket falls, win probability shifts to {wicket['win_probability']:.0%} "
+            f"({wicket['win_delta']:+.0%}); next-over E(t) {wicket['emotion_next_over']:.0f}"
+        )
+        result["win_probability"] = sim["win_probability"]
+        result["model_training_stats"] = f"Monte Carlo: {sim['rollouts']:,} innings rollouts in {sim['elapsed_ms']:.0f} ms"
+    return result
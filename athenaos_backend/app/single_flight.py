@@ -0,0 +1,95 @@
+"""
+AthenaOS Single Flight
+Duplicate-call suppression: concurrent callers asking for the same key wait
+on one in-flight computation and share its result (or its exception).
+do() coalesces blocking calls across threads; run() coalesces coroutines
+on the event loop, so waiters hold no thread or executor slot.
+"""
+
+import asyncio
+import threading
+from typing import Any, Callable, Dict
+
+
+class _Call:
+    __slots__ = ("done", "result", "error")
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class SingleFlight:
+    """
+    do(key, fn, ...) runs fn once per key at a time. Callers arriving while
+    it runs block until it finishes and receive the same value; nothing is
+    kept once the call returns, so results are not cached here.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls: Dict[str, _Call] = {}
+        # Event-loop flights; only touched from the loop thread
+        self._tasks: Dict[str, asyncio.Future] = {}
+        self.executions = 0
+        self.shared = 0
+
+    def do(self, key: str, fn: Callable, *args, **kwargs) -> Any:
+        with self._lock:
+            call = self._calls.get(key)
+            if call is not None:
+                self.shared += 1
+                leader = False
+            else:
+                call = self._calls[key] = _Call()
+                self.executions += 1
+                leader = True
+
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result
+
+        try:
+            call.result = fn(*args, **kwargs)
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
+        return call.result
+
+    async def run(self, key: str, fn: Callable, *args, **kwargs) -> Any:
+        """
+        Async form of do(): `fn` is an async callable, started once per key
+        as a task. Callers await that task, and a caller being cancelled
+        (a client disconnecting) does not cancel it for the others.
+        """
+        task = self._tasks.get(key)
+        if task is not None:
+            with self._lock:
+                self.shared += 1
+        else:
+            task = self._tasks[key] = asyncio.ensure_future(fn(*args, **kwargs))
+            task.add_done_callback(lambda done: self._finish(key, done))
+            with self._lock:
+                self.executions += 1
+        return await asyncio.shield(task)
+
+    def _finish(self, key: str, task: asyncio.Future) -> None:
+        if self._tasks.get(key) is task:
+            del self._tasks[key]
+        if not task.cancelled():
+            task.exception()  # retrieved here in case every caller went away
+
+    def stats(self) -> Dict:
+        with self._lock:
+            return {
+                "in_flight": len(self._calls) + len(self._tasks),
+                "executions": self.executions,
+                "shared": self.shared,
+            }
@@ -9,6 +9,8 @@ import re
 import tempfile
 from typing import Dict, List
 
+from app.commentary_features import extract_features
+
 
 def _transcribe(audio_path: str) -> str:
     """Transcribe audio using Whisper tiny model."""
@@ -34,34 +36,19 @@ def _transcript_to_commentary(transcript: str) -> List[Dict]:
 
     commentary = []
     for i, sentence in enumerate(sentences):
-        text_lower = sentence.lower()
-        is_wicket = any(w in text_lower for w in ["out", "wicket", "caught", "bowled", "lbw", "stumped"])
-        is_six = "six" in text_lower
-        is_four = "four" in text_lower and not is_six
-        is_dot = "dot" in text_lower or "no run" in text_lower
-
-        runs = 0
-        if is_six:
-            runs = 6
-        elif is_four:
-            runs = 4
-        elif not is_wicket and not is_dot:
-            m = re.search(r'\b([1-3])\s*run', text_lower)
-            if m:
-                runs = int(m.group(1))
-
+        features = extract_features(sentence)
         commentary.append({
             "ball": i + 1,
             "over": (i // 6) + 1,
             "text": sentence,
-            "runs": runs,
-            "is_wicket": is_wicket,
-            "is_four": is_four,
-            "is_six": is_six,
-            "is_dot": is_dot,
-            "is_drop": "dropped" in text_lower,
-            "is_noball": "no ball" in text_lower,
-            "is_wide": "wide" in text_lower,
+            "runs": features["runs"],
+            "is_wicket": features["is_wicket"],
+            "is_four": features["is_four"],
+            "is_six": features["is_six"],
+            "is_dot": features["is_dot"],
+            "is_drop": features["is_drop"],
+            "is_noball": features["is_noball"],
+            "is_wide": features["is_wide"],
             "batter": "",
             "bowler": "",
         })
@@ -0,0 +1,141 @@
+"""
+AthenaOS Commentary Feature Benchmark
+Per-ball cost of the shared single-pass extractor (app/commentary_features.py)
+against the per-caller keyword scans it replaced, plus a parity check of the
+scraper flags, drama flag and auto-label against those reference versions.
+
+Usage: python benchmark_commentary_features.py
+       python benchmark_commentary_features.py --csv ipl_3000_clean_commentary.csv --repeat 5
+"""
+
+import argparse
+import glob
+import json
+import os
+import re
+import time
+from typing import Callable, Dict, List
+
+from app.commentary_features import DRAMATIC_PHRASES, extract_features
+
+DATA_GLOB = os.path.join(os.path.dirname(os.path.abspath(__file__)), "app", "data", "*.json")
+
+
+# ─── Reference Implementations (before) ──────────────────────────────────────
+def _reference_parse(text: str) -> Dict:
+    """The scraper's original _parse_ball flags and run count."""
+    text_lower = text.lower()
+    is_wicket = any(w in text_lower for w in ["out!", "wicket", "caught", "bowled", "lbw", "stumped", "run out"])
+    is_six = "six" in text_lower or "sixes" in text_lower or "6!" in text
+    is_four = ("four" in text_lower or "boundary" in text_lower or "4!" in text) and not is_six
+    is_dot = "dot" in text_lower or (not is_wicket and not is_six and not is_four and "no run" in text_lower)
+    is_wide = "wide" in text_lower
+    is_noball = "no ball" in text_lower or "no-ball" in text_lower
+
+    runs = 0
+    if is_six:
+        runs = 6
+    elif is_four:
+        runs = 4
+    elif is_wide or is_noball:
+        runs = 1
+    elif is_wicket:
+        runs = 0
+    else:
+        for pattern in [r"\b([1-3])\s+run", r"takes?\s+([1-3])", r"([1-3])\s+more"]:
+            m = re.search(pattern, text_lower)
+            if m:
+                runs = int(m.group(1))
+                break
+
+    return {
+        "is_wicket": is_wicket, "is_six": is_six, "is_four": is_four, "is_dot": is_dot,
+        "is_drop": "dropped" in text_lower or "drop" in text_lower,
+        "is_wide": is_wide, "is_noball": is_noball, "runs": runs,
+    }
+
+
+def _reference_drama(text: str) -> bool:
+    text_lower = text.lower()
+    return any(phrase in text_lower for phrase in DRAMATIC_PHRASES)
+
+
+def _reference_label(text: str) -> int:
+    """training_pipeline.auto_label's original per-row rule."""
+    text = str(text).lower()
+    pressure_keywords = ["out", "bowled", "caught", "wicket", "lbw", "dismissed"]
+    positive_keywords = ["six", "four", "boundary", "maximum", "century", "fifty"]
+    is_pressure = any(re.search(rf"\b{w}\b", text) for w in pressure_keywords)
+    is_positive = any(re.search(rf"\b{w}\b", text) for w in positive_keywords)
+    if is_pressure:
+        if "mid-wicket" in text or "wicket-to-wicket" in text or "wicketkeeper" in text:
+            other_pressure = any(re.search(rf"\b{w}\b", text) for w in ["out", "bowled", "caught", "lbw", "dismissed"])
+            if not other_pressure:
+                is_pressure = False
+    if is_pressure:
+        return 2
+    if is_positive:
+        return 1
+    return 0
+
+
+def _reference_all(text: str) -> Dict:
+    """Everything the four callers computed, each with its own scan."""
+    features = _reference_parse(text)
+    features["is_drama"] = _reference_drama(text)
+    features["label_hint"] = _reference_label(text)
+    return features
+
+
+# ─── Benchmark ───────────────────────────────────────────────────────────────
+def _load_texts(csv_path: str = "") -> List[str]:
+    if csv_path:
+        import pandas as pd
+        return pd.read_csv(csv_path).dropna(subset=["commentary"])["commentary"].astype(str).tolist()
+    texts = []
+    for path in sorted(glob.glob(DATA_GLOB)):
+        with open(path, encoding="utf-8") as f:
+            texts.extend(ball.get("text", "") for ball in json.load(f).get("commentary", []))
+    return texts
+
+
+def _time_per_ball(fn: Callable[[str], Dict], texts: List[str], repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for text in texts:
+            fn(text)
+        best = min(best, time.perf_counter() - start)
+    return best / len(texts) * 1e6
+
+
+def run_benchmark(texts: List[str], repeat: int = 3) -> Dict:
+    before = _time_per_ball(_reference_all, texts, repeat)
+    after = _time_per_ball(extract_features, texts, repeat)
+
+    mismatches = [
+        text for text in texts
+        if _reference_all(text) != extract_features(text)
+    ]
+
+    print("\n" + "=" * 60)
+    print(f"🏏 COMMENTARY FEATURE EXTRACTION ({len(texts)} balls, best of {repeat})")
+    print("=" * 60)
+    print(f"   Before (per-caller scans): {before:>8.2f} µs/ball")
+    print(f"   After  (single pass):      {after:>8.2f} µs/ball")
+    print(f"   Speedup:                   {before / after:>8.2f}x")
+    print(f"   Parity mismatches:         {len(mismatches):>8}")
+    for text in mismatches[:5]:
+        print(f"   ⚠️ {text[:70]}")
+    print("=" * 60)
+
+    return {"balls": len(texts), "before_us": before, "after_us": after, "mismatches": len(mismatches)}
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--csv", default="", help="commentary CSV to use instead of app/data/*.json")
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    run_benchmark(_load_texts(args.csv), args.repeat)
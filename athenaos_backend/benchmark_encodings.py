@@ -0,0 +1,106 @@
+"""
+AthenaOS Response Encoding Benchmark
+Serialize time and bytes on the wire for full analysis payloads of
+app/data/match_001–005 and a synthetic 2000-ball match, comparing the
+default FastAPI JSON path with the negotiated encodings in
+app/response_encoding.py (orjson rows, columnar JSON, columnar MessagePack)
+under no compression, gzip and brotli.
+
+Usage: python benchmark_encodings.py
+       python benchmark_encodings.py --balls 5000 --repeat 20
+"""
+
+import argparse
+import glob
+import json
+import os
+import time
+from typing import Callable, Dict, List, Tuple
+
+from fastapi.encoders import jsonable_encoder
+
+from app.emotion_engine import analyze_match
+from app.response_encoding import COLUMNAR_JSON, JSON, MSGPACK, brotli, compress, encode, msgpack
+
+DATA_GLOB = os.path.join(os.path.dirname(os.path.abspath(__file__)), "app", "data", "*.json")
+
+
+def _fastapi_default(content: Dict) -> bytes:
+    """What returning a dict from an endpoint costs: jsonable_encoder + JSONResponse.render."""
+    return json.dumps(
+        jsonable_encoder(content), ensure_ascii=False, allow_nan=False, indent=None, separators=(",", ":")
+    ).encode("utf-8")
+
+
+ENCODERS: List[Tuple[str, Callable[[Dict], bytes]]] = [
+    ("fastapi default (rows)", _fastapi_default),
+    ("orjson rows", lambda content: encode(content, JSON)),
+    ("columnar json", lambda content: encode(content, COLUMNAR_JSON)),
+]
+if msgpack is not None:
+    ENCODERS.append(("columnar msgpack", lambda content: encode(content, MSGPACK)))
+
+CODINGS = [None, "gzip"] + (["br"] if brotli is not None else [])
+
+
+def _load_matches() -> List[Tuple[str, Dict]]:
+    matches = []
+    for path in sorted(glob.glob(DATA_GLOB)):
+        with open(path, encoding="utf-8") as f:
+            matches.append((os.path.basename(path)[:-5], json.load(f)))
+    return matches
+
+
+def _synthetic_match(matches: List[Tuple[str, Dict]], balls: int) -> Dict:
+    """`balls` deliveries cycled from the real commentary, renumbered into overs."""
+    pool = [ball for _, match in matches for ball in match["commentary"]]
+    commentary = [dict(pool[i % len(pool)], ball=i % 6 + 1, over=i // 6 + 1) for i in range(balls)]
+    runs = sum(ball.get("runs", 0) for ball in commentary)
+    match_info = dict(matches[0][1]["match_info"], match_id="synthetic", title=f"Synthetic {balls}-ball match",
+                      target=runs + 1, total_balls=balls)
+    return {"match_info": match_info, "commentary": commentary}
+
+
+def _best_ms(fn: Callable[[Dict], bytes], content: Dict, repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn(content)
+        best = min(best, time.perf_counter() - start)
+    return best * 1000
+
+
+def run_benchmark(balls: int = 2000, repeat: int = 10) -> List[Dict]:
+    matches = _load_matches()
+    matches.append(("synthetic", _synthetic_match(matches, balls)))
+
+    results = []
+    for name, match in matches:
+        analysis = analyze_match(match["commentary"], match["match_info"])
+        print("\n" + "=" * 78)
+        print(f"🏏 {name} ({len(match['commentary'])} balls, best of {repeat})")
+        print("=" * 78)
+        print(f"   {'encoding':<24}{'serialize':>11}" + "".join(f"{coding or 'raw':>12}" for coding in CODINGS))
+        baseline = None
+        for label, fn in ENCODERS:
+            body = fn(analysis)
+            elapsed = _best_ms(fn, analysis, repeat)
+            sizes = {coding or "raw": len(compress(body, coding)) for coding in CODINGS}
+            baseline = baseline or sizes["raw"]
+            print(f"   {label:<24}{elapsed:>9.2f}ms" + "".join(f"{size:>12,}" for size in sizes.values()))
+            results.append({"match": name, "encoding": label, "serialize_ms": elapsed, **sizes})
+        best = min(r[CODINGS[-1] or "raw"] for r in results if r["match"] == name)
+        print(f"   Smallest on the wire: {best:,} bytes ({baseline / best:.1f}x smaller than default raw JSON)")
+    print("=" * 78)
+    if msgpack is None or brotli is None:
+        print("   ℹ️ Install msgpack / brotli to include those encodings.")
+    return results
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--balls", type=int, default=2000, help="length of the synthetic match")
+    parser.add_argument("--repeat", type=int, default=10)
+    args = parser.parse_args()
+
+    run_benchmark(args.balls, args.repeat)
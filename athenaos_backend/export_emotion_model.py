@@ -0,0 +1,217 @@
+"""
+AthenaOS Emotion Model Export
+Writes CPU inference artifacts for emotion_model/ (ONNX fp32 + ONNX dynamic
+int8, next to the model directory) and reports label agreement of every
+backend, and of the lexicon cascade, against the fp32 PyTorch model on the
+labeled IPL commentary.
+
+Usage: python export_emotion_model.py
+       python export_emotion_model.py --skip-export --limit 1000
+Then pick a backend with ATHENA_EMOTION_BACKEND=torch|torch-int8|onnx|onnx-int8.
+"""
+
+import argparse
+import inspect
+import json
+import os
+import time
+from typing import Dict, List, Optional, Set
+
+import pandas as pd
+import torch
+from transformers import DistilBertForSequenceClassification, DistilBertTokenizerFast
+
+from app.emotion_engine import (
+    EMOTION_BACKENDS,
+    LEXICON_CONFIDENCE,
+    LEXICON_LABELS,
+    MODEL_PATH,
+    ONNX_MODEL_PATHS,
+    _lexicon_call,
+    _load_model,
+    _predict_labels,
+)
+from app.sentiment_cache import model_fingerprint
+
+LABELED_CSV = "ipl_labeled_commentary.csv"
+
+
+def _write_manifest(path: str) -> None:
+    """Record which emotion_model/ an artifact was exported from."""
+    with open(path + ".json", "w", encoding="utf-8") as f:
+        json.dump({"source_fingerprint": model_fingerprint(MODEL_PATH)}, f, indent=2)
+
+
+def export_onnx(opset: int = 17) -> str:
+    """Export the fp32 model to ONNX with dynamic batch and sequence axes."""
+    path = ONNX_MODEL_PATHS["onnx"]
+    tokenizer = DistilBertTokenizerFast.from_pretrained(MODEL_PATH)
+    model = DistilBertForSequenceClassification.from_pretrained(MODEL_PATH)
+    model.eval()
+    model.config.return_dict = False
+
+    sample = tokenizer(["Schutt to Mandhana, driven through covers for FOUR!"], return_tensors="pt")
+    # Use the TorchScript exporter where torch also ships the dynamo one;
+    # it honours dynamic_axes and writes a single self-contained file.
+    legacy = {"dynamo": False} if "dynamo" in inspect.signature(torch.onnx.export).parameters else {}
+    torch.onnx.export(
+        model,
+        (sample["input_ids"], sample["attention_mask"]),
+        path,
+        input_names=["input_ids", "attention_mask"],
+        output_names=["logits"],
+        dynamic_axes={
+            "input_ids": {0: "batch", 1: "sequence"},
+            "attention_mask": {0: "batch", 1: "sequence"},
+            "logits": {0: "batch"},
+        },
+        opset_version=opset,
+        do_constant_folding=True,
+        **legacy,
+    )
+    _write_manifest(path)
+    print(f"💾 ONNX model saved:      {path}")
+    return path
+
+
+def quantize_onnx() -> str:
+    """Dynamic int8 quantization of the ONNX export's weights."""
+    from onnxruntime.quantization import QuantType, quantize_dynamic
+
+    path = ONNX_MODEL_PATHS["onnx-int8"]
+    quantize_dynamic(ONNX_MODEL_PATHS["onnx"], path, weight_type=QuantType.QInt8)
+    _write_manifest(path)
+    print(f"💾 ONNX int8 model saved: {path}")
+    return path
+
+
+def parity_report(csv_path: str = LABELED_CSV, limit: int = 0, batch_size: int = 32) -> List[Dict]:
+    """
+    Label agreement of each backend against the fp32 torch model, plus
+    accuracy against the CSV labels and CPU time per ball.
+    """
+    df = pd.read_csv(csv_path).dropna(subset=["commentary"])
+    if limit:
+        df = df.sample(n=min(limit, len(df)), random_state=42)
+    texts = df["commentary"].astype(str).tolist()
+    gold = df["label"].tolist() if "label" in df.columns else None
+
+    tokenizer = DistilBertTokenizerFast.from_pretrained(MODEL_PATH)
+    reference = None
+    report = []
+    for backend in EMOTION_BACKENDS:
+        try:
+            model = _load_model(backend, "cpu")
+        except Exception as e:
+            print(f"⚠️ Skipping {backend}: {e}")
+            continue
+
+        start = time.perf_counter()
+        labels, _ = _predict_labels(texts, batch_size, tokenizer=tokenizer, model=model, device="cpu")
+        elapsed = time.perf_counter() - start
+        if reference is None:
+            reference = labels
+
+        row = {
+            "backend": backend,
+            "agreement": sum(a == b for a, b in zip(labels, reference)) / len(texts),
+            "ms_per_ball": elapsed / len(texts) * 1000,
+        }
+        if gold is not None:
+            row["accuracy"] = sum(a == b for a, b in zip(labels, gold)) / len(texts)
+        report.append(row)
+
+    print("\n" + "=" * 60)
+    print(f"🚩 EMOTION BACKEND PARITY ({len(texts)} balls from {csv_path})")
+    print("=" * 60)
+    print(f"{'backend':<12}{'agree vs fp32':>15}{'accuracy':>12}{'ms/ball':>12}")
+    for row in report:
+        accuracy = f"{row['accuracy']:.2%}" if "accuracy" in row else "n/a"
+        print(f"{row['backend']:<12}{row['agreement']:>15.2%}{accuracy:>12}{row['ms_per_ball']:>12.3f}")
+    print("=" * 60)
+
+    if reference is not None:
+        cascade_report(texts, reference)
+        cascade_sweep(texts, reference)
+    return report
+
+
+# Labels the cascade could be allowed to settle (0 Neutral, 1 Positive, 2 Pressure)
+CASCADE_LABELS = (0, 1, 2)
+
+
+def cascade_report(texts: List[str], reference: List[int], threshold: float = LEXICON_CONFIDENCE) -> Dict:
+    """
+    How the lexicon-first cascade compares with the model-only path if it
+    settled every label: share of balls still sent to the model, and
+    agreement per lexicon call. Labels that agree go in ATHENA_LEXICON_LABELS.
+    """
+    settled = {label: [0, 0] for label in CASCADE_LABELS}
+    for text, label in zip(texts, reference):
+        call = _lexicon_call(text, threshold, set(CASCADE_LABELS))
+        if call is not None:
+            settled[call[0]][0] += 1
+            settled[call[0]][1] += call[0] == label
+
+    total = sum(count for count, _ in settled.values())
+    agree = sum(hits for _, hits in settled.values())
+    report = {
+        "threshold": threshold,
+        "model_fraction": (len(texts) - total) / len(texts),
+        "lexicon_agreement": agree / total if total else 0.0,
+        "overall_agreement": (agree + len(texts) - total) / len(texts),
+        "label_agreement": {label: hits / count if count else None for label, (count, hits) in settled.items()},
+    }
+    print(f"🔀 Lexicon cascade @ confidence {threshold:.2f}:")
+    print(f"   Balls sent to model:      {report['model_fraction']:.2%}")
+    print(f"   Agreement (lexicon-only): {report['lexicon_agreement']:.2%}")
+    print(f"   Agreement (cascade):      {report['overall_agreement']:.2%}")
+    for label, (count, hits) in settled.items():
+        rate = f"{hits / count:.2%}" if count else "n/a"
+        print(f"   Label {label}: {count:>7} settled, agreement {rate}")
+    print("=" * 60)
+    return report
+
+
+def cascade_sweep(
+    texts: List[str], reference: List[int], labels: Optional[Set[int]] = None, target: float = 0.98
+) -> Optional[float]:
+    """
+    Cascade agreement across confidence thresholds when `labels` (default
+    ATHENA_LEXICON_LABELS, or every label if that is empty) may be settled;
+    returns the lowest threshold whose overall agreement reaches `target`
+    (the value to use for ATHENA_LEXICON_CONFIDENCE), or None if none does.
+    """
+    labels = set(labels or LEXICON_LABELS or CASCADE_LABELS)
+    print(f"📏 Cascade sweep for labels {sorted(labels)} (target agreement {target:.0%}):")
+    print(f"   {'threshold':>10}{'to model':>12}{'agreement':>12}")
+    best = None
+    for step in range(2, 11):
+        threshold = step / 10
+        settled = [(_lexicon_call(text, threshold, labels), label) for text, label in zip(texts, reference)]
+        wrong = sum(call is not None and call[0] != label for call, label in settled)
+        to_model = sum(call is None for call, _ in settled) / len(texts)
+        agreement = 1 - wrong / len(texts)
+        print(f"   {threshold:>10.1f}{to_model:>12.2%}{agreement:>12.2%}")
+        if best is None and agreement >= target:
+            best = threshold
+    print(f"   Lowest threshold meeting target: {best if best is not None else 'none'}")
+    print("=" * 60)
+    return best
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--skip-export", action="store_true", help="only run the parity check")
+    parser.add_argument("--csv", default=LABELED_CSV, help="labeled commentary CSV (commentary,label)")
+    parser.add_argument("--limit", type=int, default=0, help="sample this many rows (0 = all)")
+    parser.add_argument("--batch-size", type=int, default=32)
+    args = parser.parse_args()
+
+    if not args.skip_export:
+        export_onnx()
+        quantize_onnx()
+    if os.path.exists(args.csv):
+        parity_report(args.csv, args.limit, args.batch_size)
+    else:
+        print(f"⚠️ {args.csv} not found — run training_pipeline.py to produce it.")
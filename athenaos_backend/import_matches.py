@@ -0,0 +1,63 @@
+"""
+AthenaOS Match Import
+Bulk-loads match JSON files ({"match_info", "commentary"}) into the match
+store used by the API. Files already imported at the same mtime and size
+are skipped, so re-running after adding matches only ingests the new ones.
+Match ids are file stems; a second file with an id already imported from
+another path is reported as a duplicate and not imported. Imported matches
+show up in the API's /matches listing.
+
+Usage: python import_matches.py
+       python import_matches.py --src /archive/matches --store .cache/match_store.sqlite3
+"""
+
+import argparse
+import os
+import time
+from pathlib import Path
+
+from app.match_store import MatchStore
+
+BACKEND_DIR = Path(os.path.dirname(os.path.abspath(__file__)))
+
+
+def run_import(src: Path, store_path: str, force: bool = False, chunk: int = 1000) -> dict:
+    store = MatchStore(store_path)
+    paths = sorted(src.rglob("*.json"))
+    print(f"📂 Found {len(paths)} match files in {src}")
+
+    totals = {"imported": 0, "unchanged": 0, "duplicate": 0, "failed": 0}
+    start = time.perf_counter()
+    # One transaction per chunk keeps memory flat on very large archives
+    for i in range(0, len(paths), chunk):
+        counts = store.import_files(paths[i:i + chunk], force=force)
+        for key, value in counts.items():
+            totals[key] += value
+        print(f"   … {min(i + chunk, len(paths))}/{len(paths)}")
+    elapsed = time.perf_counter() - start
+
+    stats = store.stats()
+    print("\n" + "=" * 60)
+    print("🏏 MATCH STORE IMPORT")
+    print("=" * 60)
+    print(f"   Imported:  {totals['imported']:>8}")
+    print(f"   Unchanged: {totals['unchanged']:>8}")
+    print(f"   Duplicate: {totals['duplicate']:>8}")
+    print(f"   Failed:    {totals['failed']:>8}")
+    print(f"   Store:     {stats['matches']:>8} matches, {stats['balls']} balls, {stats['db_bytes'] / 1e6:.1f} MB")
+    print(f"   Time:      {elapsed:>8.2f} s")
+    print("=" * 60)
+    return totals
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--src", default=str(BACKEND_DIR / "app" / "data"), help="directory of match JSON files")
+    parser.add_argument(
+        "--store",
+        default=os.getenv("ATHENA_MATCH_STORE", str(BACKEND_DIR / ".cache" / "match_store.sqlite3")),
+    )
+    parser.add_argument("--force", action="store_true", help="re-import unchanged files")
+    args = parser.parse_args()
+
+    run_import(Path(args.src), args.store, force=args.force)
@@ -0,0 +1,51 @@
+"""
+AnalysisCache hands out independent copies: mutating a cached result (or
+the value that was put) never changes what later lookups see. Stored
+bytes keep the result's key order so they can be served as-is.
+"""
+
+import pytest
+
+from app.analysis_cache import AnalysisCache
+
+
+def test_get_returns_a_copy():
+    cache = AnalysisCache()
+    cache.put("k", {"summary": {"peak": 80}, "timeline": [1, 2]})
+    first = cache.get("k")
+    first["summary"]["peak"] = 0
+    first["timeline"].append(3)
+    assert cache.get("k") == {"summary": {"peak": 80}, "timeline": [1, 2]}
+
+
+def test_put_value_is_not_shared():
+    cache = AnalysisCache()
+    value = {"timeline": [1]}
+    cache.put("k", value)
+    value["timeline"].append(2)
+    assert cache.get("k") == {"timeline": [1]}
+
+
+def test_disk_tier_round_trip(tmp_path):
+    cache = AnalysisCache(db_path=str(tmp_path / "analysis.sqlite3"))
+    cache.put("k", {"a": [1, 2]})
+    reopened = AnalysisCache(db_path=str(tmp_path / "analysis.sqlite3"))
+    assert reopened.get("k") == {"a": [1, 2]}
+    assert reopened.stats()["disk_hits"] == 1
+    assert reopened.get("k") == {"a": [1, 2]}
+    assert reopened.stats()["memory_hits"] == 1
+
+
+def test_encoded_bytes_keep_key_order():
+    cache = AnalysisCache()
+    value = {"summary": {"peak": 80}, "match_info": {"title": "Final"}}
+    cache.put("k", value)
+    assert cache.get_encoded("k") == b'{"summary":{"peak":80},"match_info":{"title":"Final"}}'
+    assert list(cache.get("k")) == ["summary", "match_info"]
+
+
+def test_unserializable_values_are_not_cached():
+    cache = AnalysisCache()
+    with pytest.raises(TypeError):
+        cache.put("k", {"when": object()})
+    assert cache.get("k") is None
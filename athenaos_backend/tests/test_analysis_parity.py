@@ -0,0 +1,36 @@
+"""
+analyze_match() runs vectorized kernels over a MatchFrame; MatchAnalyzer
+keeps the original per-ball scalar path. Both must produce identical
+output (after JSON round-tripping) for every bundled match.
+"""
+
+import glob
+import json
+import os
+
+import pytest
+
+from app.emotion_engine import MatchAnalyzer, analyze_match
+
+DATA_FILES = sorted(glob.glob(os.path.join(os.path.dirname(__file__), "..", "app", "data", "*.json")))
+
+
+def _canonical(result):
+    return json.dumps(result, sort_keys=True)
+
+
+@pytest.mark.parametrize("path", DATA_FILES, ids=os.path.basename)
+def test_analyze_match_matches_scalar_path(path):
+    with open(path, encoding="utf-8") as f:
+        data = json.load(f)
+    commentary, match_info = data["commentary"], data["match_info"]
+
+    analyzer = MatchAnalyzer(match_info)
+    for ball in commentary:
+        analyzer.add_ball(ball)
+
+    assert _canonical(analyze_match(commentary, match_info)) == _canonical(analyzer.snapshot())
+
+
+def test_empty_match():
+    assert analyze_match([], {}) == MatchAnalyzer({}, total_balls=0).snapshot()
@@ -0,0 +1,108 @@
+"""
+BroadcastHub scores each published batch with one sentiment call, applies
+a batch whole or not at all, and ends channels that stop receiving balls
+even when nothing else touches the hub.
+"""
+
+import asyncio
+import json
+import os
+import time
+
+import app.broadcast_hub as broadcast_hub
+from app.broadcast_hub import BroadcastHub
+
+MATCH_FILE = os.path.join(os.path.dirname(__file__), "..", "app", "data", "match_001.json")
+
+
+def _match():
+    with open(MATCH_FILE, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def test_publish_scores_a_batch_in_one_call(monkeypatch):
+    calls = []
+
+    def scores(texts):
+        calls.append(len(texts))
+        return [0.0] * len(texts)
+
+    monkeypatch.setattr(broadcast_hub, "_sentiment_scores", scores)
+    match = _match()
+    hub = BroadcastHub()
+
+    async def scenario():
+        hub.open("m", match["match_info"])
+        return await hub.publish("m", match["commentary"][:12])
+
+    assert asyncio.run(scenario()) == 12
+    assert calls == [12]
+
+
+def test_idle_channels_expire(monkeypatch):
+    monkeypatch.setattr(broadcast_hub, "_sentiment_scores", lambda texts: [0.0] * len(texts))
+    match = _match()
+    hub = BroadcastHub(idle_timeout=0.05)
+
+    async def scenario():
+        channel = hub.open("m", match["match_info"])
+        await hub.publish("m", match["commentary"][:1])
+        frames = hub.subscribe(channel)
+        assert (await frames.__anext__()).startswith("event: start")
+        assert (await frames.__anext__()).startswith("id: 1")
+        time.sleep(0.1)
+        assert hub.get("m") is None
+        return await frames.__anext__()
+
+    assert asyncio.run(scenario()).startswith("event: end")
+    assert hub.stats()["expired"] == 1 and hub.stats()["channels"] == 0
+
+
+def test_active_channels_are_kept():
+    hub = BroadcastHub(idle_timeout=60)
+    hub.open("m", {})
+    assert hub.get("m") is not None
+    assert hub.stats()["expired"] == 0
+
+
+def test_parked_subscriber_sees_idle_expiry(monkeypatch):
+    monkeypatch.setattr(broadcast_hub, "_sentiment_scores", lambda texts: [0.0] * len(texts))
+    hub = BroadcastHub(idle_timeout=0.05)
+
+    async def scenario():
+        frames = hub.subscribe(hub.open("m", {}))
+        await frames.__anext__()
+        # Nobody publishes or calls the hub: the waiting subscriber expires it
+        return await asyncio.wait_for(frames.__anext__(), 1)
+
+    assert asyncio.run(scenario()).startswith("event: end")
+    assert hub.stats()["expired"] == 1
+
+
+def test_failed_batch_leaves_the_analyzer_unchanged(monkeypatch):
+    monkeypatch.setattr(broadcast_hub, "_sentiment_scores", lambda texts: [0.0] * len(texts))
+    match = _match()
+    good = match["commentary"][:3]
+    hub = BroadcastHub()
+
+    async def scenario():
+        channel = hub.open("m", match["match_info"])
+        await hub.publish("m", good[:1])
+        before = channel.analyzer.snapshot()
+        try:
+            await hub.publish("m", [good[1], {**good[2], "runs": "two"}])
+        except TypeError:
+            pass
+        assert channel.analyzer.snapshot() == before and len(channel.frames) == 1
+        await hub.publish("m", good[1:])
+        return channel
+
+    channel = asyncio.run(scenario())
+    reference = BroadcastHub()
+
+    async def replay():
+        reference.open("m", match["match_info"])
+        await reference.publish("m", good)
+        return reference.channels["m"]
+
+    assert channel.frames == asyncio.run(replay()).frames
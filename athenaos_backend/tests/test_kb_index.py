@@ -0,0 +1,59 @@
+"""
+EmbeddingIndex persistence: restarts reuse the stored matrix, edits
+re-encode only changed documents, and the manifest always names a matrix
+from its own build.
+"""
+
+import json
+
+import numpy as np
+
+from app.kb_index import EmbeddingIndex, document_text
+
+
+def _encoder(calls):
+    def encode(texts):
+        calls.extend(texts)
+        return np.array([[len(t), t.count("a"), 1.0] for t in texts], dtype=np.float32)
+    return encode
+
+
+def _docs(*contents):
+    return [{"id": str(i), "title": f"Doc {i}", "content": c} for i, c in enumerate(contents)]
+
+
+def test_restart_reuses_and_edit_reencodes_changed(tmp_path):
+    calls = []
+    docs = _docs("alpha", "beta", "gamma")
+    first = EmbeddingIndex("test/model", _encoder(calls), str(tmp_path)).build(docs)
+    assert len(calls) == 3
+
+    calls.clear()
+    index = EmbeddingIndex("test/model", _encoder(calls), str(tmp_path))
+    again = index.build(docs)
+    assert calls == [] and index.reused == 3
+    np.testing.assert_array_equal(first, again)
+
+    edited = _docs("alpha", "bravo", "gamma")
+    index.build(edited)
+    assert calls == [document_text(edited[1])]
+    assert index.encoded == 1 and index.reused == 2
+
+
+def test_manifest_names_its_own_matrix(tmp_path):
+    calls = []
+    index = EmbeddingIndex("test/model", _encoder(calls), str(tmp_path))
+    index.build(_docs("alpha", "beta"))
+    index.build(_docs("alpha", "bravo"))
+
+    matrices = sorted(p.name for p in tmp_path.glob("*.npy"))
+    manifest = json.loads((tmp_path / "test_model.json").read_text())
+    assert matrices == [manifest["matrix"]]
+
+    # A new matrix written without its manifest (crash between the two
+    # writes) is never picked up by the old manifest
+    np.save(tmp_path / "test_model.0123456789abcdef.npy", np.zeros((2, 3), dtype=np.float32))
+    calls.clear()
+    reloaded = EmbeddingIndex("test/model", _encoder(calls), str(tmp_path)).build(_docs("alpha", "bravo"))
+    assert calls == []
+    assert reloaded[1, 0] == len(document_text(_docs("alpha", "bravo")[1]))
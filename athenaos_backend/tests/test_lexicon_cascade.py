@@ -0,0 +1,29 @@
+"""
+The lexicon cascade only settles balls it has positive evidence for, and
+only for labels enabled in ATHENA_LEXICON_LABELS (none by default); the
+rest (no hits, cancelling hits, disabled labels) go to the model.
+"""
+
+from app.emotion_engine import LEXICON_CONFIDENCE, _lexicon_call, _lexicon_score
+
+
+def test_no_lexical_signal_is_not_confident():
+    score, confidence = _lexicon_score("Sciver to Mandhana, pushed to cover, no run.")
+    assert score == 0.0
+    assert confidence == 0.0
+    assert _lexicon_call("Sciver to Mandhana, pushed to cover, no run.", LEXICON_CONFIDENCE, {0, 1, 2}) is None
+
+
+def test_mixed_signal_goes_to_model():
+    _, confidence = _lexicon_score("A FOUR, then the wicket.")
+    assert confidence == 0.0
+
+
+def test_confident_call_is_settled_for_enabled_labels():
+    assert _lexicon_call("Smashed for SIX! Magnificent stroke.", LEXICON_CONFIDENCE, {1}) == (1, 1.0)
+    assert _lexicon_call("OUT! Caught at mid-off. Collapse!", LEXICON_CONFIDENCE, {1}) is None
+
+
+def test_nothing_is_settled_by_default():
+    assert _lexicon_call("Smashed for SIX! Magnificent stroke.", LEXICON_CONFIDENCE) is None
+    assert _lexicon_call("OUT! Caught at mid-off. Collapse!", LEXICON_CONFIDENCE) is None
@@ -0,0 +1,18 @@
+"""
+simulate_state() caps its rollouts so long match states stay inside the
+per-call latency budget.
+"""
+
+from app.match_simulator import MIN_ROLLOUTS, SIMULATION_BALL_BUDGET, SIMULATION_ROLLOUTS, simulate_state
+
+
+def test_short_state_uses_full_rollouts():
+    result = simulate_state(runs_needed=8, balls_remaining=6, wickets_fallen=2, total_balls=120, seed=0)
+    assert result["rollouts"] == SIMULATION_ROLLOUTS
+
+
+def test_long_state_is_capped_by_ball_budget():
+    result = simulate_state(runs_needed=300, balls_remaining=300, wickets_fallen=0, total_balls=300, seed=0)
+    assert result["rollouts"] == max(SIMULATION_BALL_BUDGET // 300, MIN_ROLLOUTS)
+    assert result["rollouts"] * 300 <= max(SIMULATION_BALL_BUDGET, MIN_ROLLOUTS * 300)
+    assert 0.0 <= result["win_probability"] <= 1.0
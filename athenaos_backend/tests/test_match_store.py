@@ -0,0 +1,100 @@
+"""
+MatchStore round-trips balls exactly (including explicit nulls), refuses
+to let two source files claim one match id, lists store-imported
+matches in the MatchCatalog (rescanned only when the directory or store
+changes), and leaves the previous rows in place when a re-import fails.
+"""
+
+import json
+
+from app.match_catalog import MatchCatalog
+from app.match_store import MatchStore
+
+
+def _write(path, match_id, title, commentary=None):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(json.dumps({
+        "match_info": {"match_id": match_id, "title": title, "venue": "MCG", "date": "2024-01-01"},
+        "commentary": commentary or [{"ball": 1, "over": 1, "text": "dot ball", "runs": 0}],
+    }))
+    return path
+
+
+def test_explicit_nulls_round_trip():
+    store = MatchStore()
+    commentary = [
+        {"ball": 1, "over": 1, "text": "Wide", "runs": 1, "batter": None, "is_wide": True},
+        {"ball": 2, "over": 1, "text": "Dot", "runs": 0, "bowler": "Perry"},
+    ]
+    store.put("m", {"match_info": {}, "commentary": commentary})
+    assert store.balls("m") == commentary
+    assert "batter" not in store.balls("m")[1]
+    assert store.column("m", "batter") == [None, None]
+
+
+def test_duplicate_ids_are_rejected(tmp_path):
+    store = MatchStore()
+    first = _write(tmp_path / "a" / "final.json", "final", "First")
+    second = _write(tmp_path / "b" / "final.json", "final", "Second")
+
+    counts = store.import_files([first, second])
+    assert counts["imported"] == 1 and counts["duplicate"] == 1
+    assert store.match_info("final")["title"] == "First"
+
+    # Once the original file is gone the id can move to the other source
+    first.unlink()
+    assert store.import_files([second])["imported"] == 1
+    assert store.match_info("final")["title"] == "Second"
+
+
+def test_catalog_lists_store_imports(tmp_path):
+    data_dir = tmp_path / "data"
+    _write(data_dir / "local.json", "local", "Local")
+    store = MatchStore()
+    store.import_files([_write(tmp_path / "archive" / "2019" / "old.json", "old", "Archived")])
+    store.import_files([data_dir / "local.json"])
+
+    catalog = MatchCatalog(data_dir, store=store, refresh_interval=0)
+    listed = catalog.query()["matches"]
+    assert sorted(m["match_id"] for m in listed) == ["local", "old"]
+
+    store.import_files([_write(tmp_path / "archive" / "2019" / "old.json", "old", "Re-imported")], force=True)
+    assert [m["title"] for m in catalog.query(venue="MCG")["matches"] if m["match_id"] == "old"] == ["Re-imported"]
+    assert catalog.stats()["matches"] == 2
+
+
+def test_failed_reimport_keeps_previous_rows(tmp_path):
+    store = MatchStore()
+    path = _write(tmp_path / "final.json", "final", "Original")
+    assert store.import_files([path])["imported"] == 1
+
+    # A dict-valued column cannot be bound, so the re-import fails midway
+    _write(path, "final", "Broken", [{"ball": 1, "over": 1, "text": "ok", "runs": 0},
+                                     {"ball": 2, "over": 1, "text": "bad", "runs": {"bye": 1}}])
+    assert store.import_files([path])["failed"] == 1
+    assert store.match_info("final")["title"] == "Original"
+    assert store.balls("final") == [{"ball": 1, "over": 1, "text": "dot ball", "runs": 0}]
+    assert not store.is_current(path)
+
+    _write(path, "final", "Fixed")
+    assert store.import_files([path])["imported"] == 1
+    assert store.match_info("final")["title"] == "Fixed"
+    assert store.is_current(path)
+
+
+def test_catalog_rescans_only_after_a_change(tmp_path):
+    data_dir = tmp_path / "data"
+    _write(data_dir / "local.json", "local", "Local")
+    store = MatchStore()
+    catalog = MatchCatalog(data_dir, store=store, refresh_interval=0)
+
+    assert len(catalog.query()["matches"]) == 1
+    catalog.query()
+    catalog.query(venue="MCG")
+    assert catalog.stats()["scans"] == 1
+
+    _write(data_dir / "added.json", "added", "Added")
+    assert len(catalog.query()["matches"]) == 2
+    store.import_files([_write(tmp_path / "archive" / "old.json", "old", "Archived")])
+    assert len(catalog.query()["matches"]) == 3
+    assert catalog.stats()["scans"] == 3
@@ -0,0 +1,134 @@
+"""
+SingleFlight.run coalesces identical concurrent requests on the event loop:
+only the leader takes a HeavyExecutor slot, so a burst larger than the
+executor's queue still succeeds and computes once.
+"""
+
+import asyncio
+import threading
+import time
+
+import pytest
+
+from app.heavy_executor import HeavyExecutor
+from app.single_flight import SingleFlight
+
+
+def _counting_job(calls):
+    lock = threading.Lock()
+
+    def job():
+        with lock:
+            calls.append(1)
+        time.sleep(0.05)
+        return {"ok": True}
+    return job
+
+
+def test_burst_shares_one_executor_slot():
+    calls = []
+    flights = SingleFlight()
+    heavy = HeavyExecutor(workers=1, max_queue=1)
+    job = _counting_job(calls)
+
+    async def burst():
+        return await asyncio.gather(*(flights.run("analysis:m1", heavy.run, job) for _ in range(20)))
+
+    results = asyncio.run(burst())
+    assert results == [{"ok": True}] * 20
+    assert len(calls) == 1
+    assert heavy.stats()["rejected"] == 0
+    assert flights.stats() == {"in_flight": 0, "executions": 1, "shared": 19}
+
+
+def test_cancelled_caller_does_not_cancel_the_flight():
+    flights = SingleFlight()
+
+    async def slow():
+        await asyncio.sleep(0.05)
+        return 42
+
+    async def scenario():
+        first = asyncio.ensure_future(flights.run("k", slow))
+        second = asyncio.ensure_future(flights.run("k", slow))
+        await asyncio.sleep(0)
+        first.cancel()
+        return await second
+
+    assert asyncio.run(scenario()) == 42
+
+
+def test_errors_reach_every_waiter():
+    flights = SingleFlight()
+
+    async def fail():
+        await asyncio.sleep(0.01)
+        raise ValueError("boom")
+
+    async def scenario():
+        return await asyncio.gather(*(flights.run("k", fail) for _ in range(3)), return_exceptions=True)
+
+    errors = asyncio.run(scenario())
+    assert all(isinstance(e, ValueError) for e in errors)
+    assert flights.stats()["in_flight"] == 0
+
+
+def test_preloaded_burst_returns_200_and_analyzes_once(monkeypatch):
+    pytest.importorskip("sentence_transformers")
+    pytest.importorskip("google.genai")
+    httpx = pytest.importorskip("httpx")
+    import app.new_main as main
+
+    calls = []
+    real = main.analyze_match
+
+    def counting(*args, **kwargs):
+        calls.append(1)
+        time.sleep(0.05)
+        return real(*args, **kwargs)
+
+    monkeypatch.setattr(main, "analyze_match", counting)
+    monkeypatch.setattr(main, "_heavy", HeavyExecutor(workers=1, max_queue=1))
+    monkeypatch.setattr(main, "_analysis_cache", main.AnalysisCache())
+
+    async def burst():
+        transport = httpx.ASGITransport(app=main.app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            return await asyncio.gather(*(
+                client.post("/analyze/preloaded", json={"match_id": "match_001"}) for _ in range(20)
+            ))
+
+    responses = asyncio.run(burst())
+    assert [r.status_code for r in responses] == [200] * 20
+    assert len(calls) == 1
+
+
+def test_chat_burst_shares_one_context_build(monkeypatch):
+    pytest.importorskip("sentence_transformers")
+    pytest.importorskip("google.genai")
+    httpx = pytest.importorskip("httpx")
+    import app.new_main as main
+
+    contexts = []
+    real = main._analyze_preloaded
+
+    def counting(*args, **kwargs):
+        contexts.append(1)
+        time.sleep(0.05)
+        return real(*args, **kwargs)
+
+    monkeypatch.setattr(main, "_analyze_preloaded", counting)
+    monkeypatch.setattr(main, "_heavy", HeavyExecutor(workers=1, max_queue=1))
+    monkeypatch.setattr(main, "rag_chat", lambda message, **kwargs: message)
+
+    async def burst():
+        transport = httpx.ASGITransport(app=main.app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            with_match = [client.post("/chat", json={"message": f"q{i}", "match_id": "match_001"}) for i in range(20)]
+            without = [client.post("/chat", json={"message": f"general {i}"}) for i in range(5)]
+            return await asyncio.gather(*with_match, *without)
+
+    responses = asyncio.run(burst())
+    assert [r.status_code for r in responses] == [200] * 25
+    assert len(contexts) == 1
+    assert main._heavy.stats()["rejected"] == 0
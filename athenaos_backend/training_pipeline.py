@@ -1,5 +1,4 @@
 import os
-import re
 import logging
 import time
 import pandas as pd
@@ -16,6 +15,8 @@ from transformers import (
     DataCollatorWithPadding
 )
 
+from app.commentary_features import extract_features
+
 # -----------------------------------------------------------------------------
 # LOGGING CONFIGURATION
 # -----------------------------------------------------------------------------
@@ -48,34 +49,10 @@ def auto_label(df: pd.DataFrame) -> pd.DataFrame:
     logger.info("Starting Phase 1: Auto Labeling...")
     
     def get_label(text):
-        text = str(text).lower()
-        
-        # Define keyword sets
-        pressure_keywords = ["out", "bowled", "caught", "wicket", "lbw", "dismissed"]
-        positive_keywords = ["six", "four", "boundary", "maximum", "century", "fifty"]
-        
-        # Check for Pressure (Word boundary aware)
-        is_pressure = any(re.search(rf"\b{w}\b", text) for w in pressure_keywords)
-        # Check for Positive (Word boundary aware)
-        is_positive = any(re.search(rf"\b{w}\b", text) for w in positive_keywords)
-        
-        # Heuristic: If it has 'out'/'wicket' it's likely pressure even if a four was hit (e.g. "out next ball after a four")
-        # But if it's just 'mid-wicket', the regex \bwicket\b will FAIL on "mid-wicket" (because of the hyphen)
-        # Wait, \b matches hyphen? No, \b is between \w and [^\w]. Hyphen is [^\w].
-        # So \bwicket\b WOULD match "mid-wicket".
-        # Let's be even safer: negative lookbehind/lookahead for common cricket terms
-        
-        if is_pressure:
-            # Check if 'wicket' is part of a position
-            if "mid-wicket" in text or "wicket-to-wicket" in text or "wicketkeeper" in text:
-                # Re-evaluate: if it still has 'out' or 'bowled' as separate words, it's pressure
-                other_pressure = any(re.search(rf"\b{w}\b", text) for w in ["out", "bowled", "caught", "lbw", "dismissed"])
-                if not other_pressure:
-                    is_pressure = False
-
-        if is_pressure: return 2
-        if is_positive: return 1
-        return 0
+        # Word-boundary keyword rules (pressure > positive > neutral), with
+        # 'wicket' inside fielding positions like mid-wicket not counting as
+        # pressure on its own; see app/commentary_features.py.
+        return extract_features(str(text))["label_hint"]
 
     df['label'] = df['commentary'].apply(get_label)
     